@@ -99,5 +99,17 @@ def dev(
     )
 
 
+@app.command()
+def reindex_chats():
+    """
+    Backfill chat_message rows for chats that still keep their messages in the
+    chat blob and rebuild the chat full-text search index.
+    """
+    from open_webui.models.chats import Chats
+
+    moved = Chats.rebuild_search_index()
+    typer.echo(f"Moved messages of {moved} chats, chat search index rebuilt.")
+
+
 if __name__ == "__main__":
     app()
@@ -752,6 +752,23 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Local copies of files in S3/GCS/Azure are kept in UPLOAD_DIR and evicted
+# least recently used first once they take more than this (0 for no limit)
+STORAGE_CACHE_MAX_SIZE_MB = os.environ.get("STORAGE_CACHE_MAX_SIZE_MB", 2048)
+
+try:
+    STORAGE_CACHE_MAX_SIZE_MB = int(STORAGE_CACHE_MAX_SIZE_MB)
+except Exception:
+    STORAGE_CACHE_MAX_SIZE_MB = 2048
+
+# Seconds a local copy is served before its ETag is checked against the bucket
+STORAGE_CACHE_VALIDATE_INTERVAL = os.environ.get("STORAGE_CACHE_VALIDATE_INTERVAL", 60)
+
+try:
+    STORAGE_CACHE_VALIDATE_INTERVAL = int(STORAGE_CACHE_VALIDATE_INTERVAL)
+except Exception:
+    STORAGE_CACHE_VALIDATE_INTERVAL = 60
+
 ####################################
 # File Upload DIR
 ####################################
@@ -2175,6 +2192,24 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+# Number of embedding batches sent to a remote engine at the same time
+RAG_EMBEDDING_CONCURRENT_REQUESTS = os.environ.get(
+    "RAG_EMBEDDING_CONCURRENT_REQUESTS", 4
+)
+
+try:
+    RAG_EMBEDDING_CONCURRENT_REQUESTS = max(int(RAG_EMBEDDING_CONCURRENT_REQUESTS), 1)
+except Exception:
+    RAG_EMBEDDING_CONCURRENT_REQUESTS = 4
+
+# Retries of an embedding batch rejected with 429/5xx or a connection error
+RAG_EMBEDDING_MAX_RETRIES = os.environ.get("RAG_EMBEDDING_MAX_RETRIES", 5)
+
+try:
+    RAG_EMBEDDING_MAX_RETRIES = int(RAG_EMBEDDING_MAX_RETRIES)
+except Exception:
+    RAG_EMBEDDING_MAX_RETRIES = 5
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -2183,6 +2218,33 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+
+RAG_EMBEDDING_CACHE_DIR = os.environ.get(
+    "RAG_EMBEDDING_CACHE_DIR", f"{CACHE_DIR}/embeddings"
+)
+
+# Size budget of the local embedding cache, least recently used vectors are
+# evicted once it is exceeded
+RAG_EMBEDDING_CACHE_MAX_SIZE_MB = os.environ.get("RAG_EMBEDDING_CACHE_MAX_SIZE_MB", 512)
+
+try:
+    RAG_EMBEDDING_CACHE_MAX_SIZE_MB = int(RAG_EMBEDDING_CACHE_MAX_SIZE_MB)
+except Exception:
+    RAG_EMBEDDING_CACHE_MAX_SIZE_MB = 512
+
+# Vectors are shared through Redis (when REDIS_URL is set) for this many seconds
+RAG_EMBEDDING_CACHE_REDIS_TTL = os.environ.get(
+    "RAG_EMBEDDING_CACHE_REDIS_TTL", 60 * 60 * 24 * 7
+)
+
+try:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = int(RAG_EMBEDDING_CACHE_REDIS_TTL)
+except Exception:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = 60 * 60 * 24 * 7
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -2391,6 +2453,34 @@ WEB_SEARCH_CONCURRENT_REQUESTS = PersistentConfig(
     int(os.getenv("WEB_SEARCH_CONCURRENT_REQUESTS", "10")),
 )
 
+# Search engine responses are reused for this many seconds for the same engine,
+# query, result count and domain filter. Set to 0 to disable
+WEB_SEARCH_CACHE_TTL = os.environ.get("WEB_SEARCH_CACHE_TTL", 60 * 60)
+
+try:
+    WEB_SEARCH_CACHE_TTL = int(WEB_SEARCH_CACHE_TTL)
+except Exception:
+    WEB_SEARCH_CACHE_TTL = 60 * 60
+
+# Fetched pages are served as is for this many seconds, afterwards they are
+# revalidated with their ETag or Last-Modified header and only downloaded again
+# if they changed
+WEB_PAGE_CACHE_TTL = os.environ.get("WEB_PAGE_CACHE_TTL", 60 * 60)
+
+try:
+    WEB_PAGE_CACHE_TTL = int(WEB_PAGE_CACHE_TTL)
+except Exception:
+    WEB_PAGE_CACHE_TTL = 60 * 60
+
+# Size budget of the cached search responses and pages, least recently used
+# entries are evicted once it is exceeded. Set to 0 to disable the cache
+WEB_CACHE_MAX_SIZE_MB = os.environ.get("WEB_CACHE_MAX_SIZE_MB", 256)
+
+try:
+    WEB_CACHE_MAX_SIZE_MB = int(WEB_CACHE_MAX_SIZE_MB)
+except Exception:
+    WEB_CACHE_MAX_SIZE_MB = 256
+
 
 WEB_LOADER_ENGINE = PersistentConfig(
     "WEB_LOADER_ENGINE",
@@ -3031,6 +3121,15 @@ AUDIO_TTS_AZURE_SPEECH_OUTPUT_FORMAT = PersistentConfig(
     ),
 )
 
+# Synthesized speech is cached sentence by sentence and evicted least recently
+# used first once it takes more than this (0 for no limit)
+SPEECH_CACHE_MAX_SIZE_MB = os.environ.get("SPEECH_CACHE_MAX_SIZE_MB", 1024)
+
+try:
+    SPEECH_CACHE_MAX_SIZE_MB = int(SPEECH_CACHE_MAX_SIZE_MB)
+except Exception:
+    SPEECH_CACHE_MAX_SIZE_MB = 1024
+
 
 ####################################
 # LDAP
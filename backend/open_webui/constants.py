@@ -103,6 +103,7 @@ class ERROR_MESSAGES(str, Enum):
         "Duplicate content detected. Please provide unique content to proceed."
     )
     FILE_NOT_PROCESSED = "Extracted content is not available for this file. Please ensure that the file is processed before proceeding."
+    FILE_INGESTION_QUEUE_FULL = "Too many files are being processed right now. Please try again in a few minutes."
 
 
 class TASKS(str, Enum):
@@ -320,6 +320,22 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Upper bound on how long (in ms) and how much streamed content (in bytes) can sit
+# in memory before a realtime save is written to the database
+REALTIME_CHAT_SAVE_INTERVAL_MS = os.environ.get("REALTIME_CHAT_SAVE_INTERVAL_MS", 500)
+
+try:
+    REALTIME_CHAT_SAVE_INTERVAL_MS = int(REALTIME_CHAT_SAVE_INTERVAL_MS)
+except Exception:
+    REALTIME_CHAT_SAVE_INTERVAL_MS = 500
+
+REALTIME_CHAT_SAVE_MAX_BYTES = os.environ.get("REALTIME_CHAT_SAVE_MAX_BYTES", 4096)
+
+try:
+    REALTIME_CHAT_SAVE_MAX_BYTES = int(REALTIME_CHAT_SAVE_MAX_BYTES)
+except Exception:
+    REALTIME_CHAT_SAVE_MAX_BYTES = 4096
+
 ####################################
 # REDIS
 ####################################
@@ -328,6 +344,201 @@ REDIS_URL = os.environ.get("REDIS_URL", "")
 REDIS_SENTINEL_HOSTS = os.environ.get("REDIS_SENTINEL_HOSTS", "")
 REDIS_SENTINEL_PORT = os.environ.get("REDIS_SENTINEL_PORT", "26379")
 
+####################################
+# MODELS
+####################################
+
+# Seconds between background rebuilds of the model list, changes to models,
+# functions and connections are picked up immediately
+MODELS_REGISTRY_REFRESH_INTERVAL = os.environ.get(
+    "MODELS_REGISTRY_REFRESH_INTERVAL", 300
+)
+
+try:
+    MODELS_REGISTRY_REFRESH_INTERVAL = max(int(MODELS_REGISTRY_REFRESH_INTERVAL), 1)
+except Exception:
+    MODELS_REGISTRY_REFRESH_INTERVAL = 300
+
+# How requests for a model served by several connections are distributed:
+# "random", "least_requests" (fewest requests in flight) or "ewma" (fewest
+# requests in flight weighted by the recent response latency of the backend)
+MODELS_LOAD_BALANCER_STRATEGY = os.environ.get(
+    "MODELS_LOAD_BALANCER_STRATEGY", "ewma"
+).lower()
+
+if MODELS_LOAD_BALANCER_STRATEGY not in ["random", "least_requests", "ewma"]:
+    MODELS_LOAD_BALANCER_STRATEGY = "ewma"
+
+# Consecutive failures after which a backend is taken out of rotation, and for
+# how many seconds
+MODELS_LOAD_BALANCER_MAX_FAILURES = os.environ.get(
+    "MODELS_LOAD_BALANCER_MAX_FAILURES", 3
+)
+
+try:
+    MODELS_LOAD_BALANCER_MAX_FAILURES = max(int(MODELS_LOAD_BALANCER_MAX_FAILURES), 1)
+except Exception:
+    MODELS_LOAD_BALANCER_MAX_FAILURES = 3
+
+MODELS_LOAD_BALANCER_EJECTION_TIME = os.environ.get(
+    "MODELS_LOAD_BALANCER_EJECTION_TIME", 30
+)
+
+try:
+    MODELS_LOAD_BALANCER_EJECTION_TIME = int(MODELS_LOAD_BALANCER_EJECTION_TIME)
+except Exception:
+    MODELS_LOAD_BALANCER_EJECTION_TIME = 30
+
+# Seconds between polls of /api/ps on every Ollama connection, used for health
+# checks and to route requests to nodes that already have the model loaded.
+# Set to 0 to disable
+OLLAMA_HEALTH_CHECK_INTERVAL = os.environ.get("OLLAMA_HEALTH_CHECK_INTERVAL", 10)
+
+try:
+    OLLAMA_HEALTH_CHECK_INTERVAL = int(OLLAMA_HEALTH_CHECK_INTERVAL)
+except Exception:
+    OLLAMA_HEALTH_CHECK_INTERVAL = 10
+
+####################################
+# FUNCTIONS
+####################################
+
+# Seconds a loaded function module is used without checking its content in the
+# database. Changes made through the API reach every worker right away (through
+# Redis when REDIS_URL is set), this only bounds how long other changes take to
+# be picked up. Set to 0 to check on every use
+FUNCTION_MODULE_REVALIDATE_INTERVAL = os.environ.get(
+    "FUNCTION_MODULE_REVALIDATE_INTERVAL", 60
+)
+
+try:
+    FUNCTION_MODULE_REVALIDATE_INTERVAL = int(FUNCTION_MODULE_REVALIDATE_INTERVAL)
+except Exception:
+    FUNCTION_MODULE_REVALIDATE_INTERVAL = 60
+
+####################################
+# FILE INGESTION
+####################################
+
+# Process uploaded files in background workers instead of inside the upload
+# request. Jobs are kept in Redis when REDIS_URL is set, so they are shared by
+# all replicas, and in a local SQLite database otherwise. Progress is sent to
+# the owner as "file-events", which the chat input waits on before a file can
+# be sent; other upload forms show files as uploaded before they are processed
+ENABLE_FILE_INGESTION_QUEUE = (
+    os.environ.get("ENABLE_FILE_INGESTION_QUEUE", "False").lower() == "true"
+)
+
+# Files processed at the same time by each worker process
+FILE_INGESTION_WORKERS = os.environ.get("FILE_INGESTION_WORKERS", 2)
+
+try:
+    FILE_INGESTION_WORKERS = max(int(FILE_INGESTION_WORKERS), 1)
+except Exception:
+    FILE_INGESTION_WORKERS = 2
+
+# Uploads are rejected with 429 while this many files are waiting or being
+# processed
+FILE_INGESTION_QUEUE_MAX_SIZE = os.environ.get("FILE_INGESTION_QUEUE_MAX_SIZE", 1000)
+
+try:
+    FILE_INGESTION_QUEUE_MAX_SIZE = int(FILE_INGESTION_QUEUE_MAX_SIZE)
+except Exception:
+    FILE_INGESTION_QUEUE_MAX_SIZE = 1000
+
+# Failed files are retried this many times, waiting FILE_INGESTION_RETRY_DELAY
+# seconds before the first retry and twice as long before each next one
+FILE_INGESTION_MAX_RETRIES = os.environ.get("FILE_INGESTION_MAX_RETRIES", 2)
+
+try:
+    FILE_INGESTION_MAX_RETRIES = max(int(FILE_INGESTION_MAX_RETRIES), 0)
+except Exception:
+    FILE_INGESTION_MAX_RETRIES = 2
+
+FILE_INGESTION_RETRY_DELAY = os.environ.get("FILE_INGESTION_RETRY_DELAY", 10)
+
+try:
+    FILE_INGESTION_RETRY_DELAY = int(FILE_INGESTION_RETRY_DELAY)
+except Exception:
+    FILE_INGESTION_RETRY_DELAY = 10
+
+# Seconds after which a job whose worker stopped reporting progress (e.g. the
+# process was killed) is handed to another worker
+FILE_INGESTION_JOB_TIMEOUT = os.environ.get("FILE_INGESTION_JOB_TIMEOUT", 300)
+
+try:
+    FILE_INGESTION_JOB_TIMEOUT = max(int(FILE_INGESTION_JOB_TIMEOUT), 30)
+except Exception:
+    FILE_INGESTION_JOB_TIMEOUT = 300
+
+####################################
+# SPEECH TO TEXT
+####################################
+
+# Recordings are transcribed in chunks of about this many seconds, cut at the
+# nearest silence, so long recordings are transcribed in parallel and streamed
+# transcriptions show their first text quickly
+STT_CHUNK_DURATION = os.environ.get("STT_CHUNK_DURATION", 60)
+
+try:
+    STT_CHUNK_DURATION = max(int(STT_CHUNK_DURATION), 10)
+except Exception:
+    STT_CHUNK_DURATION = 60
+
+# Chunks of a recording transcribed at the same time
+STT_CHUNK_WORKERS = os.environ.get("STT_CHUNK_WORKERS", 4)
+
+try:
+    STT_CHUNK_WORKERS = max(int(STT_CHUNK_WORKERS), 1)
+except Exception:
+    STT_CHUNK_WORKERS = 4
+
+####################################
+# WEBHOOKS
+####################################
+
+# Webhooks (e.g. channel notifications) are posted in the background by this
+# many concurrent senders per worker process
+WEBHOOK_CONCURRENCY = os.environ.get("WEBHOOK_CONCURRENCY", 16)
+
+try:
+    WEBHOOK_CONCURRENCY = max(int(WEBHOOK_CONCURRENCY), 1)
+except Exception:
+    WEBHOOK_CONCURRENCY = 16
+
+# Webhooks waiting to be posted; new ones are dropped (and logged) past this
+WEBHOOK_QUEUE_MAX_SIZE = os.environ.get("WEBHOOK_QUEUE_MAX_SIZE", 10000)
+
+try:
+    WEBHOOK_QUEUE_MAX_SIZE = max(int(WEBHOOK_QUEUE_MAX_SIZE), 1)
+except Exception:
+    WEBHOOK_QUEUE_MAX_SIZE = 10000
+
+# Failed posts (connection errors, 429 and 5xx responses) are retried this many
+# times, waiting WEBHOOK_RETRY_DELAY seconds before the first retry and twice as
+# long before each next one
+WEBHOOK_MAX_RETRIES = os.environ.get("WEBHOOK_MAX_RETRIES", 3)
+
+try:
+    WEBHOOK_MAX_RETRIES = max(int(WEBHOOK_MAX_RETRIES), 0)
+except Exception:
+    WEBHOOK_MAX_RETRIES = 3
+
+WEBHOOK_RETRY_DELAY = os.environ.get("WEBHOOK_RETRY_DELAY", 1)
+
+try:
+    WEBHOOK_RETRY_DELAY = float(WEBHOOK_RETRY_DELAY)
+except Exception:
+    WEBHOOK_RETRY_DELAY = 1.0
+
+# Seconds before a single post is given up
+WEBHOOK_TIMEOUT = os.environ.get("WEBHOOK_TIMEOUT", 10)
+
+try:
+    WEBHOOK_TIMEOUT = int(WEBHOOK_TIMEOUT)
+except Exception:
+    WEBHOOK_TIMEOUT = 10
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -364,6 +575,25 @@ WEBUI_AUTH_SIGNOUT_REDIRECT_URL = os.environ.get(
     "WEBUI_AUTH_SIGNOUT_REDIRECT_URL", None
 )
 
+# Seconds an authenticated user is served from the user cache (shared through
+# Redis when REDIS_URL is set) before it is read from the database again. Role,
+# profile and API key changes invalidate it right away. Without Redis and with
+# several UVICORN_WORKERS it is capped to a few seconds. Set to 0 to disable
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", 60)
+
+try:
+    USER_CACHE_TTL = int(USER_CACHE_TTL)
+except Exception:
+    USER_CACHE_TTL = 60
+
+# Seconds between the batched writes of the users' last activity
+USER_LAST_ACTIVE_FLUSH_INTERVAL = os.environ.get("USER_LAST_ACTIVE_FLUSH_INTERVAL", 30)
+
+try:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = max(int(USER_LAST_ACTIVE_FLUSH_INTERVAL), 1)
+except Exception:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = 30
+
 ####################################
 # WEBUI_SECRET_KEY
 ####################################
@@ -409,6 +639,35 @@ WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Window (in ms) in which streamed chat events for the same message are merged
+# into a single socket frame, 0 sends every event as it comes
+WEBSOCKET_EVENT_COALESCE_INTERVAL_MS = os.environ.get(
+    "WEBSOCKET_EVENT_COALESCE_INTERVAL_MS", 50
+)
+
+try:
+    WEBSOCKET_EVENT_COALESCE_INTERVAL_MS = int(WEBSOCKET_EVENT_COALESCE_INTERVAL_MS)
+except Exception:
+    WEBSOCKET_EVENT_COALESCE_INTERVAL_MS = 50
+
+# Seconds a socket session stays in the Redis presence store without being
+# refreshed by the worker holding it, so sessions of a worker that died expire
+WEBSOCKET_PRESENCE_TTL = os.environ.get("WEBSOCKET_PRESENCE_TTL", 60)
+
+try:
+    WEBSOCKET_PRESENCE_TTL = max(int(WEBSOCKET_PRESENCE_TTL), 10)
+except Exception:
+    WEBSOCKET_PRESENCE_TTL = 60
+
+# Seconds the session ids of a user read from Redis are reused by a worker
+# before they are read again, changes made by the worker itself apply at once
+WEBSOCKET_PRESENCE_CACHE_TTL = os.environ.get("WEBSOCKET_PRESENCE_CACHE_TTL", 1)
+
+try:
+    WEBSOCKET_PRESENCE_CACHE_TTL = float(WEBSOCKET_PRESENCE_CACHE_TTL)
+except Exception:
+    WEBSOCKET_PRESENCE_CACHE_TTL = 1
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -6,13 +6,11 @@ import mimetypes
 import os
 import shutil
 import sys
-import time
 import random
 from uuid import uuid4
 
 
 from contextlib import asynccontextmanager
-from urllib.parse import urlencode, parse_qs, urlparse
 from pydantic import BaseModel
 from sqlalchemy import text
 
@@ -40,13 +38,12 @@ from fastapi import (
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from starlette_compress import CompressMiddleware
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response, StreamingResponse
 
@@ -431,7 +428,11 @@ from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
     check_model_access,
+    periodic_models_refresh,
 )
+from open_webui.utils.model_registry import MODEL_REGISTRY
+from open_webui.retrieval.ingestion import start_ingestion_queue, stop_ingestion_queue
+from open_webui.retrieval.utils import start_embedding_session, stop_embedding_session
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
     chat_completed as chat_completed_handler,
@@ -439,18 +440,24 @@ from open_webui.utils.chat import (
 )
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
+from open_webui.utils.chat_buffer import flush_message_buffers
 from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
     get_license_data,
-    get_http_authorization_cred,
     decode_token,
     get_admin_user,
     get_verified_user,
+    periodic_user_last_active_flush,
 )
-from open_webui.utils.plugin import install_tool_and_function_dependencies
+from open_webui.utils.plugin import (
+    install_tool_and_function_dependencies,
+    load_active_functions,
+)
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
+from open_webui.utils.webhook import WEBHOOK_DISPATCHER
 from open_webui.utils.oauth import OAuthManager
-from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.request_pipeline import RequestPipelineMiddleware
 from open_webui.utils.redis import get_redis_connection
 
 from open_webui.tasks import (
@@ -520,6 +527,9 @@ async def lifespan(app: FastAPI):
     log.info("Installing external dependencies of functions and tools...")
     install_tool_and_function_dependencies()
 
+    log.info("Loading active functions...")
+    load_active_functions()
+
     app.state.redis = get_redis_connection(
         redis_url=REDIS_URL,
         redis_sentinels=get_sentinels_from_env(
@@ -532,17 +542,43 @@ async def lifespan(app: FastAPI):
         app.state.redis_task_command_listener = asyncio.create_task(
             redis_task_command_listener(app)
         )
+        app.state.function_registry_listener = asyncio.create_task(
+            FUNCTION_REGISTRY.listen(app)
+        )
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    app.state.models_refresh_task = asyncio.create_task(periodic_models_refresh(app))
+    app.state.backends_health_check_task = asyncio.create_task(
+        ollama.periodic_backends_health_check(app)
+    )
+    start_embedding_session()
+    start_ingestion_queue(app, files.process_uploaded_file)
+    app.state.user_last_active_flush_task = asyncio.create_task(
+        periodic_user_last_active_flush()
+    )
 
     yield
 
+    # Write out streamed messages that are still buffered in memory
+    flush_message_buffers()
+
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
+        app.state.function_registry_listener.cancel()
+
+    app.state.models_refresh_task.cancel()
+    app.state.backends_health_check_task.cancel()
+    stop_ingestion_queue()
+
+    app.state.user_last_active_flush_task.cancel()
+    Users.flush_user_last_active()
+
+    await WEBHOOK_DISPATCHER.stop()
+    await stop_embedding_session()
 
 
 app = FastAPI(
@@ -714,9 +750,6 @@ app.state.USER_COUNT = None
 app.state.TOOLS = {}
 app.state.TOOL_CONTENTS = {}
 
-app.state.FUNCTIONS = {}
-app.state.FUNCTION_CONTENTS = {}
-
 ########################################
 #
 # RETRIEVAL
@@ -1064,70 +1097,9 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 app.state.MODELS = {}
 
 
-class RedirectMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Check if the request is a GET request
-        if request.method == "GET":
-            path = request.url.path
-            query_params = dict(parse_qs(urlparse(str(request.url)).query))
-
-            # Check for the specific watch path and the presence of 'v' parameter
-            if path.endswith("/watch") and "v" in query_params:
-                # Extract the first 'v' parameter
-                video_id = query_params["v"][0]
-                encoded_video_id = urlencode({"youtube": video_id})
-                redirect_url = f"/?{encoded_video_id}"
-                return RedirectResponse(url=redirect_url)
-
-        # Proceed with the normal flow of other requests
-        response = await call_next(request)
-        return response
-
-
 # Add the middleware to the app
 app.add_middleware(CompressMiddleware)
-app.add_middleware(RedirectMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-
-
-@app.middleware("http")
-async def commit_session_after_request(request: Request, call_next):
-    response = await call_next(request)
-    # log.debug("Commit session after request")
-    Session.commit()
-    return response
-
-
-@app.middleware("http")
-async def check_url(request: Request, call_next):
-    start_time = int(time.time())
-    request.state.token = get_http_authorization_cred(
-        request.headers.get("Authorization")
-    )
-
-    request.state.enable_api_key = app.state.config.ENABLE_API_KEY
-    response = await call_next(request)
-    process_time = int(time.time()) - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
-
-
-@app.middleware("http")
-async def inspect_websocket(request: Request, call_next):
-    if (
-        "/ws/socket.io" in request.url.path
-        and request.query_params.get("transport") == "websocket"
-    ):
-        upgrade = (request.headers.get("Upgrade") or "").lower()
-        connection = (request.headers.get("Connection") or "").lower().split(",")
-        # Check that there's the correct headers for an upgrade, else reject the connection
-        # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
-        if upgrade != "websocket" or "upgrade" not in connection:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"detail": "Invalid WebSocket upgrade request"},
-            )
-    return await call_next(request)
+app.add_middleware(RequestPipelineMiddleware)
 
 
 app.add_middleware(
@@ -1227,6 +1199,12 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
 
     all_models = await get_all_models(request, user=user)
 
+    # Filtered lists are kept per user until the snapshot is rebuilt
+    user_models_key = f"{user.id}:{user.role}"
+    models = MODEL_REGISTRY.get_user_models(user_models_key)
+    if models is not None:
+        return {"data": models}
+
     models = []
     for model in all_models:
         # Filter out filter pipelines
@@ -1264,6 +1242,7 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model['id'] for model in models])}"
     )
+    MODEL_REGISTRY.set_user_models(user_models_key, models, snapshot=all_models)
     return {"data": models}
 
 
@@ -1676,7 +1655,10 @@ async def get_current_usage(user=Depends(get_verified_user)):
     This is an experimental endpoint and subject to change.
     """
     try:
-        return {"model_ids": get_models_in_use(), "user_ids": get_active_user_ids()}
+        return {
+            "model_ids": await get_models_in_use(),
+            "user_ids": await get_active_user_ids(),
+        }
     except Exception as e:
         log.error(f"Error getting usage statistics: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -0,0 +1,103 @@
+"""add access_grant table
+
+Revision ID: add_access_grant_table
+Revises: add_group_member_table
+Create Date: 2025-02-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from open_webui.migrations.util import get_existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_access_grant_table'
+down_revision: Union[str, None] = 'add_group_member_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+access_grant_table = sa.table(
+    'access_grant',
+    sa.column('resource_type', sa.String()),
+    sa.column('resource_id', sa.String()),
+    sa.column('permission', sa.String()),
+    sa.column('principal_type', sa.String()),
+    sa.column('principal_id', sa.String()),
+)
+
+# Resource type, table and primary key of the resources with access control
+RESOURCES = [
+    ('knowledge', 'knowledge', 'id'),
+    ('model', 'model', 'id'),
+    ('prompt', 'prompt', 'command'),
+    ('tool', 'tool', 'id'),
+]
+
+
+def get_access_grants(access_control):
+    # Same rules as open_webui.models.access_grants.get_access_grants
+    if access_control is None:
+        return [('read', 'user', '*')]
+
+    grants = []
+    for permission in ['read', 'write']:
+        permission_access = access_control.get(permission) or {}
+        for principal_type, key in [('user', 'user_ids'), ('group', 'group_ids')]:
+            for principal_id in dict.fromkeys(permission_access.get(key) or []):
+                grants.append((permission, principal_type, principal_id))
+    return grants
+
+
+def upgrade() -> None:
+    existing_tables = get_existing_tables()
+
+    if 'access_grant' not in existing_tables:
+        op.create_table('access_grant',
+        sa.Column('resource_type', sa.Text(), nullable=False),
+        sa.Column('resource_id', sa.Text(), nullable=False),
+        sa.Column('permission', sa.Text(), nullable=False),
+        sa.Column('principal_type', sa.Text(), nullable=False),
+        sa.Column('principal_id', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('resource_type', 'resource_id', 'permission', 'principal_type', 'principal_id', name='pk_access_grant')
+        )
+        op.create_index('ix_access_grant_principal', 'access_grant', ['principal_type', 'principal_id', 'resource_type', 'permission'])
+
+    # Index the `access_control` of every existing resource
+    conn = op.get_bind()
+
+    for resource_type, table_name, id_column in RESOURCES:
+        if table_name not in existing_tables:
+            continue
+
+        table = sa.table(
+            table_name,
+            sa.column(id_column, sa.String()),
+            sa.column('access_control', sa.JSON()),
+        )
+
+        rows = []
+        for resource_id, access_control in conn.execute(
+            sa.select(table.c[id_column], table.c.access_control)
+        ).all():
+            for permission, principal_type, principal_id in get_access_grants(
+                access_control
+            ):
+                rows.append(
+                    {
+                        'resource_type': resource_type,
+                        'resource_id': resource_id,
+                        'permission': permission,
+                        'principal_type': principal_type,
+                        'principal_id': principal_id,
+                    }
+                )
+        if rows:
+            op.bulk_insert(access_grant_table, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_access_grant_principal', table_name='access_grant')
+    op.drop_table('access_grant')
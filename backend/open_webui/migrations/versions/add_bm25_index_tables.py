@@ -0,0 +1,60 @@
+"""add bm25 index tables
+
+Revision ID: add_bm25_index_tables
+Revises: add_chat_message_search_index
+Create Date: 2025-02-14 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from open_webui.migrations.util import get_existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_bm25_index_tables'
+down_revision: Union[str, None] = 'add_chat_message_search_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing_tables = get_existing_tables()
+
+    if 'bm25_collection' not in existing_tables:
+        op.create_table('bm25_collection',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('doc_count', sa.BigInteger(), nullable=True),
+        sa.Column('total_length', sa.BigInteger(), nullable=True),
+        sa.Column('updated_at', sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+    if 'bm25_document' not in existing_tables:
+        op.create_table('bm25_document',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('collection_name', sa.String(), nullable=True),
+        sa.Column('doc_id', sa.String(), nullable=True),
+        sa.Column('length', sa.Integer(), nullable=True),
+        sa.Column('metadata', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('collection_name', 'doc_id', name='uq_bm25_document_collection_doc')
+        )
+        op.create_index('ix_bm25_document_collection_name', 'bm25_document', ['collection_name'])
+
+    if 'bm25_term' not in existing_tables:
+        op.create_table('bm25_term',
+        sa.Column('collection_name', sa.String(), nullable=False),
+        sa.Column('term', sa.String(), nullable=False),
+        sa.Column('postings', sa.LargeBinary(), nullable=True),
+        sa.PrimaryKeyConstraint('collection_name', 'term', name='pk_bm25_term')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('bm25_term')
+    op.drop_index('ix_bm25_document_collection_name', table_name='bm25_document')
+    op.drop_table('bm25_document')
+    op.drop_table('bm25_collection')
@@ -0,0 +1,84 @@
+"""add channel access grants
+
+Revision ID: add_channel_access_grants
+Revises: add_message_page_indexes
+Create Date: 2025-02-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from open_webui.migrations.util import get_existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_channel_access_grants'
+down_revision: Union[str, None] = 'add_message_page_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+access_grant_table = sa.table(
+    'access_grant',
+    sa.column('resource_type', sa.String()),
+    sa.column('resource_id', sa.String()),
+    sa.column('permission', sa.String()),
+    sa.column('principal_type', sa.String()),
+    sa.column('principal_id', sa.String()),
+)
+
+channel_table = sa.table(
+    'channel',
+    sa.column('id', sa.String()),
+    sa.column('access_control', sa.JSON()),
+)
+
+
+def get_access_grants(access_control):
+    # Same rules as open_webui.models.access_grants.get_access_grants
+    if access_control is None:
+        return [('read', 'user', '*')]
+
+    grants = []
+    for permission in ['read', 'write']:
+        permission_access = access_control.get(permission) or {}
+        for principal_type, key in [('user', 'user_ids'), ('group', 'group_ids')]:
+            for principal_id in dict.fromkeys(permission_access.get(key) or []):
+                grants.append((permission, principal_type, principal_id))
+    return grants
+
+
+def upgrade() -> None:
+    if 'channel' not in get_existing_tables():
+        return
+
+    # Index the `access_control` of every existing channel
+    conn = op.get_bind()
+
+    rows = []
+    for channel_id, access_control in conn.execute(
+        sa.select(channel_table.c.id, channel_table.c.access_control)
+    ).all():
+        for permission, principal_type, principal_id in get_access_grants(
+            access_control
+        ):
+            rows.append(
+                {
+                    'resource_type': 'channel',
+                    'resource_id': channel_id,
+                    'permission': permission,
+                    'principal_type': principal_type,
+                    'principal_id': principal_id,
+                }
+            )
+    if rows:
+        op.bulk_insert(access_grant_table, rows)
+
+
+def downgrade() -> None:
+    op.execute(
+        access_grant_table.delete().where(
+            access_grant_table.c.resource_type == 'channel'
+        )
+    )
@@ -0,0 +1,139 @@
+"""add chat_message search index
+
+Revision ID: add_chat_message_search_index
+Revises: add_chat_message_table
+Create Date: 2025-02-12 10:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_chat_message_search_index'
+down_revision: Union[str, None] = 'add_chat_message_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+log = logging.getLogger(__name__)
+
+CHAT_MESSAGE_COLUMNS = (
+    'chat_id, id, parent_id, role, content, data, created_at, updated_at'
+)
+
+
+def _rebuild_chat_message(seq: bool) -> None:
+    # SQLite cannot change the primary key of a table in place
+    if seq:
+        key = 'seq INTEGER PRIMARY KEY,'
+        constraint = 'CONSTRAINT uq_chat_id_message_id UNIQUE (chat_id, id)'
+    else:
+        key = ''
+        constraint = 'CONSTRAINT pk_chat_id_message_id PRIMARY KEY (chat_id, id)'
+
+    op.execute(
+        f"""
+        CREATE TABLE chat_message_new (
+            {key}
+            chat_id VARCHAR NOT NULL,
+            id VARCHAR NOT NULL,
+            parent_id VARCHAR,
+            role VARCHAR,
+            content TEXT,
+            data JSON,
+            created_at BIGINT,
+            updated_at BIGINT,
+            {constraint}
+        )
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO chat_message_new ({CHAT_MESSAGE_COLUMNS})
+        SELECT {CHAT_MESSAGE_COLUMNS} FROM chat_message
+        """
+    )
+    op.execute('DROP TABLE chat_message')
+    op.execute('ALTER TABLE chat_message_new RENAME TO chat_message')
+
+
+def upgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == 'sqlite':
+        # The implicit rowid of a table without an INTEGER PRIMARY KEY may be
+        # renumbered by VACUUM, which would point the index at other messages,
+        # so the rows get a stable `seq` key, (chat_id, id) staying unique
+        _rebuild_chat_message(seq=True)
+
+        # External content FTS5 table over chat_message.content, kept in sync by triggers
+        try:
+            op.execute(
+                """
+                CREATE VIRTUAL TABLE chat_message_fts USING fts5(
+                    content, content='chat_message', content_rowid='seq'
+                )
+                """
+            )
+        except sa.exc.OperationalError as e:
+            log.warning(f"FTS5 is not available, chat search will not be indexed: {e}")
+            return
+
+        op.execute(
+            """
+            CREATE TRIGGER chat_message_fts_insert AFTER INSERT ON chat_message BEGIN
+                INSERT INTO chat_message_fts(rowid, content) VALUES (new.seq, new.content);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER chat_message_fts_delete AFTER DELETE ON chat_message BEGIN
+                INSERT INTO chat_message_fts(chat_message_fts, rowid, content)
+                VALUES ('delete', old.seq, old.content);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER chat_message_fts_update AFTER UPDATE OF content ON chat_message BEGIN
+                INSERT INTO chat_message_fts(chat_message_fts, rowid, content)
+                VALUES ('delete', old.seq, old.content);
+                INSERT INTO chat_message_fts(rowid, content) VALUES (new.seq, new.content);
+            END
+            """
+        )
+        op.execute("INSERT INTO chat_message_fts(chat_message_fts) VALUES ('rebuild')")
+
+    elif dialect_name == 'postgresql':
+        # Generated tsvector column, maintained by Postgres on every write
+        op.execute(
+            """
+            ALTER TABLE chat_message ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED
+            """
+        )
+        op.create_index(
+            'idx_chat_message_search_vector',
+            'chat_message',
+            ['search_vector'],
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS chat_message_fts_insert")
+        op.execute("DROP TRIGGER IF EXISTS chat_message_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS chat_message_fts_update")
+        op.execute("DROP TABLE IF EXISTS chat_message_fts")
+        _rebuild_chat_message(seq=False)
+
+    elif dialect_name == 'postgresql':
+        op.drop_index('idx_chat_message_search_vector', table_name='chat_message')
+        op.drop_column('chat_message', 'search_vector')
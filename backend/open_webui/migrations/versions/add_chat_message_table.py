@@ -0,0 +1,143 @@
+"""add chat_message table
+
+Revision ID: add_chat_message_table
+Revises: add_config_and_document_chunk_tables
+Create Date: 2025-02-10 10:00:00.000000
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from open_webui.migrations.util import get_existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_chat_message_table'
+down_revision: Union[str, None] = 'add_config_and_document_chunk_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+chat_table = sa.table(
+    'chat',
+    sa.column('id', sa.String()),
+    sa.column('chat', sa.JSON()),
+)
+
+chat_message_table = sa.table(
+    'chat_message',
+    sa.column('chat_id', sa.String()),
+    sa.column('id', sa.String()),
+    sa.column('parent_id', sa.String()),
+    sa.column('role', sa.String()),
+    sa.column('content', sa.Text()),
+    sa.column('data', sa.JSON()),
+    sa.column('created_at', sa.BigInteger()),
+    sa.column('updated_at', sa.BigInteger()),
+)
+
+
+def _iter_chats(conn):
+    chat_ids = conn.execute(sa.select(chat_table.c.id)).scalars().all()
+    for i in range(0, len(chat_ids), BATCH_SIZE):
+        yield from conn.execute(
+            sa.select(chat_table.c.id, chat_table.c.chat).where(
+                chat_table.c.id.in_(chat_ids[i : i + BATCH_SIZE])
+            )
+        ).all()
+
+
+def upgrade() -> None:
+    if 'chat_message' not in get_existing_tables():
+        op.create_table('chat_message',
+        sa.Column('chat_id', sa.String(), nullable=False),
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('parent_id', sa.String(), nullable=True),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.BigInteger(), nullable=True),
+        sa.Column('updated_at', sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('chat_id', 'id', name='pk_chat_id_message_id')
+        )
+
+    # Move `history.messages` out of every chat blob into `chat_message` rows
+    conn = op.get_bind()
+    ts = int(time.time())
+
+    for chat_id, chat in _iter_chats(conn):
+        history = (chat or {}).get('history', {})
+        messages = history.get('messages') if isinstance(history, dict) else None
+        if not messages or not isinstance(messages, dict):
+            continue
+
+        rows = []
+        for message_id, message in messages.items():
+            data = {**message}
+            content = data.get('content')
+            if isinstance(content, str):
+                data.pop('content')
+            else:
+                content = None
+
+            rows.append(
+                {
+                    'chat_id': chat_id,
+                    'id': message_id,
+                    'parent_id': data.get('parentId'),
+                    'role': data.get('role'),
+                    'content': content,
+                    'data': data,
+                    'created_at': message.get('timestamp', ts),
+                    'updated_at': ts,
+                }
+            )
+        op.bulk_insert(chat_message_table, rows)
+
+        chat = {key: value for key, value in chat.items() if key != 'messages'}
+        chat['history'] = {**history, 'messages': {}}
+        conn.execute(
+            chat_table.update().where(chat_table.c.id == chat_id).values(chat=chat)
+        )
+
+
+def downgrade() -> None:
+    # Fold the `chat_message` rows back into the chat blobs
+    conn = op.get_bind()
+
+    for chat_id, chat in _iter_chats(conn):
+        rows = conn.execute(
+            sa.select(chat_message_table).where(
+                chat_message_table.c.chat_id == chat_id
+            )
+        ).all()
+        if not rows:
+            continue
+
+        messages = {}
+        for row in rows:
+            message = {**(row.data or {})}
+            if row.content is not None:
+                message['content'] = row.content
+            messages[row.id] = message
+
+        chat = chat or {}
+        history = {**chat.get('history', {}), 'messages': messages}
+
+        # Rebuild the flattened current branch from the parent links
+        message_list = []
+        message = messages.get(history.get('currentId'))
+        while message:
+            message_list.insert(0, message)
+            message = messages.get(message.get('parentId'))
+
+        chat = {**chat, 'history': history, 'messages': message_list}
+        conn.execute(
+            chat_table.update().where(chat_table.c.id == chat_id).values(chat=chat)
+        )
+
+    op.drop_table('chat_message')
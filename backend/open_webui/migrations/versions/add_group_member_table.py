@@ -0,0 +1,91 @@
+"""add group_member table
+
+Revision ID: add_group_member_table
+Revises: add_bm25_index_tables
+Create Date: 2025-02-17 10:00:00.000000
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from open_webui.migrations.util import get_existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_group_member_table'
+down_revision: Union[str, None] = 'add_bm25_index_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+group_table = sa.table(
+    'group',
+    sa.column('id', sa.String()),
+    sa.column('user_ids', sa.JSON()),
+)
+
+group_member_table = sa.table(
+    'group_member',
+    sa.column('group_id', sa.String()),
+    sa.column('user_id', sa.String()),
+    sa.column('created_at', sa.BigInteger()),
+)
+
+
+def upgrade() -> None:
+    if 'group_member' not in get_existing_tables():
+        op.create_table('group_member',
+        sa.Column('group_id', sa.Text(), nullable=False),
+        sa.Column('user_id', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('group_id', 'user_id', name='pk_group_member')
+        )
+        op.create_index('ix_group_member_user_id', 'group_member', ['user_id'])
+
+    # Move the `user_ids` list of every group into `group_member` rows
+    conn = op.get_bind()
+    ts = int(time.time())
+
+    for group_id, user_ids in conn.execute(
+        sa.select(group_table.c.id, group_table.c.user_ids)
+    ).all():
+        if not user_ids or not isinstance(user_ids, list):
+            continue
+
+        op.bulk_insert(
+            group_member_table,
+            [
+                {'group_id': group_id, 'user_id': user_id, 'created_at': ts}
+                for user_id in dict.fromkeys(user_ids)
+            ],
+        )
+        conn.execute(
+            group_table.update()
+            .where(group_table.c.id == group_id)
+            .values(user_ids=None)
+        )
+
+
+def downgrade() -> None:
+    # Fold the `group_member` rows back into the groups
+    conn = op.get_bind()
+
+    user_ids = {}
+    for group_id, user_id in conn.execute(
+        sa.select(group_member_table.c.group_id, group_member_table.c.user_id)
+        .order_by(group_member_table.c.created_at)
+    ).all():
+        user_ids.setdefault(group_id, []).append(user_id)
+
+    conn.execute(group_table.update().values(user_ids=[]))
+    for group_id, group_user_ids in user_ids.items():
+        conn.execute(
+            group_table.update()
+            .where(group_table.c.id == group_id)
+            .values(user_ids=group_user_ids)
+        )
+
+    op.drop_index('ix_group_member_user_id', table_name='group_member')
+    op.drop_table('group_member')
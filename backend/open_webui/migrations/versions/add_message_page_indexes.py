@@ -0,0 +1,38 @@
+"""add message page indexes
+
+Revision ID: add_message_page_indexes
+Revises: add_access_grant_table
+Create Date: 2025-02-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from open_webui.migrations.util import get_existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_message_page_indexes'
+down_revision: Union[str, None] = 'add_access_grant_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing_tables = get_existing_tables()
+
+    if 'message' in existing_tables:
+        # Keyset pagination of the messages of a channel, newest first
+        op.create_index('ix_message_channel_id_created_at', 'message', ['channel_id', 'created_at', 'id'])
+        # Reply counts and thread pages
+        op.create_index('ix_message_parent_id_created_at', 'message', ['parent_id', 'created_at', 'id'])
+
+    if 'message_reaction' in existing_tables:
+        op.create_index('ix_message_reaction_message_id', 'message_reaction', ['message_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_message_reaction_message_id', table_name='message_reaction')
+    op.drop_index('ix_message_parent_id_created_at', table_name='message')
+    op.drop_index('ix_message_channel_id_created_at', table_name='message')
@@ -0,0 +1,157 @@
+import logging
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.groups import Groups
+
+from sqlalchemy import Column, Index, PrimaryKeyConstraint, Text, and_, or_, select
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Principal id of the grant given to every user by `access_control = None`
+ALL_USERS = "*"
+
+####################
+# AccessGrant DB Schema
+####################
+
+
+class AccessGrant(Base):
+    """
+    One row per user or group listed in the `access_control` of a knowledge
+    base, model, prompt, tool or channel, so access checks are indexed lookups instead
+    of loading every resource and reading its JSON.
+    """
+
+    __tablename__ = "access_grant"
+
+    resource_type = Column(Text, nullable=False)  # "knowledge", "channel", ...
+    resource_id = Column(Text, nullable=False)
+    permission = Column(Text, nullable=False)  # "read" or "write"
+
+    principal_type = Column(Text, nullable=False)  # "user" or "group"
+    principal_id = Column(Text, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "resource_type",
+            "resource_id",
+            "permission",
+            "principal_type",
+            "principal_id",
+            name="pk_access_grant",
+        ),
+        Index(
+            "ix_access_grant_principal",
+            "principal_type",
+            "principal_id",
+            "resource_type",
+            "permission",
+        ),
+    )
+
+
+def get_access_grants(access_control: Optional[dict]) -> list[tuple[str, str, str]]:
+    """
+    Returns the (permission, principal_type, principal_id) grants of an
+    `access_control` value, with the same meaning as `has_access`: `None` lets
+    every user read, `{}` leaves access to the owner only.
+    """
+    if access_control is None:
+        return [("read", "user", ALL_USERS)]
+
+    grants = []
+    for permission in ["read", "write"]:
+        permission_access = access_control.get(permission) or {}
+        for principal_type, key in [("user", "user_ids"), ("group", "group_ids")]:
+            for principal_id in dict.fromkeys(permission_access.get(key) or []):
+                grants.append((permission, principal_type, principal_id))
+    return grants
+
+
+class AccessGrantTable:
+    def set_access_grants(
+        self, db, resource_type: str, resource_id: str, access_control: Optional[dict]
+    ):
+        """Replaces the grants of a resource, committed with the caller's session."""
+        self.delete_access_grants(db, resource_type, resource_id)
+        db.add_all(
+            [
+                AccessGrant(
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    permission=permission,
+                    principal_type=principal_type,
+                    principal_id=principal_id,
+                )
+                for permission, principal_type, principal_id in get_access_grants(
+                    access_control
+                )
+            ]
+        )
+
+    def delete_access_grants(
+        self, db, resource_type: str, resource_id: Optional[str] = None
+    ):
+        query = db.query(AccessGrant).filter_by(resource_type=resource_type)
+        if resource_id is not None:
+            query = query.filter_by(resource_id=resource_id)
+        query.delete()
+
+    def get_access_filter(
+        self,
+        resource_type: str,
+        id_column,
+        user_id_column,
+        user_id: str,
+        permission: str = "write",
+    ):
+        """
+        SQL condition matching the resources `user_id` owns or has `permission`
+        on, to filter a query on the table of `id_column` and `user_id_column`.
+        """
+        group_ids = Groups.get_group_ids_by_member_id(user_id)
+
+        granted_ids = select(AccessGrant.resource_id).where(
+            AccessGrant.resource_type == resource_type,
+            AccessGrant.permission == permission,
+            or_(
+                and_(
+                    AccessGrant.principal_type == "user",
+                    AccessGrant.principal_id.in_([user_id, ALL_USERS]),
+                ),
+                and_(
+                    AccessGrant.principal_type == "group",
+                    AccessGrant.principal_id.in_(group_ids),
+                ),
+            ),
+        )
+        return or_(user_id_column == user_id, id_column.in_(granted_ids))
+
+    def can_access(
+        self,
+        resource_type: str,
+        id_column,
+        user_id_column,
+        resource_id: str,
+        user_id: str,
+        permission: str = "write",
+    ) -> bool:
+        """Whether `user_id` owns or has `permission` on a single resource."""
+        with get_db() as db:
+            return (
+                db.query(id_column)
+                .filter(
+                    id_column == resource_id,
+                    self.get_access_filter(
+                        resource_type, id_column, user_id_column, user_id, permission
+                    ),
+                )
+                .first()
+                is not None
+            )
+
+
+AccessGrants = AccessGrantTable()
@@ -0,0 +1,422 @@
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    JSON,
+    LargeBinary,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# BM25 parameters, same defaults as rank_bm25
+K1 = 1.5
+B = 0.75
+
+# Rows touched per IN (...) clause
+BATCH_SIZE = 500
+
+####################
+# BM25 Index DB Schema
+####################
+
+
+class BM25Collection(Base):
+    __tablename__ = "bm25_collection"
+
+    name = Column(String, primary_key=True)
+    doc_count = Column(BigInteger, default=0)
+    total_length = Column(BigInteger, default=0)
+
+    updated_at = Column(BigInteger)
+
+
+class BM25Document(Base):
+    __tablename__ = "bm25_document"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection_name = Column(String, index=True)
+    doc_id = Column(String)
+
+    # The text stays in the vector DB, only what scoring and filtered deletes
+    # need is kept here
+    length = Column(Integer)
+    meta = Column("metadata", JSON, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "collection_name", "doc_id", name="uq_bm25_document_collection_doc"
+        ),
+    )
+
+
+class BM25Term(Base):
+    __tablename__ = "bm25_term"
+
+    collection_name = Column(String)
+    term = Column(String)
+
+    # Postings of the term packed as uint32 (document id, term frequency,
+    # document length) triples, so a query never has to load documents to score
+    postings = Column(LargeBinary)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("collection_name", "term", name="pk_bm25_term"),
+    )
+
+
+class BM25SearchResult(BaseModel):
+    doc_id: str
+    score: float
+
+
+####################
+# Helpers
+####################
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def pack_postings(postings: np.ndarray) -> bytes:
+    return postings.astype(np.uint32).tobytes()
+
+
+def unpack_postings(data: Optional[bytes]) -> np.ndarray:
+    if not data:
+        return np.empty((0, 3), dtype=np.uint32)
+    return np.frombuffer(data, dtype=np.uint32).reshape(-1, 3)
+
+
+class BM25IndexTable:
+    def has_collection(self, collection_name: str) -> bool:
+        with get_db() as db:
+            return db.get(BM25Collection, collection_name) is not None
+
+    def add_documents(
+        self,
+        collection_name: str,
+        ids: list[str],
+        texts: list[str],
+        metadatas: Optional[list[Optional[dict]]] = None,
+    ) -> bool:
+        """
+        Adds documents to the index of `collection_name`, replacing documents
+        that are already indexed under the same ids.
+        """
+        metadatas = metadatas or [None] * len(ids)
+
+        # Two writers indexing a new collection both insert it, and the one
+        # that fails on its unique name is retried once the row exists
+        for attempt in range(2):
+            try:
+                with get_db() as db:
+                    self._add_documents(db, collection_name, ids, texts, metadatas)
+                    db.commit()
+                    return True
+            except IntegrityError as e:
+                if attempt == 0:
+                    continue
+                log.exception(f"Error indexing documents of {collection_name}: {e}")
+            except Exception as e:
+                log.exception(f"Error indexing documents of {collection_name}: {e}")
+                break
+        return False
+
+    def delete_documents(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ) -> bool:
+        try:
+            with get_db() as db:
+                collection = (
+                    db.query(BM25Collection)
+                    .filter_by(name=collection_name)
+                    .with_for_update()
+                    .first()
+                )
+                if collection is None:
+                    return True
+
+                if filter:
+                    ids = [
+                        doc_id
+                        for doc_id, metadata in db.query(
+                            BM25Document.doc_id, BM25Document.meta
+                        ).filter_by(collection_name=collection_name)
+                        if all(
+                            (metadata or {}).get(key) == value
+                            for key, value in filter.items()
+                        )
+                    ]
+
+                self._delete_documents(db, collection, ids or [])
+                db.commit()
+                return True
+        except Exception as e:
+            log.exception(f"Error deleting documents from {collection_name}: {e}")
+            return False
+
+    def delete_collection(self, collection_name: str) -> bool:
+        try:
+            with get_db() as db:
+                db.query(BM25Term).filter_by(collection_name=collection_name).delete()
+                db.query(BM25Document).filter_by(
+                    collection_name=collection_name
+                ).delete()
+                db.query(BM25Collection).filter_by(name=collection_name).delete()
+                db.commit()
+                return True
+        except Exception as e:
+            log.exception(f"Error deleting index of {collection_name}: {e}")
+            return False
+
+    def reset(self) -> bool:
+        try:
+            with get_db() as db:
+                db.query(BM25Term).delete()
+                db.query(BM25Document).delete()
+                db.query(BM25Collection).delete()
+                db.commit()
+                return True
+        except Exception as e:
+            log.exception(f"Error resetting BM25 index: {e}")
+            return False
+
+    def search(
+        self, collection_name: str, query: str, k: int
+    ) -> list[BM25SearchResult]:
+        """
+        Returns the `k` best BM25 matches for `query`. Only the postings of the
+        query terms and the matched documents are read.
+        """
+        terms = Counter(tokenize(query))
+        if not terms or k <= 0:
+            return []
+
+        with get_db() as db:
+            collection = db.get(BM25Collection, collection_name)
+            if not collection or not collection.doc_count:
+                return []
+
+            doc_count = collection.doc_count
+            avg_length = collection.total_length / doc_count or 1
+
+            rows = (
+                db.query(BM25Term.term, BM25Term.postings)
+                .filter(
+                    BM25Term.collection_name == collection_name,
+                    BM25Term.term.in_(list(terms)),
+                )
+                .all()
+            )
+
+            doc_keys = []
+            doc_scores = []
+            for term, data in rows:
+                postings = unpack_postings(data)
+                if len(postings) == 0:
+                    continue
+
+                df = len(postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                tf = postings[:, 1].astype(np.float64)
+                length = postings[:, 2].astype(np.float64)
+
+                doc_keys.append(postings[:, 0])
+                doc_scores.append(
+                    terms[term]
+                    * idf
+                    * tf
+                    * (K1 + 1)
+                    / (tf + K1 * (1 - B + B * length / avg_length))
+                )
+
+            if not doc_keys:
+                return []
+
+            keys, inverse = np.unique(np.concatenate(doc_keys), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(doc_scores))
+
+            top = np.argsort(-scores, kind="stable")[:k]
+            top_keys = [int(key) for key in keys[top]]
+            top_scores = {int(keys[i]): float(scores[i]) for i in top}
+
+            doc_ids = dict(
+                db.query(BM25Document.id, BM25Document.doc_id)
+                .filter(BM25Document.id.in_(top_keys))
+                .all()
+            )
+
+            return [
+                BM25SearchResult(doc_id=doc_ids[key], score=top_scores[key])
+                for key in top_keys
+                if key in doc_ids
+            ]
+
+    def _add_documents(
+        self,
+        db,
+        collection_name: str,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[Optional[dict]],
+    ):
+        # The collection row is locked first so concurrent writers of the same
+        # collection queue up instead of deadlocking on term rows
+        collection = self._get_collection_for_update(db, collection_name)
+        self._delete_documents(db, collection, ids)
+
+        documents = []
+        tokens = []
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            terms = tokenize(text or "")
+            document = BM25Document(
+                collection_name=collection_name,
+                doc_id=doc_id,
+                length=len(terms),
+                meta=metadata,
+            )
+            documents.append(document)
+            tokens.append(terms)
+
+        db.add_all(documents)
+        db.flush()
+
+        new_postings: dict[str, list[tuple[int, int, int]]] = {}
+        for document, terms in zip(documents, tokens):
+            for term, tf in Counter(terms).items():
+                new_postings.setdefault(term, []).append(
+                    (document.id, tf, document.length)
+                )
+
+        self._update_postings(
+            db,
+            collection_name,
+            new_postings.keys(),
+            lambda term, postings: np.concatenate(
+                [postings, np.array(new_postings[term], dtype=np.uint32)]
+            ),
+        )
+
+        collection.doc_count += len(documents)
+        collection.total_length += sum(d.length for d in documents)
+        collection.updated_at = int(time.time())
+
+    def _get_collection_for_update(self, db, collection_name: str) -> BM25Collection:
+        collection = (
+            db.query(BM25Collection)
+            .filter_by(name=collection_name)
+            .with_for_update()
+            .first()
+        )
+        if collection is None:
+            collection = BM25Collection(
+                name=collection_name,
+                doc_count=0,
+                total_length=0,
+                updated_at=int(time.time()),
+            )
+            db.add(collection)
+            db.flush()
+        return collection
+
+    def _update_postings(self, db, collection_name: str, terms, update):
+        terms = list(terms)
+        for i in range(0, len(terms), BATCH_SIZE):
+            batch = terms[i : i + BATCH_SIZE]
+            existing = {
+                row.term: row
+                for row in db.query(BM25Term)
+                .filter(
+                    BM25Term.collection_name == collection_name,
+                    BM25Term.term.in_(batch),
+                )
+                .with_for_update()
+                .all()
+            }
+
+            for term in batch:
+                row = existing.get(term)
+                current = unpack_postings(row.postings if row else None)
+                postings = update(term, current)
+
+                if len(postings) == len(current):
+                    continue
+                elif len(postings) == 0:
+                    if row:
+                        db.delete(row)
+                elif row:
+                    row.postings = pack_postings(postings)
+                else:
+                    db.add(
+                        BM25Term(
+                            collection_name=collection_name,
+                            term=term,
+                            postings=pack_postings(postings),
+                        )
+                    )
+            db.flush()
+
+    def _delete_documents(self, db, collection: BM25Collection, ids: list[str]):
+        collection_name = collection.name
+        documents = []
+        for i in range(0, len(ids), BATCH_SIZE):
+            documents.extend(
+                db.query(BM25Document)
+                .filter(
+                    BM25Document.collection_name == collection_name,
+                    BM25Document.doc_id.in_(ids[i : i + BATCH_SIZE]),
+                )
+                .all()
+            )
+        if not documents:
+            return
+
+        # Documents do not keep their text, so the terms they had are not known
+        # and the postings of every term of the collection are filtered
+        removed_keys = np.array([document.id for document in documents])
+        terms = [
+            term
+            for (term,) in db.query(BM25Term.term).filter_by(
+                collection_name=collection_name
+            )
+        ]
+        self._update_postings(
+            db,
+            collection_name,
+            terms,
+            lambda term, postings: postings[~np.isin(postings[:, 0], removed_keys)],
+        )
+
+        collection.doc_count = max(collection.doc_count - len(documents), 0)
+        collection.total_length = max(
+            collection.total_length - sum(d.length for d in documents), 0
+        )
+        collection.updated_at = int(time.time())
+
+        for document in documents:
+            db.delete(document)
+        db.flush()
+
+
+BM25Index = BM25IndexTable()
@@ -4,7 +4,7 @@ import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
-from open_webui.utils.access_control import has_access
+from open_webui.models.access_grants import AccessGrants
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
@@ -85,6 +85,9 @@ class ChannelTable:
             new_channel = Channel(**channel.model_dump())
 
             db.add(new_channel)
+            AccessGrants.set_access_grants(
+                db, "channel", channel.id, channel.access_control
+            )
             db.commit()
             return channel
 
@@ -96,13 +99,26 @@ class ChannelTable:
     def get_channels_by_user_id(
         self, user_id: str, permission: str = "read"
     ) -> list[ChannelModel]:
-        channels = self.get_channels()
-        return [
-            channel
-            for channel in channels
-            if channel.user_id == user_id
-            or has_access(user_id, permission, channel.access_control)
-        ]
+        with get_db() as db:
+            channels = db.query(Channel).filter(
+                AccessGrants.get_access_filter(
+                    "channel", Channel.id, Channel.user_id, user_id, permission
+                )
+            )
+            return [ChannelModel.model_validate(channel) for channel in channels]
+
+    def get_channel_ids_by_user_id(
+        self, user_id: str, permission: str = "read"
+    ) -> list[str]:
+        with get_db() as db:
+            return [
+                id
+                for (id,) in db.query(Channel.id).filter(
+                    AccessGrants.get_access_filter(
+                        "channel", Channel.id, Channel.user_id, user_id, permission
+                    )
+                )
+            ]
 
     def get_channel_by_id(self, id: str) -> Optional[ChannelModel]:
         with get_db() as db:
@@ -122,6 +138,7 @@ class ChannelTable:
             channel.meta = form_data.meta
             channel.access_control = form_data.access_control
             channel.updated_at = int(time.time_ns())
+            AccessGrants.set_access_grants(db, "channel", id, form_data.access_control)
 
             db.commit()
             return ChannelModel.model_validate(channel) if channel else None
@@ -129,6 +146,7 @@ class ChannelTable:
     def delete_channel_by_id(self, id: str):
         with get_db() as db:
             db.query(Channel).filter(Channel.id == id).delete()
+            AccessGrants.delete_access_grants(db, "channel", id)
             db.commit()
             return True
 
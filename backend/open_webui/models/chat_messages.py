@@ -0,0 +1,285 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, String, Text, JSON, PrimaryKeyConstraint
+from sqlalchemy import func
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# ChatMessage DB Schema
+####################
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    chat_id = Column(String)
+    id = Column(String)
+
+    parent_id = Column(String, nullable=True)
+    role = Column(String, nullable=True)
+
+    # `content` is kept in its own column so that streamed deltas can be appended
+    # in SQL without touching the rest of the message
+    content = Column(Text, nullable=True)
+    data = Column(JSON, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+    # On SQLite the table also has an INTEGER PRIMARY KEY `seq`, the stable
+    # rowid of the full-text search index, with (chat_id, id) being unique
+    __table_args__ = (
+        PrimaryKeyConstraint("chat_id", "id", name="pk_chat_id_message_id"),
+    )
+
+
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    chat_id: str
+    id: str
+
+    parent_id: Optional[str] = None
+    role: Optional[str] = None
+
+    content: Optional[str] = None
+    data: Optional[dict] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+####################
+# Helpers
+####################
+
+
+def split_message(message: dict) -> dict:
+    """
+    Splits a `history.messages` entry into the columns of a `chat_message` row.
+    """
+    data = {**message}
+    content = data.get("content")
+
+    if isinstance(content, str):
+        data.pop("content")
+    else:
+        content = None
+
+    return {
+        "parent_id": data.get("parentId"),
+        "role": data.get("role"),
+        "content": content,
+        "data": data,
+    }
+
+
+def to_message(chat_message) -> dict:
+    """
+    Rebuilds the `history.messages` entry stored in a `chat_message` row.
+    """
+    message = {**(chat_message.data or {})}
+    if chat_message.content is not None:
+        message["content"] = chat_message.content
+    return message
+
+
+class ChatMessageTable:
+    def upsert_message(
+        self, chat_id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        try:
+            with get_db() as db:
+                ts = int(time.time())
+                chat_message = db.get(ChatMessage, (chat_id, message_id))
+
+                if chat_message:
+                    message = {**to_message(chat_message), **message}
+                    for key, value in split_message(message).items():
+                        setattr(chat_message, key, value)
+                    chat_message.updated_at = ts
+                else:
+                    chat_message = ChatMessage(
+                        **{
+                            "chat_id": chat_id,
+                            "id": message_id,
+                            **split_message(message),
+                            "created_at": ts,
+                            "updated_at": ts,
+                        }
+                    )
+                    db.add(chat_message)
+
+                db.commit()
+                db.refresh(chat_message)
+                return ChatMessageModel.model_validate(chat_message)
+        except Exception as e:
+            log.exception(f"Error upserting message {chat_id}/{message_id}: {e}")
+            return None
+
+    def append_message_content(
+        self, chat_id: str, message_id: str, content: str
+    ) -> bool:
+        """
+        Appends `content` to the stored message content with a single UPDATE,
+        without reading the row back.
+        """
+        try:
+            with get_db() as db:
+                result = (
+                    db.query(ChatMessage)
+                    .filter_by(chat_id=chat_id, id=message_id)
+                    .update(
+                        {
+                            "content": func.coalesce(ChatMessage.content, "") + content,
+                            "updated_at": int(time.time()),
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                return result > 0
+        except Exception as e:
+            log.exception(f"Error appending to message {chat_id}/{message_id}: {e}")
+            return False
+
+    def add_message_status(
+        self, chat_id: str, message_id: str, status: dict
+    ) -> Optional[ChatMessageModel]:
+        with get_db() as db:
+            chat_message = db.get(ChatMessage, (chat_id, message_id))
+            if chat_message is None:
+                return None
+
+            data = {**(chat_message.data or {})}
+            data["statusHistory"] = [*data.get("statusHistory", []), status]
+
+            chat_message.data = data
+            chat_message.updated_at = int(time.time())
+            db.commit()
+            db.refresh(chat_message)
+            return ChatMessageModel.model_validate(chat_message)
+
+    def insert_messages(self, chat_id: str, messages: dict) -> None:
+        if not messages:
+            return
+
+        with get_db() as db:
+            ts = int(time.time())
+            db.add_all(
+                [
+                    ChatMessage(
+                        **{
+                            "chat_id": chat_id,
+                            "id": message_id,
+                            **split_message(message),
+                            "created_at": ts,
+                            "updated_at": ts,
+                        }
+                    )
+                    for message_id, message in messages.items()
+                ]
+            )
+            db.commit()
+
+    def sync_messages(self, chat_id: str, messages: dict) -> None:
+        """
+        Makes the stored rows of a chat match `messages`, only writing the rows
+        that actually changed. An empty `messages` deletes all of them.
+        """
+        with get_db() as db:
+            ts = int(time.time())
+            existing = {
+                chat_message.id: chat_message
+                for chat_message in db.query(ChatMessage).filter_by(chat_id=chat_id)
+            }
+
+            for message_id, message in messages.items():
+                chat_message = existing.pop(message_id, None)
+                if chat_message is None:
+                    db.add(
+                        ChatMessage(
+                            **{
+                                "chat_id": chat_id,
+                                "id": message_id,
+                                **split_message(message),
+                                "created_at": ts,
+                                "updated_at": ts,
+                            }
+                        )
+                    )
+                elif to_message(chat_message) != message:
+                    for key, value in split_message(message).items():
+                        setattr(chat_message, key, value)
+                    chat_message.updated_at = ts
+
+            if existing:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id == chat_id,
+                    ChatMessage.id.in_(list(existing.keys())),
+                ).delete(synchronize_session=False)
+
+            db.commit()
+
+    def copy_messages(self, source_chat_id: str, target_chat_id: str) -> None:
+        self.delete_messages_by_chat_id(target_chat_id)
+        self.insert_messages(
+            target_chat_id, self.get_messages_by_chat_id(source_chat_id)
+        )
+
+    def get_message_by_chat_id_and_message_id(
+        self, chat_id: str, message_id: str
+    ) -> Optional[dict]:
+        with get_db() as db:
+            chat_message = db.get(ChatMessage, (chat_id, message_id))
+            return to_message(chat_message) if chat_message else None
+
+    def get_messages_by_chat_id(self, chat_id: str) -> dict:
+        with get_db() as db:
+            return {
+                chat_message.id: to_message(chat_message)
+                for chat_message in db.query(ChatMessage)
+                .filter_by(chat_id=chat_id)
+                .order_by(ChatMessage.created_at.asc())
+            }
+
+    def get_messages_by_chat_ids(self, chat_ids: list[str]) -> dict[str, dict]:
+        if not chat_ids:
+            return {}
+
+        with get_db() as db:
+            messages = {}
+            for chat_message in (
+                db.query(ChatMessage)
+                .filter(ChatMessage.chat_id.in_(chat_ids))
+                .order_by(ChatMessage.created_at.asc())
+            ):
+                messages.setdefault(chat_message.chat_id, {})[chat_message.id] = (
+                    to_message(chat_message)
+                )
+            return messages
+
+    def delete_messages_by_chat_id(self, chat_id: str) -> bool:
+        return self.delete_messages_by_chat_ids([chat_id])
+
+    def delete_messages_by_chat_ids(self, chat_ids: list[str]) -> bool:
+        try:
+            with get_db() as db:
+                db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).delete(
+                    synchronize_session=False
+                )
+                db.commit()
+                return True
+        except Exception:
+            return False
+
+
+ChatMessages = ChatMessageTable()
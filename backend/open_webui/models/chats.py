@@ -1,16 +1,23 @@
 import logging
 import json
+import re
 import time
 import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
+from open_webui.models.chat_messages import (
+    ChatMessage,
+    ChatMessageModel,
+    ChatMessages,
+)
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.misc import get_message_list
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import BigInteger, Boolean, Column, Float, String, Text, JSON
+from sqlalchemy import or_, func, select, and_, text, inspect
 from sqlalchemy.sql import exists
 
 ####################
@@ -104,10 +111,78 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+####################
+# Message storage
+####################
+
+
+def split_chat(chat: dict) -> tuple[dict, dict]:
+    """
+    Splits a chat dict into the blob stored in `chat.chat` and its
+    `history.messages`, which are stored as `chat_message` rows.
+    """
+    history = chat.get("history", {})
+    messages = history.get("messages") if isinstance(history, dict) else None
+
+    if not messages or not isinstance(messages, dict):
+        return chat, {}
+
+    # `messages` is the flattened current branch of `history.messages` and is
+    # rebuilt from the rows when the chat is read back
+    chat = {key: value for key, value in chat.items() if key != "messages"}
+    chat["history"] = {**history, "messages": {}}
+    return chat, messages
+
+
+def merge_chat(chat: dict, messages: dict) -> dict:
+    """
+    Rebuilds the chat dict returned by the API from the stored blob and its
+    `chat_message` rows.
+    """
+    if not messages:
+        return chat
+
+    history = chat.get("history", {})
+    history = {
+        **history,
+        "messages": {**(history.get("messages") or {}), **messages},
+    }
+
+    return {
+        **chat,
+        "history": history,
+        "messages": get_message_list(history["messages"], history.get("currentId")),
+    }
+
+
 class ChatTable:
+    def __init__(self):
+        # Whether the full-text search index exists, resolved on first search
+        self._search_index: Optional[bool] = None
+
+    def _to_chat_model(self, chat: Chat) -> ChatModel:
+        chat_model = ChatModel.model_validate(chat)
+        chat_model.chat = merge_chat(
+            chat_model.chat, ChatMessages.get_messages_by_chat_id(chat_model.id)
+        )
+        return chat_model
+
+    def _to_chat_models(self, chats: list[Chat]) -> list[ChatModel]:
+        chat_models = [ChatModel.model_validate(chat) for chat in chats]
+        messages = ChatMessages.get_messages_by_chat_ids(
+            [chat_model.id for chat_model in chat_models]
+        )
+
+        for chat_model in chat_models:
+            chat_model.chat = merge_chat(
+                chat_model.chat, messages.get(chat_model.id, {})
+            )
+        return chat_models
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
+            chat, messages = split_chat(form_data.chat)
             chat = ChatModel(
                 **{
                     "id": id,
@@ -117,7 +192,7 @@ class ChatTable:
                         if "title" in form_data.chat
                         else "New Chat"
                     ),
-                    "chat": form_data.chat,
+                    "chat": chat,
                     "created_at": int(time.time()),
                     "updated_at": int(time.time()),
                 }
@@ -127,13 +202,16 @@ class ChatTable:
             db.add(result)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+
+            ChatMessages.insert_messages(id, messages)
+            return self._to_chat_model(result) if result else None
 
     def import_chat(
         self, user_id: str, form_data: ChatImportForm
     ) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
+            chat, messages = split_chat(form_data.chat)
             chat = ChatModel(
                 **{
                     "id": id,
@@ -143,7 +221,7 @@ class ChatTable:
                         if "title" in form_data.chat
                         else "New Chat"
                     ),
-                    "chat": form_data.chat,
+                    "chat": chat,
                     "meta": form_data.meta,
                     "pinned": form_data.pinned,
                     "folder_id": form_data.folder_id,
@@ -156,31 +234,40 @@ class ChatTable:
             db.add(result)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+
+            ChatMessages.insert_messages(id, messages)
+            return self._to_chat_model(result) if result else None
 
     def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat_item = db.get(Chat, id)
-                chat_item.chat = chat
+                chat_item.chat, messages = split_chat(chat)
+                # Also without messages, so the rows of removed ones are deleted
+                ChatMessages.sync_messages(id, messages)
+
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return self._to_chat_model(chat_item)
         except Exception:
             return None
 
     def update_chat_title_by_id(self, id: str, title: str) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        chat["title"] = title
+        try:
+            with get_db() as db:
+                chat_item = db.get(Chat, id)
+                chat_item.chat = {**chat_item.chat, "title": title}
+                chat_item.title = title
+                chat_item.updated_at = int(time.time())
+                db.commit()
+                db.refresh(chat_item)
 
-        return self.update_chat_by_id(id, chat)
+                return self._to_chat_model(chat_item)
+        except Exception:
+            return None
 
     def update_chat_tags_by_id(
         self, id: str, tags: list[str], user
@@ -219,6 +306,11 @@ class ChatTable:
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
+        message = ChatMessages.get_message_by_chat_id_and_message_id(id, message_id)
+        if message is not None:
+            return message
+
+        # Chats written before `chat_message` existed keep their messages in the blob
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -227,44 +319,39 @@ class ChatTable:
 
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+    ) -> Optional[ChatMessageModel]:
+        """
+        Merges `message` into a single `chat_message` row, only rewriting the
+        chat blob when `history.currentId` moves.
+        """
+        with get_db() as db:
+            chat_item = db.get(Chat, id)
+            if chat_item is None:
+                return None
+
+            chat = chat_item.chat
+            if chat.get("history", {}).get("messages"):
+                # Move a chat that still stores its messages in the blob over to
+                # `chat_message` rows before patching it
+                chat, messages = split_chat(chat)
+                ChatMessages.sync_messages(id, messages)
+                chat_item.chat = chat
 
-        history["currentId"] = message_id
+            history = chat.get("history", {})
+            if history.get("currentId") != message_id:
+                chat_item.chat = {
+                    **chat,
+                    "history": {**history, "currentId": message_id},
+                }
+            chat_item.updated_at = int(time.time())
+            db.commit()
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return ChatMessages.upsert_message(id, message_id, message)
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
-
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+    ) -> Optional[ChatMessageModel]:
+        return ChatMessages.add_message_status(id, message_id, status)
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -289,6 +376,8 @@ class ChatTable:
             db.commit()
             db.refresh(shared_result)
 
+            ChatMessages.copy_messages(chat_id, shared_chat.id)
+
             # Update the original chat with the share_id
             result = (
                 db.query(Chat)
@@ -296,7 +385,11 @@ class ChatTable:
                 .update({"share_id": shared_chat.id})
             )
             db.commit()
-            return shared_chat if (shared_result and result) else None
+            return (
+                self._to_chat_model(shared_result)
+                if (shared_result and result)
+                else None
+            )
 
     def update_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         try:
@@ -311,18 +404,26 @@ class ChatTable:
 
                 shared_chat.title = chat.title
                 shared_chat.chat = chat.chat
+                ChatMessages.copy_messages(chat_id, shared_chat.id)
 
                 shared_chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(shared_chat)
 
-                return ChatModel.model_validate(shared_chat)
+                return self._to_chat_model(shared_chat)
         except Exception:
             return None
 
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
+                shared_chat_ids = select(Chat.id).where(
+                    Chat.user_id == f"shared-{chat_id}"
+                )
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(shared_chat_ids)
+                ).delete(synchronize_session=False)
+
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
@@ -339,7 +440,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -351,7 +452,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -363,7 +464,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -507,7 +608,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -529,7 +630,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -540,7 +641,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -549,7 +650,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -567,7 +668,96 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
+
+    def has_search_index(self, db) -> bool:
+        if self._search_index is None:
+            dialect_name = db.bind.dialect.name
+            inspector = inspect(db.bind)
+
+            if dialect_name == "sqlite":
+                self._search_index = inspector.has_table("chat_message_fts")
+            elif dialect_name == "postgresql":
+                self._search_index = any(
+                    column["name"] == "search_vector"
+                    for column in inspector.get_columns("chat_message")
+                )
+            else:
+                self._search_index = False
+
+        return self._search_index
+
+    def _get_message_search_matches(self, db, search_text: str):
+        """
+        Returns a subquery of (chat_id, rank) for the chats with messages matching
+        every word of `search_text` as a prefix, lower rank being a better match,
+        or None if there is no search index to query.
+        """
+        words = re.findall(r"\w+", search_text)
+        if not words or not self.has_search_index(db):
+            return None
+
+        if db.bind.dialect.name == "sqlite":
+            matches = text(
+                """
+                SELECT chat_message.chat_id AS chat_id, MIN(fts.rank) AS rank
+                FROM (
+                    SELECT rowid, rank FROM chat_message_fts
+                    WHERE chat_message_fts MATCH :query
+                ) AS fts
+                JOIN chat_message ON chat_message.seq = fts.rowid
+                GROUP BY chat_message.chat_id
+                """
+            ).bindparams(query=" ".join(f'"{word}"*' for word in words))
+        else:
+            matches = text(
+                """
+                SELECT chat_message.chat_id AS chat_id,
+                    -MAX(ts_rank(chat_message.search_vector, to_tsquery('simple', :query))) AS rank
+                FROM chat_message
+                WHERE chat_message.search_vector @@ to_tsquery('simple', :query)
+                GROUP BY chat_message.chat_id
+                """
+            ).bindparams(query=" & ".join(f"{word}:*" for word in words))
+
+        return matches.columns(chat_id=String, rank=Float).subquery("message_matches")
+
+    def rebuild_search_index(self) -> int:
+        """
+        Moves messages of chats that still keep them in the chat blob over to
+        `chat_message` rows and rebuilds the full-text search index.
+        Returns the number of chats that were moved.
+        """
+        moved = 0
+        with get_db() as db:
+            chat_ids = [chat_id for (chat_id,) in db.query(Chat.id)]
+
+        for chat_id in chat_ids:
+            with get_db() as db:
+                chat_item = db.get(Chat, chat_id)
+                chat, messages = split_chat(chat_item.chat or {})
+                if not messages:
+                    continue
+
+                ChatMessages.sync_messages(chat_id, messages)
+                chat_item.chat = chat
+                db.commit()
+                moved += 1
+
+        with get_db() as db:
+            if db.bind.dialect.name == "sqlite" and self.has_search_index(db):
+                db.execute(
+                    text(
+                        "INSERT INTO chat_message_fts(chat_message_fts) VALUES ('rebuild')"
+                    )
+                )
+                db.commit()
+            elif db.bind.dialect.name == "postgresql" and self.has_search_index(db):
+                # The tsvector column is generated, only the index can be rebuilt
+                db.execute(text("REINDEX INDEX idx_chat_message_search_vector"))
+                db.commit()
+
+        return moved
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -578,7 +768,10 @@ class ChatTable:
         limit: int = 60,
     ) -> list[ChatModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Filters chats based on a search query, allowing pagination using skip and limit.
+
+        Message content is matched through the full-text search index when it
+        exists, and chats are ranked by how well their best message matches.
         """
         search_text = search_text.lower().strip()
 
@@ -608,29 +801,38 @@ class ChatTable:
             if not include_archived:
                 query = query.filter(Chat.archived == False)
 
-            query = query.order_by(Chat.updated_at.desc())
+            message_matches = self._get_message_search_matches(db, search_text)
+            if message_matches is not None:
+                query = query.outerjoin(
+                    message_matches, message_matches.c.chat_id == Chat.id
+                )
+                query = query.filter(
+                    Chat.title.ilike(
+                        f"%{search_text}%"
+                    )  # Case-insensitive search in title
+                    | message_matches.c.chat_id.isnot(None)
+                )
+                # Best matching chats first, title-only matches after them
+                query = query.order_by(
+                    message_matches.c.rank.is_(None),
+                    message_matches.c.rank.asc(),
+                    Chat.updated_at.desc(),
+                )
+            else:
+                query = query.filter(
+                    Chat.title.ilike(
+                        f"%{search_text}%"
+                    )  # Case-insensitive search in title
+                    | exists().where(
+                        ChatMessage.chat_id == Chat.id,
+                        func.lower(ChatMessage.content).like(f"%{search_text}%"),
+                    )
+                )
+                query = query.order_by(Chat.updated_at.desc())
 
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
             if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                query = query.filter(
-                    (
-                        Chat.title.ilike(
-                            f"%{search_text}%"
-                        )  # Case-insensitive search in title
-                        | text(
-                            """
-                            EXISTS (
-                                SELECT 1 
-                                FROM json_each(Chat.chat, '$.messages') AS message 
-                                WHERE LOWER(message.value->>'content') LIKE '%' || :search_text || '%'
-                            )
-                            """
-                        )
-                    ).params(search_text=search_text)
-                )
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -662,24 +864,6 @@ class ChatTable:
                     )
 
             elif dialect_name == "postgresql":
-                # PostgreSQL relies on proper JSON query for search
-                query = query.filter(
-                    (
-                        Chat.title.ilike(
-                            f"%{search_text}%"
-                        )  # Case-insensitive search in title
-                        | text(
-                            """
-                            EXISTS (
-                                SELECT 1
-                                FROM json_array_elements(Chat.chat->'messages') AS message
-                                WHERE LOWER(message->>'content') LIKE '%' || :search_text || '%'
-                            )
-                            """
-                        )
-                    ).params(search_text=search_text)
-                )
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -748,7 +932,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -761,7 +945,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -821,7 +1005,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat)
         except Exception:
             return None
 
@@ -897,6 +1081,7 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -907,7 +1092,8 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                if db.query(Chat).filter_by(id=id, user_id=user_id).delete():
+                    db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -919,6 +1105,11 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -931,6 +1122,13 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(
+                            Chat.user_id == user_id, Chat.folder_id == folder_id
+                        )
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -944,6 +1142,11 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id.in_(shared_chat_ids))
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
                 db.commit()
 
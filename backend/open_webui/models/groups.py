@@ -1,6 +1,7 @@
 import json
 import logging
 import time
+from contextvars import ContextVar
 from typing import Optional
 import uuid
 
@@ -11,7 +12,14 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    Text,
+    JSON,
+    PrimaryKeyConstraint,
+)
 
 
 log = logging.getLogger(__name__)
@@ -35,12 +43,25 @@ class Group(Base):
     meta = Column(JSON, nullable=True)
 
     permissions = Column(JSON, nullable=True)
-    user_ids = Column(JSON, nullable=True)
 
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("group_id", "user_id", name="pk_group_member"),
+        Index("ix_group_member_user_id", "user_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -87,6 +108,55 @@ class GroupUpdateForm(GroupForm):
     user_ids: Optional[list[str]] = None
 
 
+# Groups of the users looked up while handling the current request, as
+# {user_id: {group_id: permissions}}. Set by the HTTP middleware, outside of a
+# request every lookup goes to the database.
+REQUEST_GROUP_MEMBERSHIPS: ContextVar[Optional[dict]] = ContextVar(
+    "request_group_memberships", default=None
+)
+
+
+def clear_request_group_memberships():
+    memberships = REQUEST_GROUP_MEMBERSHIPS.get()
+    if memberships:
+        memberships.clear()
+
+
+def get_group_user_ids(db, group_ids: list[str]) -> dict[str, list[str]]:
+    user_ids = {group_id: [] for group_id in group_ids}
+    if group_ids:
+        for group_id, user_id in (
+            db.query(GroupMember.group_id, GroupMember.user_id)
+            .filter(GroupMember.group_id.in_(group_ids))
+            .order_by(GroupMember.created_at)
+            .all()
+        ):
+            user_ids[group_id].append(user_id)
+    return user_ids
+
+
+def get_group_models(db, groups: list[Group]) -> list[GroupModel]:
+    user_ids = get_group_user_ids(db, [group.id for group in groups])
+    return [
+        GroupModel.model_validate(group).model_copy(
+            update={"user_ids": user_ids[group.id]}
+        )
+        for group in groups
+    ]
+
+
+def set_group_user_ids(db, group_id: str, user_ids: list[str]):
+    db.query(GroupMember).filter_by(group_id=group_id).delete()
+    now = int(time.time())
+    db.add_all(
+        [
+            GroupMember(group_id=group_id, user_id=user_id, created_at=now)
+            for user_id in dict.fromkeys(user_ids)
+        ]
+    )
+    clear_request_group_memberships()
+
+
 class GroupTable:
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
@@ -103,7 +173,7 @@ class GroupTable:
             )
 
             try:
-                result = Group(**group.model_dump())
+                result = Group(**group.model_dump(exclude={"user_ids"}))
                 db.add(result)
                 db.commit()
                 db.refresh(result)
@@ -117,40 +187,60 @@ class GroupTable:
 
     def get_groups(self) -> list[GroupModel]:
         with get_db() as db:
-            return [
-                GroupModel.model_validate(group)
-                for group in db.query(Group).order_by(Group.updated_at.desc()).all()
-            ]
+            return get_group_models(
+                db, db.query(Group).order_by(Group.updated_at.desc()).all()
+            )
 
     def get_groups_by_member_id(self, user_id: str) -> list[GroupModel]:
         with get_db() as db:
-            return [
-                GroupModel.model_validate(group)
-                for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+            return get_group_models(
+                db,
+                db.query(Group)
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
+                .order_by(Group.updated_at.desc())
+                .all(),
+            )
+
+    def get_group_permissions_by_member_id(self, user_id: str) -> dict[str, dict]:
+        """
+        Returns the permissions of every group of the user by group id, looked
+        up once per request however many access checks need them.
+        """
+        memberships = REQUEST_GROUP_MEMBERSHIPS.get()
+        if memberships is not None and user_id in memberships:
+            return memberships[user_id]
+
+        with get_db() as db:
+            permissions = {
+                group_id: group_permissions or {}
+                for group_id, group_permissions in db.query(Group.id, Group.permissions)
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
-            ]
+            }
+
+        if memberships is not None:
+            memberships[user_id] = permissions
+        return permissions
+
+    def get_group_ids_by_member_id(self, user_id: str) -> list[str]:
+        return list(self.get_group_permissions_by_member_id(user_id))
 
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
                 group = db.query(Group).filter_by(id=id).first()
-                return GroupModel.model_validate(group) if group else None
+                return get_group_models(db, [group])[0] if group else None
         except Exception:
             return None
 
-    def get_group_user_ids_by_id(self, id: str) -> Optional[str]:
-        group = self.get_group_by_id(id)
-        if group:
-            return group.user_ids
-        else:
-            return None
+    def get_group_user_ids_by_id(self, id: str) -> Optional[list[str]]:
+        with get_db() as db:
+            if db.query(Group.id).filter_by(id=id).first() is None:
+                return None
+            return get_group_user_ids(db, [id])[id]
 
     def update_group_by_id(
         self, id: str, form_data: GroupUpdateForm, overwrite: bool = False
@@ -159,11 +249,14 @@ class GroupTable:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).update(
                     {
-                        **form_data.model_dump(exclude_none=True),
+                        **form_data.model_dump(exclude_none=True, exclude={"user_ids"}),
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    set_group_user_ids(db, id, form_data.user_ids)
                 db.commit()
+                clear_request_group_memberships()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -172,8 +265,10 @@ class GroupTable:
     def delete_group_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                clear_request_group_memberships()
                 return True
         except Exception:
             return False
@@ -181,8 +276,10 @@ class GroupTable:
     def delete_all_groups(self) -> bool:
         with get_db() as db:
             try:
+                db.query(GroupMember).delete()
                 db.query(Group).delete()
                 db.commit()
+                clear_request_group_memberships()
 
                 return True
             except Exception:
@@ -191,17 +288,15 @@ class GroupTable:
     def remove_user_from_all_groups(self, user_id: str) -> bool:
         with get_db() as db:
             try:
-                groups = self.get_groups_by_member_id(user_id)
-
-                for group in groups:
-                    group.user_ids.remove(user_id)
-                    db.query(Group).filter_by(id=group.id).update(
-                        {
-                            "user_ids": group.user_ids,
-                            "updated_at": int(time.time()),
-                        }
+                group_ids = self.get_group_ids_by_member_id(user_id)
+
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                if group_ids:
+                    db.query(Group).filter(Group.id.in_(group_ids)).update(
+                        {"updated_at": int(time.time())}
                     )
-                    db.commit()
+                db.commit()
+                clear_request_group_memberships()
 
                 return True
             except Exception:
@@ -229,7 +324,7 @@ class GroupTable:
                         updated_at=int(time.time()),
                     )
                     try:
-                        result = Group(**new_group.model_dump())
+                        result = Group(**new_group.model_dump(exclude={"user_ids"}))
                         db.add(result)
                         db.commit()
                         db.refresh(result)
@@ -243,33 +338,41 @@ class GroupTable:
         with get_db() as db:
             try:
                 groups = db.query(Group).filter(Group.name.in_(group_names)).all()
-                group_ids = [group.id for group in groups]
+                group_ids = {group.id for group in groups}
+
+                existing_group_ids = {
+                    group_id
+                    for (group_id,) in db.query(GroupMember.group_id)
+                    .filter_by(user_id=user_id)
+                    .all()
+                }
+                now = int(time.time())
 
                 # Remove user from groups not in the new list
-                existing_groups = self.get_groups_by_member_id(user_id)
-
-                for group in existing_groups:
-                    if group.id not in group_ids:
-                        group.user_ids.remove(user_id)
-                        db.query(Group).filter_by(id=group.id).update(
-                            {
-                                "user_ids": group.user_ids,
-                                "updated_at": int(time.time()),
-                            }
-                        )
+                removed_group_ids = existing_group_ids - group_ids
+                if removed_group_ids:
+                    db.query(GroupMember).filter(
+                        GroupMember.user_id == user_id,
+                        GroupMember.group_id.in_(removed_group_ids),
+                    ).delete()
 
                 # Add user to new groups
-                for group in groups:
-                    if user_id not in group.user_ids:
-                        group.user_ids.append(user_id)
-                        db.query(Group).filter_by(id=group.id).update(
-                            {
-                                "user_ids": group.user_ids,
-                                "updated_at": int(time.time()),
-                            }
-                        )
+                added_group_ids = group_ids - existing_group_ids
+                db.add_all(
+                    [
+                        GroupMember(group_id=group_id, user_id=user_id, created_at=now)
+                        for group_id in added_group_ids
+                    ]
+                )
+
+                changed_group_ids = removed_group_ids | added_group_ids
+                if changed_group_ids:
+                    db.query(Group).filter(Group.id.in_(changed_group_ids)).update(
+                        {"updated_at": now}
+                    )
 
                 db.commit()
+                clear_request_group_memberships()
                 return True
             except Exception as e:
                 log.exception(e)
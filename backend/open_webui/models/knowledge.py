@@ -8,14 +8,13 @@ from open_webui.internal.db import Base, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.models.files import FileMetadataResponse
-from open_webui.models.users import Users, UserResponse
+from open_webui.models.users import User, UserModel, UserResponse
+from open_webui.models.access_grants import AccessGrants
 
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
-
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
@@ -117,6 +116,9 @@ class KnowledgeTable:
             try:
                 result = Knowledge(**knowledge.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "knowledge", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -126,33 +128,48 @@ class KnowledgeTable:
             except Exception:
                 return None
 
-    def get_knowledge_bases(self) -> list[KnowledgeUserModel]:
+    def get_knowledge_bases(
+        self, user_id: Optional[str] = None, permission: str = "write"
+    ) -> list[KnowledgeUserModel]:
         with get_db() as db:
-            knowledge_bases = []
-            for knowledge in (
-                db.query(Knowledge).order_by(Knowledge.updated_at.desc()).all()
-            ):
-                user = Users.get_user_by_id(knowledge.user_id)
-                knowledge_bases.append(
-                    KnowledgeUserModel.model_validate(
-                        {
-                            **KnowledgeModel.model_validate(knowledge).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
+            # Owners are loaded with the same query
+            query = db.query(Knowledge, User).outerjoin(
+                User, User.id == Knowledge.user_id
+            )
+            if user_id:
+                query = query.filter(
+                    AccessGrants.get_access_filter(
+                        "knowledge",
+                        Knowledge.id,
+                        Knowledge.user_id,
+                        user_id,
+                        permission,
                     )
                 )
-            return knowledge_bases
+
+            return [
+                KnowledgeUserModel.model_validate(
+                    {
+                        **KnowledgeModel.model_validate(knowledge).model_dump(),
+                        "user": (
+                            UserModel.model_validate(user).model_dump()
+                            if user
+                            else None
+                        ),
+                    }
+                )
+                for knowledge, user in query.order_by(Knowledge.updated_at.desc()).all()
+            ]
 
     def get_knowledge_bases_by_user_id(
         self, user_id: str, permission: str = "write"
     ) -> list[KnowledgeUserModel]:
-        knowledge_bases = self.get_knowledge_bases()
-        return [
-            knowledge_base
-            for knowledge_base in knowledge_bases
-            if knowledge_base.user_id == user_id
-            or has_access(user_id, permission, knowledge_base.access_control)
-        ]
+        return self.get_knowledge_bases(user_id, permission)
+
+    def can_access(self, id: str, user_id: str, permission: str = "write") -> bool:
+        return AccessGrants.can_access(
+            "knowledge", Knowledge.id, Knowledge.user_id, id, user_id, permission
+        )
 
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
         try:
@@ -174,6 +191,9 @@ class KnowledgeTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                AccessGrants.set_access_grants(
+                    db, "knowledge", id, form_data.access_control
+                )
                 db.commit()
                 return self.get_knowledge_by_id(id=id)
         except Exception as e:
@@ -202,6 +222,7 @@ class KnowledgeTable:
         try:
             with get_db() as db:
                 db.query(Knowledge).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "knowledge", id)
                 db.commit()
                 return True
         except Exception:
@@ -211,6 +232,7 @@ class KnowledgeTable:
         with get_db() as db:
             try:
                 db.query(Knowledge).delete()
+                AccessGrants.delete_access_grants(db, "knowledge")
                 db.commit()
 
                 return True
@@ -8,8 +8,9 @@ from open_webui.models.tags import TagModel, Tag, Tags
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql import exists
 
 ####################
@@ -25,6 +26,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("ix_message_reaction_message_id", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -52,6 +55,11 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        Index("ix_message_channel_id_created_at", "channel_id", "created_at", "id"),
+        Index("ix_message_parent_id_created_at", "parent_id", "created_at", "id"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -128,15 +136,18 @@ class MessageTable:
             if not message:
                 return None
 
-            reactions = self.get_reactions_by_message_id(id)
-            replies = self.get_replies_by_message_id(id)
+            reply_count, latest_reply_at = db.execute(
+                select(func.count(Message.id), func.max(Message.created_at)).where(
+                    Message.parent_id == id
+                )
+            ).one()
 
             return MessageResponse(
                 **{
                     **MessageModel.model_validate(message).model_dump(),
-                    "latest_reply_at": replies[0].created_at if replies else None,
-                    "reply_count": len(replies),
-                    "reactions": reactions,
+                    "latest_reply_at": latest_reply_at,
+                    "reply_count": reply_count,
+                    "reactions": self.get_reactions_by_message_id(id),
                 }
             )
 
@@ -157,43 +168,139 @@ class MessageTable:
                 for message in db.query(Message).filter_by(parent_id=id).all()
             ]
 
-    def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
-    ) -> list[MessageModel]:
+    def get_message_page_by_channel_id(
+        self,
+        channel_id: str,
+        limit: int = 50,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> list[MessageResponse]:
+        """
+        Top-level messages of a channel, newest first, with their reply counts
+        and reactions. `before` is the id of the last message of the previous
+        page; `skip` is only used without it.
+        """
         with get_db() as db:
-            all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+            page = self._get_message_page(
+                db,
+                and_(Message.channel_id == channel_id, Message.parent_id.is_(None)),
+                limit,
+                before,
+                skip,
+            )
+            message = aliased(Message, page)
+
+            replies = (
+                select(
+                    Message.parent_id,
+                    func.count(Message.id).label("reply_count"),
+                    func.max(Message.created_at).label("latest_reply_at"),
+                )
+                .where(Message.parent_id.in_(select(page.c.id)))
+                .group_by(Message.parent_id)
+                .subquery()
             )
-            return [MessageModel.model_validate(message) for message in all_messages]
 
-    def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
-    ) -> list[MessageModel]:
-        with get_db() as db:
-            message = db.get(Message, parent_id)
+            rows = db.execute(
+                select(message, replies.c.reply_count, replies.c.latest_reply_at)
+                .outerjoin(replies, replies.c.parent_id == message.id)
+                .order_by(message.created_at.desc(), message.id.desc())
+            ).all()
 
-            if not message:
+            reactions = self.get_reactions_by_message_ids([row[0].id for row in rows])
+            return [
+                MessageResponse(
+                    **{
+                        **MessageModel.model_validate(result).model_dump(),
+                        "reply_count": reply_count or 0,
+                        "latest_reply_at": latest_reply_at,
+                        "reactions": reactions.get(result.id, []),
+                    }
+                )
+                for result, reply_count, latest_reply_at in rows
+            ]
+
+    def get_thread_message_page_by_parent_id(
+        self,
+        channel_id: str,
+        parent_id: str,
+        limit: int = 50,
+        before: Optional[str] = None,
+        skip: int = 0,
+    ) -> list[MessageResponse]:
+        """
+        Replies to a message, newest first, with their reactions. The parent
+        message closes the last page.
+        """
+        with get_db() as db:
+            parent = db.get(Message, parent_id)
+            if not parent:
                 return []
 
+            page = self._get_message_page(
+                db,
+                and_(Message.channel_id == channel_id, Message.parent_id == parent_id),
+                limit,
+                before,
+                skip,
+            )
+            message = aliased(Message, page)
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
+                db.execute(
+                    select(message).order_by(
+                        message.created_at.desc(), message.id.desc()
+                    )
+                )
+                .scalars()
                 .all()
             )
 
             # If length of all_messages is less than limit, then add the parent message
             if len(all_messages) < limit:
-                all_messages.append(message)
+                all_messages.append(parent)
 
-            return [MessageModel.model_validate(message) for message in all_messages]
+            reactions = self.get_reactions_by_message_ids(
+                [message.id for message in all_messages]
+            )
+            return [
+                MessageResponse(
+                    **{
+                        **MessageModel.model_validate(message).model_dump(),
+                        "reply_count": 0,
+                        "latest_reply_at": None,
+                        "reactions": reactions.get(message.id, []),
+                    }
+                )
+                for message in all_messages
+            ]
+
+    def _get_message_page(self, db, condition, limit, before, skip):
+        query = select(Message).where(condition)
+
+        if before:
+            # Keyset pagination: messages older than the cursor, with the id
+            # breaking ties between messages created at the same time
+            cursor_created_at = (
+                select(Message.created_at).where(Message.id == before).scalar_subquery()
+            )
+            query = query.where(
+                or_(
+                    Message.created_at < cursor_created_at,
+                    and_(
+                        Message.created_at == cursor_created_at,
+                        Message.id < before,
+                    ),
+                )
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        return (
+            query.order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
+            .subquery()
+        )
 
     def update_message_by_id(
         self, id: str, form_data: MessageForm
@@ -227,21 +334,44 @@ class MessageTable:
             return MessageReactionModel.model_validate(result) if result else None
 
     def get_reactions_by_message_id(self, id: str) -> list[Reactions]:
+        return self.get_reactions_by_message_ids([id]).get(id, [])
+
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        if not ids:
+            return {}
+
         with get_db() as db:
-            all_reactions = db.query(MessageReaction).filter_by(message_id=id).all()
+            all_reactions = (
+                db.query(
+                    MessageReaction.message_id,
+                    MessageReaction.name,
+                    MessageReaction.user_id,
+                )
+                .filter(MessageReaction.message_id.in_(ids))
+                .order_by(MessageReaction.created_at)
+                .all()
+            )
 
             reactions = {}
-            for reaction in all_reactions:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
-                        "name": reaction.name,
+            for message_id, name, user_id in all_reactions:
+                message_reactions = reactions.setdefault(message_id, {})
+                if name not in message_reactions:
+                    message_reactions[name] = {
+                        "name": name,
                         "user_ids": [],
                         "count": 0,
                     }
-                reactions[reaction.name]["user_ids"].append(reaction.user_id)
-                reactions[reaction.name]["count"] += 1
-
-            return [Reactions(**reaction) for reaction in reactions.values()]
+                message_reactions[name]["user_ids"].append(user_id)
+                message_reactions[name]["count"] += 1
+
+            return {
+                message_id: [
+                    Reactions(**reaction) for reaction in message_reactions.values()
+                ]
+                for message_id, message_reactions in reactions.items()
+            }
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
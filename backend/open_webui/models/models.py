@@ -5,7 +5,8 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
-from open_webui.models.users import Users, UserResponse
+from open_webui.models.users import User, UserModel, UserResponse
+from open_webui.models.access_grants import AccessGrants
 
 
 from pydantic import BaseModel, ConfigDict
@@ -15,9 +16,6 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
-
-
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
@@ -158,6 +156,9 @@ class ModelsTable:
             with get_db() as db:
                 result = Model(**model.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "model", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
 
@@ -173,20 +174,36 @@ class ModelsTable:
         with get_db() as db:
             return [ModelModel.model_validate(model) for model in db.query(Model).all()]
 
-    def get_models(self) -> list[ModelUserResponse]:
+    def get_models(
+        self, user_id: Optional[str] = None, permission: str = "write"
+    ) -> list[ModelUserResponse]:
         with get_db() as db:
-            models = []
-            for model in db.query(Model).filter(Model.base_model_id != None).all():
-                user = Users.get_user_by_id(model.user_id)
-                models.append(
-                    ModelUserResponse.model_validate(
-                        {
-                            **ModelModel.model_validate(model).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
+            # Owners are loaded with the same query
+            query = (
+                db.query(Model, User)
+                .outerjoin(User, User.id == Model.user_id)
+                .filter(Model.base_model_id != None)
+            )
+            if user_id:
+                query = query.filter(
+                    AccessGrants.get_access_filter(
+                        "model", Model.id, Model.user_id, user_id, permission
                     )
                 )
-            return models
+
+            return [
+                ModelUserResponse.model_validate(
+                    {
+                        **ModelModel.model_validate(model).model_dump(),
+                        "user": (
+                            UserModel.model_validate(user).model_dump()
+                            if user
+                            else None
+                        ),
+                    }
+                )
+                for model, user in query.all()
+            ]
 
     def get_base_models(self) -> list[ModelModel]:
         with get_db() as db:
@@ -198,13 +215,12 @@ class ModelsTable:
     def get_models_by_user_id(
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
-        models = self.get_models()
-        return [
-            model
-            for model in models
-            if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control)
-        ]
+        return self.get_models(user_id, permission)
+
+    def can_access(self, id: str, user_id: str, permission: str = "write") -> bool:
+        return AccessGrants.can_access(
+            "model", Model.id, Model.user_id, id, user_id, permission
+        )
 
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
         try:
@@ -240,6 +256,7 @@ class ModelsTable:
                     .filter_by(id=id)
                     .update(model.model_dump(exclude={"id"}))
                 )
+                AccessGrants.set_access_grants(db, "model", id, model.access_control)
                 db.commit()
 
                 model = db.get(Model, id)
@@ -253,6 +270,7 @@ class ModelsTable:
         try:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "model", id)
                 db.commit()
 
                 return True
@@ -263,6 +281,7 @@ class ModelsTable:
         try:
             with get_db() as db:
                 db.query(Model).delete()
+                AccessGrants.delete_access_grants(db, "model")
                 db.commit()
 
                 return True
@@ -2,13 +2,12 @@ import time
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
-from open_webui.models.users import Users, UserResponse
+from open_webui.models.users import User, UserModel, UserResponse
+from open_webui.models.access_grants import AccessGrants
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
-
 ####################
 # Prompts DB Schema
 ####################
@@ -84,6 +83,9 @@ class PromptsTable:
             with get_db() as db:
                 result = Prompt(**prompt.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "prompt", result.command, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -101,34 +103,42 @@ class PromptsTable:
         except Exception:
             return None
 
-    def get_prompts(self) -> list[PromptUserResponse]:
+    def get_prompts(
+        self, user_id: Optional[str] = None, permission: str = "write"
+    ) -> list[PromptUserResponse]:
         with get_db() as db:
-            prompts = []
-
-            for prompt in db.query(Prompt).order_by(Prompt.timestamp.desc()).all():
-                user = Users.get_user_by_id(prompt.user_id)
-                prompts.append(
-                    PromptUserResponse.model_validate(
-                        {
-                            **PromptModel.model_validate(prompt).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
+            # Owners are loaded with the same query
+            query = db.query(Prompt, User).outerjoin(User, User.id == Prompt.user_id)
+            if user_id:
+                query = query.filter(
+                    AccessGrants.get_access_filter(
+                        "prompt", Prompt.command, Prompt.user_id, user_id, permission
                     )
                 )
 
-            return prompts
+            return [
+                PromptUserResponse.model_validate(
+                    {
+                        **PromptModel.model_validate(prompt).model_dump(),
+                        "user": (
+                            UserModel.model_validate(user).model_dump()
+                            if user
+                            else None
+                        ),
+                    }
+                )
+                for prompt, user in query.order_by(Prompt.timestamp.desc()).all()
+            ]
 
     def get_prompts_by_user_id(
         self, user_id: str, permission: str = "write"
     ) -> list[PromptUserResponse]:
-        prompts = self.get_prompts()
+        return self.get_prompts(user_id, permission)
 
-        return [
-            prompt
-            for prompt in prompts
-            if prompt.user_id == user_id
-            or has_access(user_id, permission, prompt.access_control)
-        ]
+    def can_access(self, command: str, user_id: str, permission: str = "write") -> bool:
+        return AccessGrants.can_access(
+            "prompt", Prompt.command, Prompt.user_id, command, user_id, permission
+        )
 
     def update_prompt_by_command(
         self, command: str, form_data: PromptForm
@@ -140,6 +150,9 @@ class PromptsTable:
                 prompt.content = form_data.content
                 prompt.access_control = form_data.access_control
                 prompt.timestamp = int(time.time())
+                AccessGrants.set_access_grants(
+                    db, "prompt", command, form_data.access_control
+                )
                 db.commit()
                 return PromptModel.model_validate(prompt)
         except Exception:
@@ -149,6 +162,7 @@ class PromptsTable:
         try:
             with get_db() as db:
                 db.query(Prompt).filter_by(command=command).delete()
+                AccessGrants.delete_access_grants(db, "prompt", command)
                 db.commit()
 
                 return True
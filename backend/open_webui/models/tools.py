@@ -3,13 +3,12 @@ import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
-from open_webui.models.users import Users, UserResponse
+from open_webui.models.users import Users, User, UserModel, UserResponse
+from open_webui.models.access_grants import AccessGrants
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
-
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -124,6 +123,9 @@ class ToolsTable:
             try:
                 result = Tool(**tool.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "tool", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -142,32 +144,42 @@ class ToolsTable:
         except Exception:
             return None
 
-    def get_tools(self) -> list[ToolUserModel]:
+    def get_tools(
+        self, user_id: Optional[str] = None, permission: str = "write"
+    ) -> list[ToolUserModel]:
         with get_db() as db:
-            tools = []
-            for tool in db.query(Tool).order_by(Tool.updated_at.desc()).all():
-                user = Users.get_user_by_id(tool.user_id)
-                tools.append(
-                    ToolUserModel.model_validate(
-                        {
-                            **ToolModel.model_validate(tool).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
+            # Owners are loaded with the same query
+            query = db.query(Tool, User).outerjoin(User, User.id == Tool.user_id)
+            if user_id:
+                query = query.filter(
+                    AccessGrants.get_access_filter(
+                        "tool", Tool.id, Tool.user_id, user_id, permission
                     )
                 )
-            return tools
+
+            return [
+                ToolUserModel.model_validate(
+                    {
+                        **ToolModel.model_validate(tool).model_dump(),
+                        "user": (
+                            UserModel.model_validate(user).model_dump()
+                            if user
+                            else None
+                        ),
+                    }
+                )
+                for tool, user in query.order_by(Tool.updated_at.desc()).all()
+            ]
 
     def get_tools_by_user_id(
         self, user_id: str, permission: str = "write"
     ) -> list[ToolUserModel]:
-        tools = self.get_tools()
+        return self.get_tools(user_id, permission)
 
-        return [
-            tool
-            for tool in tools
-            if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control)
-        ]
+    def can_access(self, id: str, user_id: str, permission: str = "write") -> bool:
+        return AccessGrants.can_access(
+            "tool", Tool.id, Tool.user_id, id, user_id, permission
+        )
 
     def get_tool_valves_by_id(self, id: str) -> Optional[dict]:
         try:
@@ -240,6 +252,10 @@ class ToolsTable:
                 db.query(Tool).filter_by(id=id).update(
                     {**updated, "updated_at": int(time.time())}
                 )
+                if "access_control" in updated:
+                    AccessGrants.set_access_grants(
+                        db, "tool", id, updated["access_control"]
+                    )
                 db.commit()
 
                 tool = db.query(Tool).get(id)
@@ -252,6 +268,7 @@ class ToolsTable:
         try:
             with get_db() as db:
                 db.query(Tool).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "tool", id)
                 db.commit()
 
                 return True
@@ -1,3 +1,5 @@
+import hashlib
+import threading
 import time
 from typing import Optional
 
@@ -6,11 +8,12 @@ from open_webui.internal.db import Base, JSONField, get_db
 
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
+from open_webui.utils.user_cache import USER_CACHE
 
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text
-from sqlalchemy import or_
+from sqlalchemy import case, or_
 
 
 ####################
@@ -112,7 +115,26 @@ class UserUpdateForm(BaseModel):
     password: Optional[str] = None
 
 
+def get_user_cache_key(id: str) -> str:
+    return f"user:{id}"
+
+
+def hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def get_api_key_cache_key(api_key: str) -> str:
+    # API keys are never cached in clear, neither as keys nor as values
+    return f"api-key:{hash_api_key(api_key)}"
+
+
 class UsersTable:
+    def __init__(self):
+        # Last activity of the authenticated users, written in batches by
+        # `flush_user_last_active`
+        self.last_active_lock = threading.Lock()
+        self.last_active: dict[str, int] = {}
+
     def insert_new_user(
         self,
         id: str,
@@ -167,6 +189,51 @@ class UsersTable:
         except Exception:
             return None
 
+    def get_cached_user_by_id(self, id: str) -> Optional[UserModel]:
+        """
+        `get_user_by_id` served from the user cache, for authentication. The
+        API key of the user is left out.
+        """
+        return self._get_cached_user(id)[0]
+
+    def get_cached_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
+        """`get_user_by_api_key` served from the user cache, for authentication."""
+        user_id = USER_CACHE.get(get_api_key_cache_key(api_key))
+        if user_id is not None:
+            user, api_key_hash = self._get_cached_user(user_id)
+            # A key that was replaced no longer matches the cached user
+            if user is not None and api_key_hash == hash_api_key(api_key):
+                return user
+
+        user = self.get_user_by_api_key(api_key)
+        if user is None:
+            return None
+
+        USER_CACHE.set(get_api_key_cache_key(api_key), user.id)
+        return UserModel.model_validate(self._set_cached_user(user)["user"])
+
+    def _get_cached_user(self, id: str) -> tuple[Optional[UserModel], Optional[str]]:
+        """Returns the user, without their API key, and the hash of the key."""
+        entry = USER_CACHE.get(get_user_cache_key(id))
+        if entry is None:
+            user = self.get_user_by_id(id)
+            if user is None:
+                return None, None
+            entry = self._set_cached_user(user)
+
+        return UserModel.model_validate(entry["user"]), entry["api_key_hash"]
+
+    def _set_cached_user(self, user: UserModel) -> dict:
+        entry = {
+            "user": user.model_dump(exclude={"api_key"}),
+            "api_key_hash": hash_api_key(user.api_key) if user.api_key else None,
+        }
+        USER_CACHE.set(get_user_cache_key(user.id), entry)
+        return entry
+
+    def invalidate_cached_user_by_id(self, id: str):
+        USER_CACHE.delete(get_user_cache_key(id))
+
     def get_user_by_email(self, email: Optional[str]) -> Optional[UserModel]:
         try:
             if email is None:
@@ -309,6 +376,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                self.invalidate_cached_user_by_id(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -323,6 +391,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                self.invalidate_cached_user_by_id(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -342,6 +411,37 @@ class UsersTable:
         except Exception:
             return None
 
+    def touch_user_last_active_by_id(self, id: str):
+        """Records the user's activity, written by the next `flush_user_last_active`."""
+        with self.last_active_lock:
+            self.last_active[id] = int(time.time())
+
+    def flush_user_last_active(self) -> int:
+        """Writes the recorded activity of all users in a single UPDATE."""
+        with self.last_active_lock:
+            last_active, self.last_active = self.last_active, {}
+
+        if not last_active:
+            return 0
+
+        try:
+            with get_db() as db:
+                db.query(User).filter(User.id.in_(list(last_active))).update(
+                    {
+                        "last_active_at": case(
+                            last_active, value=User.id, else_=User.last_active_at
+                        )
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+            return len(last_active)
+        except Exception:
+            # Kept for the next flush, unless newer activity was recorded
+            with self.last_active_lock:
+                self.last_active = {**last_active, **self.last_active}
+            raise
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -349,6 +449,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                self.invalidate_cached_user_by_id(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -360,6 +461,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                self.invalidate_cached_user_by_id(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -379,6 +481,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                self.invalidate_cached_user_by_id(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -397,6 +500,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                self.invalidate_cached_user_by_id(id)
 
                 return True
             else:
@@ -409,6 +513,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                self.invalidate_cached_user_by_id(id)
                 return True if result == 1 else False
         except Exception:
             return False
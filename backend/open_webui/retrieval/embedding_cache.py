@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import os
+from array import array
+from typing import Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.config import (
+    RAG_EMBEDDING_CACHE_DIR,
+    RAG_EMBEDDING_CACHE_MAX_SIZE_MB,
+    RAG_EMBEDDING_CACHE_REDIS_TTL,
+)
+from open_webui.utils.cache_index import CacheIndex
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+REDIS_KEY_PREFIX = "open-webui:embedding:"
+
+
+def get_embedding_cache_key(
+    engine: str, model: str, prefix: Optional[str], text: str
+) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(
+        f"{engine}\x00{model}\x00{prefix or ''}\x00{digest}".encode("utf-8")
+    ).hexdigest()
+
+
+def pack_vector(vector: list[float]) -> bytes:
+    return array("d", vector).tobytes()
+
+
+def unpack_vector(data: bytes) -> list[float]:
+    vector = array("d")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    Two tier cache of embedding vectors.
+
+    Vectors are kept in a local SQLite file, evicted least recently used first
+    once `max_size` bytes are stored, and optionally shared between instances
+    through Redis with a TTL. Keys come from `get_embedding_cache_key`, so a
+    vector is only reused for the same engine, model, prefix and text.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int,
+        redis_url: str = "",
+        redis_sentinels: Optional[list] = None,
+        redis_ttl: int = RAG_EMBEDDING_CACHE_REDIS_TTL,
+    ):
+        self.redis_ttl = redis_ttl
+        self.stats = {"hits": 0, "redis_hits": 0, "misses": 0}
+        self.index = CacheIndex(path, max_size, {"embedding": ["vector BLOB NOT NULL"]})
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, decode_responses=False
+                )
+            except Exception as e:
+                log.warning(f"Embedding cache is not using Redis: {e}")
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+
+        found = {
+            key: unpack_vector(vector)
+            for key, (vector,) in self.index.get_many(
+                "embedding", keys, ["vector"]
+            ).items()
+        }
+        with self.index.lock:
+            self.stats["hits"] += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.redis is not None:
+            try:
+                values = self.redis.mget([REDIS_KEY_PREFIX + key for key in missing])
+                shared = {
+                    key: unpack_vector(value)
+                    for key, value in zip(missing, values)
+                    if value is not None
+                }
+            except Exception as e:
+                log.warning(f"Error reading embeddings from Redis: {e}")
+                shared = {}
+
+            if shared:
+                self._set_local(shared)
+                found.update(shared)
+                with self.index.lock:
+                    self.stats["redis_hits"] += len(shared)
+
+        with self.index.lock:
+            self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def set_many(self, vectors: dict[str, list[float]]):
+        if not vectors:
+            return
+
+        self._set_local(vectors)
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                for key, vector in vectors.items():
+                    pipe.set(
+                        REDIS_KEY_PREFIX + key, pack_vector(vector), ex=self.redis_ttl
+                    )
+                pipe.execute()
+            except Exception as e:
+                log.warning(f"Error writing embeddings to Redis: {e}")
+
+    def _set_local(self, vectors: dict[str, list[float]]):
+        entries = []
+        for key, vector in vectors.items():
+            data = pack_vector(vector)
+            entries.append({"key": key, "size": len(data), "vector": data})
+        self.index.set_many("embedding", entries)
+
+    def clear(self):
+        self.index.clear()
+
+    def get_stats(self) -> dict:
+        with self.index.lock:
+            stats = {
+                **self.stats,
+                "evictions": self.index.evictions,
+                "size": self.index.size,
+                "max_size": self.index.max_size,
+            }
+        requests = stats["hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["hits"] + stats["redis_hits"]) / requests if requests else 0.0
+        )
+        return stats
+
+
+EMBEDDING_CACHE: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    global EMBEDDING_CACHE
+
+    if EMBEDDING_CACHE is None:
+        try:
+            EMBEDDING_CACHE = EmbeddingCache(
+                os.path.join(RAG_EMBEDDING_CACHE_DIR, "embeddings.db"),
+                RAG_EMBEDDING_CACHE_MAX_SIZE_MB * 1024 * 1024,
+                redis_url=REDIS_URL,
+                redis_sentinels=get_sentinels_from_env(
+                    REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                ),
+            )
+        except Exception as e:
+            log.exception(f"Error opening embedding cache: {e}")
+            return None
+
+    return EMBEDDING_CACHE
+
+
+def get_cached_embedding_function(
+    embedding_function: Callable,
+    embedding_engine: str,
+    embedding_model: str,
+    cache: Optional[EmbeddingCache] = None,
+) -> Callable:
+    """
+    Wrap an embedding function returned by `get_embedding_function` so that
+    only texts without a cached vector are embedded.
+    """
+    cache = cache or get_embedding_cache()
+    if cache is None:
+        return embedding_function
+
+    def cached_embedding_function(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [
+            get_embedding_cache_key(embedding_engine, embedding_model, prefix, text)
+            for text in texts
+        ]
+        vectors = cache.get_many(list(dict.fromkeys(keys)))
+
+        # Embed each missing text once, even if it repeats within the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        if missing:
+            embeddings = embedding_function(
+                list(missing.values()) if isinstance(query, list) else query,
+                prefix=prefix,
+                user=user,
+            )
+            if not isinstance(query, list):
+                embeddings = [embeddings]
+
+            if embeddings is None or len(embeddings) != len(missing):
+                # Vectors can't be matched to their texts, so every missing
+                # text is handed back as failed (None)
+                log.warning(
+                    f"Embedding engine returned {len(embeddings or [])} vectors for {len(missing)} texts"
+                )
+                embeddings = [None] * len(missing)
+
+            embedded = {
+                key: list(embedding)
+                for key, embedding in zip(missing.keys(), embeddings)
+                if embedding is not None
+            }
+            cache.set_many(embedded)
+            vectors.update(embedded)
+
+        if isinstance(query, list):
+            return [vectors.get(key) for key in keys]
+        return vectors.get(keys[0])
+
+    return cached_embedding_function
@@ -0,0 +1,390 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    DATA_DIR,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    ENABLE_FILE_INGESTION_QUEUE,
+    FILE_INGESTION_WORKERS,
+    FILE_INGESTION_QUEUE_MAX_SIZE,
+    FILE_INGESTION_MAX_RETRIES,
+    FILE_INGESTION_RETRY_DELAY,
+    FILE_INGESTION_JOB_TIMEOUT,
+)
+from open_webui.models.files import Files
+from open_webui.models.users import Users
+from open_webui.socket.main import send_file_event
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Seconds an idle worker waits before looking for new jobs, jobs enqueued by
+# the same process wake the workers right away
+POLL_INTERVAL = 1
+
+
+class FileStatus:
+    QUEUED = "queued"
+    EXTRACTING = "extracting"
+    EMBEDDING = "embedding"
+    DONE = "done"
+    FAILED = "failed"
+
+    # Statuses of the files the queue is not done with
+    PENDING = (QUEUED, EXTRACTING, EMBEDDING)
+
+
+# Loop of the app, so file events can be sent from the threads processing files
+EVENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# Set in the threads of the queue workers to the file they are processing
+WORKER_THREAD = threading.local()
+
+
+class SQLiteJobStore:
+    """Jobs kept in a local SQLite database, shared by the processes of a host."""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                available_at REAL NOT NULL,
+                leased_until REAL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_job_available_at ON job (available_at)"
+        )
+
+    def push(self, job: dict, delay: float = 0):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO job (id, payload, available_at, leased_until) VALUES (?, ?, ?, NULL)",
+                (job["id"], json.dumps(job), time.time() + delay),
+            )
+
+    def pop(self, lease: float) -> Optional[dict]:
+        now = time.time()
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock, so two processes never
+            # lease the same job
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    """
+                    SELECT id, payload FROM job
+                    WHERE available_at <= ? AND (leased_until IS NULL OR leased_until < ?)
+                    ORDER BY available_at LIMIT 1
+                    """,
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        "UPDATE job SET leased_until = ? WHERE id = ?",
+                        (now + lease, row[0]),
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return json.loads(row[1]) if row is not None else None
+
+    def extend(self, job: dict, lease: float):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE job SET leased_until = ? WHERE id = ?",
+                (time.time() + lease, job["id"]),
+            )
+
+    def ack(self, job: dict):
+        with self.lock:
+            self.conn.execute("DELETE FROM job WHERE id = ?", (job["id"],))
+
+    def size(self) -> int:
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM job").fetchone()
+        return count
+
+
+# Leases the first available job, putting back the ones whose lease expired
+REDIS_POP_SCRIPT = """
+local now = tonumber(ARGV[1])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('ZADD', KEYS[1], now, id)
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 1)
+if #ids == 0 then
+    return false
+end
+redis.call('ZREM', KEYS[1], ids[1])
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), ids[1])
+return redis.call('HGET', KEYS[3], ids[1])
+"""
+
+
+class RedisJobStore:
+    """Jobs kept in Redis, shared by all replicas."""
+
+    def __init__(self, redis_url: str, redis_sentinels: Optional[list] = None):
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+
+        self.jobs_key = "open-webui:ingestion:jobs"
+        self.leases_key = "open-webui:ingestion:leases"
+        self.payloads_key = "open-webui:ingestion:payloads"
+
+        self.pop_script = self.redis.register_script(REDIS_POP_SCRIPT)
+
+    def push(self, job: dict, delay: float = 0):
+        pipe = self.redis.pipeline()
+        pipe.hset(self.payloads_key, job["id"], json.dumps(job))
+        pipe.zrem(self.leases_key, job["id"])
+        pipe.zadd(self.jobs_key, {job["id"]: time.time() + delay})
+        pipe.execute()
+
+    def pop(self, lease: float) -> Optional[dict]:
+        payload = self.pop_script(
+            keys=[self.jobs_key, self.leases_key, self.payloads_key],
+            args=[time.time(), lease],
+        )
+        return json.loads(payload) if payload else None
+
+    def extend(self, job: dict, lease: float):
+        self.redis.zadd(self.leases_key, {job["id"]: time.time() + lease}, xx=True)
+
+    def ack(self, job: dict):
+        pipe = self.redis.pipeline()
+        pipe.zrem(self.leases_key, job["id"])
+        pipe.hdel(self.payloads_key, job["id"])
+        pipe.execute()
+
+    def size(self) -> int:
+        return self.redis.hlen(self.payloads_key)
+
+
+class IngestionQueue:
+    """
+    Durable queue of uploaded files waiting to be processed (extracted, split,
+    embedded and stored in the vector database).
+
+    Each worker leases a job for `job_timeout` seconds and renews the lease
+    while the file is being processed, so the jobs of a worker that died are
+    picked up by another one. Failed files are retried with exponential
+    backoff, and `is_full` tells uploads to back off once `max_size` files
+    are pending.
+    """
+
+    def __init__(
+        self,
+        store,
+        workers: int = FILE_INGESTION_WORKERS,
+        max_size: int = FILE_INGESTION_QUEUE_MAX_SIZE,
+        max_retries: int = FILE_INGESTION_MAX_RETRIES,
+        retry_delay: int = FILE_INGESTION_RETRY_DELAY,
+        job_timeout: int = FILE_INGESTION_JOB_TIMEOUT,
+    ):
+        self.store = store
+        self.workers = workers
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.job_timeout = job_timeout
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.tasks: list[asyncio.Task] = []
+
+    def is_full(self) -> bool:
+        return self.max_size > 0 and self.store.size() >= self.max_size
+
+    def enqueue(self, file_id: str, user_id: str):
+        self.store.push(
+            {
+                "id": file_id,
+                "file_id": file_id,
+                "user_id": user_id,
+                "attempts": 0,
+            }
+        )
+        set_file_status(file_id, FileStatus.QUEUED)
+
+        if self.loop is not None and self.wakeup is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def start(self, app, handler: Callable):
+        """
+        Starts the workers, calling `handler(request, file_id, user)` from a
+        thread for every job.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+
+        request = Request(scope={"type": "http", "app": app})
+        self.tasks = [
+            asyncio.create_task(self.worker(request, handler))
+            for _ in range(self.workers)
+        ]
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    async def worker(self, request: Request, handler: Callable):
+        while True:
+            try:
+                job = await run_in_threadpool(self.store.pop, self.job_timeout)
+            except Exception as e:
+                log.warning(f"Error fetching ingestion job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                continue
+
+            await self.process(request, handler, job)
+
+    async def process(self, request: Request, handler: Callable, job: dict):
+        heartbeat = asyncio.create_task(self.heartbeat(job))
+        try:
+            user = Users.get_user_by_id(job["user_id"])
+            if user is None or Files.get_file_by_id(job["file_id"]) is None:
+                # The file or its owner was deleted while waiting
+                self.store.ack(job)
+                return
+
+            await run_in_threadpool(
+                self.run_handler, handler, request, job["file_id"], user
+            )
+            self.store.ack(job)
+        except asyncio.CancelledError:
+            # Left leased, the job is picked up again once the lease expires
+            raise
+        except Exception as e:
+            error = str(e.detail) if hasattr(e, "detail") else str(e)
+            attempts = job["attempts"] + 1
+
+            if attempts <= self.max_retries:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+                log.warning(
+                    f"Error processing file {job['file_id']}, retrying in {delay}s: {error}"
+                )
+                self.store.push({**job, "attempts": attempts}, delay=delay)
+                set_file_status(
+                    job["file_id"], FileStatus.QUEUED, error=error, attempts=attempts
+                )
+            else:
+                log.error(f"Error processing file {job['file_id']}: {error}")
+                self.store.ack(job)
+                set_file_status(
+                    job["file_id"], FileStatus.FAILED, error=error, attempts=attempts
+                )
+        finally:
+            heartbeat.cancel()
+
+    def run_handler(self, handler: Callable, request: Request, file_id: str, user):
+        WORKER_THREAD.file_id = file_id
+        try:
+            handler(request, file_id, user)
+        finally:
+            WORKER_THREAD.file_id = None
+
+    async def heartbeat(self, job: dict):
+        while True:
+            await asyncio.sleep(self.job_timeout / 3)
+            try:
+                await run_in_threadpool(self.store.extend, job, self.job_timeout)
+            except Exception as e:
+                log.warning(f"Error renewing lease of ingestion job {job['id']}: {e}")
+
+
+def get_job_store():
+    if REDIS_URL:
+        try:
+            return RedisJobStore(
+                REDIS_URL,
+                get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+            )
+        except Exception as e:
+            log.warning(f"File ingestion queue is not shared through Redis: {e}")
+    return SQLiteJobStore(str(DATA_DIR / "ingestion" / "queue.db"))
+
+
+INGESTION_QUEUE: Optional[IngestionQueue] = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    global INGESTION_QUEUE
+    if INGESTION_QUEUE is None:
+        INGESTION_QUEUE = IngestionQueue(get_job_store())
+    return INGESTION_QUEUE
+
+
+def set_file_status(file_id: str, status: str, error: Optional[str] = None, **data):
+    """Stores the processing status of a file and tells its owner about it."""
+    file = Files.update_file_data_by_id(
+        file_id, {"status": status, "error": error, **data}
+    )
+    if file is not None and EVENT_LOOP is not None and not EVENT_LOOP.is_closed():
+        asyncio.run_coroutine_threadsafe(
+            send_file_event(
+                file.user_id,
+                {"file_id": file_id, "status": status, "error": error, **data},
+            ),
+            EVENT_LOOP,
+        )
+
+
+def set_file_failed(file_id: str, error: str):
+    """
+    Marks a file as failed, unless a queue worker is processing it: the queue
+    retries the file or marks it failed itself.
+    """
+    if getattr(WORKER_THREAD, "file_id", None) != file_id:
+        set_file_status(file_id, FileStatus.FAILED, error=error)
+
+
+def start_ingestion_queue(app, handler: Callable):
+    global EVENT_LOOP
+    # Status events are sent for files processed inside requests as well
+    EVENT_LOOP = asyncio.get_running_loop()
+
+    # The job store is only opened when files are processed in the background
+    if ENABLE_FILE_INGESTION_QUEUE:
+        get_ingestion_queue().start(app, handler)
+
+
+def stop_ingestion_queue():
+    if INGESTION_QUEUE is not None:
+        INGESTION_QUEUE.stop()
@@ -1,7 +1,11 @@
+import asyncio
 import logging
 import os
+import random
 from typing import Optional, Union
 
+import aiohttp
+import numpy as np
 import requests
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
@@ -9,7 +13,6 @@ import time
 
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
@@ -17,20 +20,25 @@ from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
-
-from open_webui.retrieval.vector.main import GetResult
+from open_webui.models.bm25 import BM25Index
 
 
 from open_webui.env import (
     SRC_LOG_LEVELS,
     OFFLINE_MODE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
+    AIOHTTP_CLIENT_TIMEOUT,
+    AIOHTTP_CLIENT_SESSION_SSL,
 )
 from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    RAG_EMBEDDING_MAX_RETRIES,
 )
+from open_webui.retrieval.embedding_cache import get_cached_embedding_function
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
@@ -42,6 +50,10 @@ from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.retrievers import BaseRetriever
 
 
+# Metadata key carrying the stored vector of a search hit to the RerankCompressor
+EMBEDDING_METADATA_KEY = "__embedding__"
+
+
 class VectorSearchRetriever(BaseRetriever):
     collection_name: Any
     embedding_function: Any
@@ -57,23 +69,59 @@ class VectorSearchRetriever(BaseRetriever):
             collection_name=self.collection_name,
             vectors=[self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)],
             limit=self.top_k,
+            include_embeddings=True,
         )
 
         ids = result.ids[0]
         metadatas = result.metadatas[0]
         documents = result.documents[0]
+        embeddings = result.embeddings[0] if result.embeddings else [None] * len(ids)
 
         results = []
         for idx in range(len(ids)):
+            metadata = {**(metadatas[idx] or {})}
+            if embeddings[idx] is not None:
+                metadata[EMBEDDING_METADATA_KEY] = embeddings[idx]
+
             results.append(
                 Document(
-                    metadata=metadatas[idx],
+                    metadata=metadata,
                     page_content=documents[idx],
                 )
             )
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    collection_name: Any
+    top_k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        hits = BM25Index.search(self.collection_name, query, self.top_k)
+        if not hits:
+            return []
+
+        # The index only scores documents, their text is read from the vector DB
+        result = VECTOR_DB_CLIENT.get_by_ids(
+            self.collection_name, [hit.doc_id for hit in hits]
+        )
+        if result is None or not result.ids:
+            return []
+
+        documents = {
+            id: Document(metadata=metadata or {}, page_content=document)
+            for id, document, metadata in zip(
+                result.ids[0], result.documents[0], result.metadatas[0]
+            )
+        }
+        return [documents[hit.doc_id] for hit in hits if hit.doc_id in documents]
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -108,9 +156,29 @@ def get_doc(collection_name: str, user: UserModel = None):
         raise e
 
 
+def ensure_bm25_index(collection_name: str) -> bool:
+    """
+    Builds the BM25 index of a collection that was created before it was
+    indexed at ingestion time. Returns False if the collection can't be read.
+    """
+    if BM25Index.has_collection(collection_name):
+        return True
+
+    log.info(f"ensure_bm25_index:building index of {collection_name}")
+    result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+    if result is None:
+        return False
+
+    return BM25Index.add_documents(
+        collection_name,
+        ids=result.ids[0],
+        texts=result.documents[0],
+        metadatas=result.metadatas[0],
+    )
+
+
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
     query: str,
     embedding_function,
     k: int,
@@ -121,11 +189,10 @@ def query_doc_with_hybrid_search(
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
+        bm25_retriever = BM25IndexRetriever(
+            collection_name=collection_name,
+            top_k=k,
         )
-        bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -142,9 +209,11 @@ def query_doc_with_hybrid_search(
                 retrievers=[bm25_retriever], weights=[1.0]
             )
         else:
+            # Vector hits come first so that documents found by both retrievers
+            # keep the stored vector attached by the vector search
             ensemble_retriever = EnsembleRetriever(
-                retrievers=[bm25_retriever, vector_search_retriever],
-                weights=[hybrid_bm25_weight, 1.0 - hybrid_bm25_weight],
+                retrievers=[vector_search_retriever, bm25_retriever],
+                weights=[1.0 - hybrid_bm25_weight, hybrid_bm25_weight],
             )
 
         compressor = RerankCompressor(
@@ -330,20 +399,15 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
+    # Lexical hits come from the persisted BM25 index, so collections are no
+    # longer fetched in full, only indexed once if they predate the index
+    indexed_collections = set()
     for collection_name in collection_names:
         try:
-            log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
-            )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
-            )
+            if ensure_bm25_index(collection_name):
+                indexed_collections.add(collection_name)
         except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            log.exception(f"Failed to index collection {collection_name}: {e}")
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -353,7 +417,6 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -368,12 +431,9 @@ def query_collection_with_hybrid_search(
             return None, e
 
     # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+    # Avoid running any tasks for collections that could not be indexed
     tasks = [
-        (cn, q)
-        for cn in collection_names
-        if collection_results[cn] is not None
-        for q in queries
+        (cn, q) for cn in collection_names if cn in indexed_collections for q in queries
     ]
 
     with ThreadPoolExecutor() as executor:
@@ -404,11 +464,11 @@ def get_embedding_function(
     azure_api_version=None,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
+        func = lambda query, prefix=None, user=None: embedding_function.encode(
             query, **({"prompt": prefix} if prefix else {})
         ).tolist()
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
+        embed = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -421,25 +481,33 @@ def get_embedding_function(
 
         def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
+                # Batches are sent concurrently, results keep the order of query
+                return run_coroutine_sync(
+                    agenerate_multiple_embeddings(
+                        engine=embedding_engine,
+                        model=embedding_model,
+                        texts=query,
+                        batch_size=embedding_batch_size,
+                        url=url,
+                        key=key,
+                        prefix=prefix,
+                        user=user,
+                        azure_api_version=azure_api_version,
                     )
-                return embeddings
+                )
             else:
                 return func(query, prefix, user)
 
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
+        func = lambda query, prefix=None, user=None: generate_multiple(
+            query, prefix, user, embed
         )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if ENABLE_RAG_EMBEDDING_CACHE:
+        return get_cached_embedding_function(func, embedding_engine, embedding_model)
+    return func
+
 
 def get_sources_from_files(
     request,
@@ -800,6 +868,210 @@ def generate_ollama_batch_embeddings(
         return None
 
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def get_retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    # Exponential backoff with jitter, capped at 30 seconds
+    return min(2**attempt, 30) * (0.5 + random.random() / 2)
+
+
+async def agenerate_batch_embeddings(
+    session: aiohttp.ClientSession,
+    engine: str,
+    model: str,
+    texts: list[str],
+    url: str,
+    key: str = "",
+    prefix: str = None,
+    user: UserModel = None,
+    azure_api_version: str = "",
+) -> list[list[float]]:
+    log.debug(f"agenerate_batch_embeddings:{engine} {model} batch size: {len(texts)}")
+
+    headers = {"Content-Type": "application/json"}
+    json_data = {"input": texts}
+    if engine == "azure_openai":
+        endpoint = f"{url}/openai/deployments/{model}/embeddings?api-version={azure_api_version}"
+        headers["api-key"] = key
+    else:
+        endpoint = f"{url}/api/embed" if engine == "ollama" else f"{url}/embeddings"
+        headers["Authorization"] = f"Bearer {key}"
+        json_data["model"] = model
+
+    if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
+        json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        headers.update(
+            {
+                "X-OpenWebUI-User-Name": user.name,
+                "X-OpenWebUI-User-Id": user.id,
+                "X-OpenWebUI-User-Email": user.email,
+                "X-OpenWebUI-User-Role": user.role,
+            }
+        )
+
+    for attempt in range(RAG_EMBEDDING_MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            async with session.post(
+                endpoint,
+                headers=headers,
+                json=json_data,
+                ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            ) as r:
+                if (
+                    r.status in RETRY_STATUS_CODES
+                    and attempt < RAG_EMBEDDING_MAX_RETRIES
+                ):
+                    retry_after = r.headers.get("Retry-After")
+                    log.warning(
+                        f"Embedding request failed with {r.status}, retrying ({attempt + 1}/{RAG_EMBEDDING_MAX_RETRIES})"
+                    )
+                else:
+                    r.raise_for_status()
+                    data = await r.json()
+
+                    if engine == "ollama":
+                        if "embeddings" in data:
+                            return data["embeddings"]
+                    elif "data" in data:
+                        return [elem["embedding"] for elem in data["data"]]
+                    raise Exception("Something went wrong :/")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt >= RAG_EMBEDDING_MAX_RETRIES:
+                raise
+            log.warning(
+                f"Embedding request failed with {e!r}, retrying ({attempt + 1}/{RAG_EMBEDDING_MAX_RETRIES})"
+            )
+
+        await asyncio.sleep(get_retry_delay(attempt, retry_after))
+
+
+# Session shared by the embedding requests of all the calls, it is bound to the
+# event loop of the app and created on first use
+EMBEDDING_SESSION: Optional[aiohttp.ClientSession] = None
+EVENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def create_embedding_session(**kwargs) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+        trust_env=True,
+        **kwargs,
+    )
+
+
+def get_embedding_session() -> aiohttp.ClientSession:
+    global EMBEDDING_SESSION
+    if EMBEDDING_SESSION is None or EMBEDDING_SESSION.closed:
+        EMBEDDING_SESSION = create_embedding_session()
+    return EMBEDDING_SESSION
+
+
+def start_embedding_session():
+    """Sends the embedding requests of the sync callers through the event loop of the app."""
+    global EVENT_LOOP
+    EVENT_LOOP = asyncio.get_running_loop()
+
+
+async def stop_embedding_session():
+    global EMBEDDING_SESSION, EVENT_LOOP
+    EVENT_LOOP = None
+    if EMBEDDING_SESSION is not None:
+        await EMBEDDING_SESSION.close()
+        EMBEDDING_SESSION = None
+
+
+async def agenerate_multiple_embeddings(
+    engine: str,
+    model: str,
+    texts: list[str],
+    batch_size: int,
+    url: str,
+    key: str = "",
+    prefix: str = None,
+    user: UserModel = None,
+    azure_api_version: str = "",
+    concurrency: int = RAG_EMBEDDING_CONCURRENT_REQUESTS,
+) -> Optional[list[list[float]]]:
+    if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
+        texts = [f"{prefix}{text}" for text in texts]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed_batch(session: aiohttp.ClientSession, batch: list[str]):
+        async with semaphore:
+            return await agenerate_batch_embeddings(
+                session,
+                engine,
+                model,
+                batch,
+                url,
+                key=key,
+                prefix=prefix,
+                user=user,
+                azure_api_version=azure_api_version,
+            )
+
+    async def embed(session: aiohttp.ClientSession):
+        return await asyncio.gather(
+            *[
+                embed_batch(session, texts[i : i + batch_size])
+                for i in range(0, len(texts), batch_size)
+            ]
+        )
+
+    try:
+        if asyncio.get_running_loop() is EVENT_LOOP:
+            results = await embed(get_embedding_session())
+        else:
+            # Outside of the app, e.g. in scripts, with a session of its own
+            async with create_embedding_session(
+                connector=aiohttp.TCPConnector(limit=concurrency)
+            ) as session:
+                results = await embed(session)
+    except Exception as e:
+        log.exception(f"Error generating {engine} batch embeddings: {e}")
+        return None
+
+    return [embedding for batch in results for embedding in batch]
+
+
+def run_coroutine_sync(coroutine):
+    """
+    Runs a coroutine to completion from sync code, on the event loop of the app
+    when it is started. The calling thread waits for the result, so callers
+    on that event loop have to run the sync code in a thread instead.
+    """
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+
+    if EVENT_LOOP is not None and not EVENT_LOOP.is_closed():
+        if running_loop is EVENT_LOOP:
+            coroutine.close()
+            raise RuntimeError(
+                "Cannot wait for a coroutine on the event loop it runs on, "
+                "call this from a thread (e.g. with run_in_threadpool) instead"
+            )
+        return asyncio.run_coroutine_threadsafe(coroutine, EVENT_LOOP).result()
+
+    if running_loop is None:
+        return asyncio.run(coroutine)
+
+    # Called from a thread that is running a loop, block on a separate one
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 def generate_embeddings(
     engine: str,
     model: str,
@@ -871,20 +1143,28 @@ class RerankCompressor(BaseDocumentCompressor):
         query: str,
         callbacks: Optional[Callbacks] = None,
     ) -> Sequence[Document]:
+        if not documents:
+            return []
+
         reranking = self.reranking_function is not None
 
+        # Stored vectors attached by VectorSearchRetriever, None for other hits
+        document_embeddings = [
+            doc.metadata.pop(EMBEDDING_METADATA_KEY, None) for doc in documents
+        ]
+
         if reranking:
             scores = self.reranking_function.predict(
                 [(query, doc.page_content) for doc in documents]
             )
         else:
-            from sentence_transformers import util
-
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
+            query_embedding = np.asarray(
+                self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX),
+                dtype=np.float32,
+            )
+            scores = self._cosine_scores(
+                query_embedding, documents, document_embeddings
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
 
         docs_with_scores = list(
             zip(documents, scores.tolist() if not isinstance(scores, list) else scores)
@@ -905,3 +1185,41 @@ class RerankCompressor(BaseDocumentCompressor):
             )
             final_results.append(doc)
         return final_results
+
+    def _cosine_scores(
+        self,
+        query_embedding: np.ndarray,
+        documents: Sequence[Document],
+        document_embeddings: list[Optional[list[float]]],
+    ) -> list[float]:
+        dimension = len(query_embedding)
+        matrix = np.zeros((len(documents), dimension), dtype=np.float32)
+
+        missing = []
+        for idx, embedding in enumerate(document_embeddings):
+            embedding = (
+                np.asarray(embedding, dtype=np.float32)
+                if embedding is not None
+                else None
+            )
+            # Vectors zero padded by the vector DB (pgvector) are trimmed back,
+            # anything else of the wrong size is embedded again
+            if (
+                embedding is not None
+                and len(embedding) >= dimension
+                and not embedding[dimension:].any()
+            ):
+                matrix[idx] = embedding[:dimension]
+            else:
+                missing.append(idx)
+
+        if missing:
+            log.debug(f"RerankCompressor: embedding {len(missing)} documents")
+            embeddings = self.embedding_function(
+                [documents[idx].page_content for idx in missing],
+                RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            matrix[missing] = np.asarray(embeddings, dtype=np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_embedding)
+        return (matrix @ query_embedding / np.maximum(norms, 1e-12)).tolist()
@@ -69,7 +69,11 @@ class ChromaClient(VectorDBBase):
         return self.client.delete_collection(name=collection_name)
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         try:
@@ -78,6 +82,8 @@ class ChromaClient(VectorDBBase):
                 result = collection.query(
                     query_embeddings=vectors,
                     n_results=limit,
+                    include=["documents", "metadatas", "distances"]
+                    + (["embeddings"] if include_embeddings else []),
                 )
 
                 # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
@@ -92,6 +98,17 @@ class ChromaClient(VectorDBBase):
                         "distances": distances,
                         "documents": result["documents"],
                         "metadatas": result["metadatas"],
+                        "embeddings": (
+                            [
+                                [
+                                    list(map(float, embedding))
+                                    for embedding in embeddings
+                                ]
+                                for embeddings in result["embeddings"]
+                            ]
+                            if include_embeddings
+                            else None
+                        ),
                     }
                 )
             return None
@@ -135,6 +152,20 @@ class ChromaClient(VectorDBBase):
             )
         return None
 
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        # Get the items with the given ids.
+        collection = self.client.get_collection(name=collection_name)
+        if collection:
+            result = collection.get(ids=ids)
+            return GetResult(
+                **{
+                    "ids": [result["ids"]],
+                    "documents": [result["documents"]],
+                    "metadatas": [result["metadatas"]],
+                }
+            )
+        return None
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection = self.client.get_or_create_collection(
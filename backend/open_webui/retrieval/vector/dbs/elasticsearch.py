@@ -78,23 +78,28 @@ class ElasticsearchClient(VectorDBBase):
         return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
 
     # Status: works
-    def _result_to_search_result(self, result) -> SearchResult:
+    def _result_to_search_result(
+        self, result, include_embeddings: bool = False
+    ) -> SearchResult:
         ids = []
         distances = []
         documents = []
         metadatas = []
+        embeddings = []
 
         for hit in result["hits"]["hits"]:
             ids.append(hit["_id"])
             distances.append(hit["_score"])
             documents.append(hit["_source"].get("text"))
             metadatas.append(hit["_source"].get("metadata"))
+            embeddings.append(hit["_source"].get("vector"))
 
         return SearchResult(
             ids=[ids],
             distances=[distances],
             documents=[documents],
             metadatas=[metadatas],
+            embeddings=[embeddings] if include_embeddings else None,
         )
 
     # Status: works
@@ -151,11 +156,16 @@ class ElasticsearchClient(VectorDBBase):
 
     # Status: works
     def search(
-        self, collection_name: str, vectors: list[list[float]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         query = {
             "size": limit,
-            "_source": ["text", "metadata"],
+            "_source": ["text", "metadata"]
+            + (["vector"] if include_embeddings else []),
             "query": {
                 "script_score": {
                     "query": {
@@ -175,7 +185,7 @@ class ElasticsearchClient(VectorDBBase):
             index=self._get_index_name(len(vectors[0])), body=query
         )
 
-        return self._result_to_search_result(result)
+        return self._result_to_search_result(result, include_embeddings)
 
     # Status: only tested halfwat
     def query(
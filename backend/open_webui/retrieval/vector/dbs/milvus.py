@@ -56,16 +56,20 @@ class MilvusClient(VectorDBBase):
             }
         )
 
-    def _result_to_search_result(self, result) -> SearchResult:
+    def _result_to_search_result(
+        self, result, include_embeddings: bool = False
+    ) -> SearchResult:
         ids = []
         distances = []
         documents = []
         metadatas = []
+        embeddings = []
         for match in result:
             _ids = []
             _distances = []
             _documents = []
             _metadatas = []
+            _embeddings = []
             for item in match:
                 _ids.append(item.get("id"))
                 # normalize milvus score from [-1, 1] to [0, 1] range
@@ -74,16 +78,19 @@ class MilvusClient(VectorDBBase):
                 _distances.append(_dist)
                 _documents.append(item.get("entity", {}).get("data", {}).get("text"))
                 _metadatas.append(item.get("entity", {}).get("metadata"))
+                _embeddings.append(item.get("entity", {}).get("vector"))
             ids.append(_ids)
             distances.append(_distances)
             documents.append(_documents)
             metadatas.append(_metadatas)
+            embeddings.append(_embeddings)
         return SearchResult(
             **{
                 "ids": ids,
                 "distances": distances,
                 "documents": documents,
                 "metadatas": metadatas,
+                "embeddings": embeddings if include_embeddings else None,
             }
         )
 
@@ -169,7 +176,11 @@ class MilvusClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         collection_name = collection_name.replace("-", "_")
@@ -180,10 +191,11 @@ class MilvusClient(VectorDBBase):
             collection_name=f"{self.collection_prefix}_{collection_name}",
             data=vectors,
             limit=limit,
-            output_fields=["data", "metadata"],
+            output_fields=["data", "metadata"]
+            + (["vector"] if include_embeddings else []),
             # search_params=search_params # Potentially add later if needed
         )
-        return self._result_to_search_result(result)
+        return self._result_to_search_result(result, include_embeddings)
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -281,6 +293,18 @@ class MilvusClient(VectorDBBase):
         # This will use the paginated query logic.
         return self.query(collection_name=collection_name, filter={}, limit=None)
 
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        # Get the items with the given ids.
+        collection_name = collection_name.replace("-", "_")
+        if not self.has_collection(collection_name):
+            return None
+        result = self.client.get(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            output_fields=["id", "data", "metadata"],
+        )
+        return self._result_to_get_result([result])
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
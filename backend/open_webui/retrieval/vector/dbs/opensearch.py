@@ -45,7 +45,9 @@ class OpenSearchClient(VectorDBBase):
 
         return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
 
-    def _result_to_search_result(self, result) -> SearchResult:
+    def _result_to_search_result(
+        self, result, include_embeddings: bool = False
+    ) -> SearchResult:
         if not result["hits"]["hits"]:
             return None
 
@@ -53,18 +55,21 @@ class OpenSearchClient(VectorDBBase):
         distances = []
         documents = []
         metadatas = []
+        embeddings = []
 
         for hit in result["hits"]["hits"]:
             ids.append(hit["_id"])
             distances.append(hit["_score"])
             documents.append(hit["_source"].get("text"))
             metadatas.append(hit["_source"].get("metadata"))
+            embeddings.append(hit["_source"].get("vector"))
 
         return SearchResult(
             ids=[ids],
             distances=[distances],
             documents=[documents],
             metadatas=[metadatas],
+            embeddings=[embeddings] if include_embeddings else None,
         )
 
     def _create_index(self, collection_name: str, dimension: int):
@@ -112,7 +117,11 @@ class OpenSearchClient(VectorDBBase):
         self.client.indices.delete(index=self._get_index_name(collection_name))
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         try:
             if not self.has_collection(collection_name):
@@ -120,7 +129,8 @@ class OpenSearchClient(VectorDBBase):
 
             query = {
                 "size": limit,
-                "_source": ["text", "metadata"],
+                "_source": ["text", "metadata"]
+                + (["vector"] if include_embeddings else []),
                 "query": {
                     "script_score": {
                         "query": {"match_all": {}},
@@ -139,7 +149,7 @@ class OpenSearchClient(VectorDBBase):
                 index=self._get_index_name(collection_name), body=query
             )
 
-            return self._result_to_search_result(result)
+            return self._result_to_search_result(result, include_embeddings)
 
         except Exception as e:
             return None
@@ -300,6 +300,7 @@ class PgvectorClient(VectorDBBase):
         collection_name: str,
         vectors: List[List[float]],
         limit: Optional[int] = None,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         try:
             if not vectors:
@@ -345,6 +346,8 @@ class PgvectorClient(VectorDBBase):
                     "distance"
                 )
             )
+            if include_embeddings:
+                result_fields.append(DocumentChunk.vector)
 
             # Build the lateral subquery for each query vector
             subq = (
@@ -366,6 +369,7 @@ class PgvectorClient(VectorDBBase):
                     subq.c.text,
                     subq.c.vmetadata,
                     subq.c.distance,
+                    *([subq.c.vector] if include_embeddings else []),
                 )
                 .select_from(query_vectors)
                 .join(subq, true())
@@ -379,6 +383,7 @@ class PgvectorClient(VectorDBBase):
             distances = [[] for _ in range(num_queries)]
             documents = [[] for _ in range(num_queries)]
             metadatas = [[] for _ in range(num_queries)]
+            embeddings = [[] for _ in range(num_queries)]
 
             if not results:
                 return SearchResult(
@@ -386,6 +391,7 @@ class PgvectorClient(VectorDBBase):
                     distances=distances,
                     documents=documents,
                     metadatas=metadatas,
+                    embeddings=embeddings if include_embeddings else None,
                 )
 
             for row in results:
@@ -396,9 +402,15 @@ class PgvectorClient(VectorDBBase):
                 distances[qid].append((2.0 - row.distance) / 2.0)
                 documents[qid].append(row.text)
                 metadatas[qid].append(row.vmetadata)
+                if include_embeddings:
+                    embeddings[qid].append([float(value) for value in row.vector])
 
             return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
+                ids=ids,
+                distances=distances,
+                documents=documents,
+                metadatas=metadatas,
+                embeddings=embeddings if include_embeddings else None,
             )
         except Exception as e:
             log.exception(f"Error during search: {e}")
@@ -504,6 +516,35 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during get: {e}")
             return None
 
+    def get_by_ids(self, collection_name: str, ids: List[str]) -> Optional[GetResult]:
+        try:
+            wheres = [
+                DocumentChunk.collection_name == collection_name,
+                DocumentChunk.id.in_(ids),
+            ]
+            if PGVECTOR_PGCRYPTO:
+                stmt = select(
+                    DocumentChunk.id,
+                    pgcrypto_decrypt(
+                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                    ).label("text"),
+                    pgcrypto_decrypt(
+                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                    ).label("vmetadata"),
+                ).where(*wheres)
+                results = self.session.execute(stmt).all()
+            else:
+                results = self.session.query(DocumentChunk).filter(*wheres).all()
+
+            return GetResult(
+                ids=[[result.id for result in results]],
+                documents=[[result.text for result in results]],
+                metadatas=[[result.vmetadata for result in results]],
+            )
+        except Exception as e:
+            log.exception(f"Error during get by ids: {e}")
+            return None
+
     def delete(
         self,
         collection_name: str,
@@ -115,7 +115,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         if limit is None:
@@ -125,6 +129,7 @@ class QdrantClient(VectorDBBase):
             collection_name=f"{self.collection_prefix}_{collection_name}",
             query=vectors[0],
             limit=limit,
+            with_vectors=include_embeddings,
         )
         get_result = self._result_to_get_result(query_response.points)
         return SearchResult(
@@ -133,6 +138,11 @@ class QdrantClient(VectorDBBase):
             metadatas=get_result.metadatas,
             # qdrant distance is [-1, 1], normalize to [0, 1]
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            embeddings=(
+                [[point.vector for point in query_response.points]]
+                if include_embeddings
+                else None
+            ),
         )
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
@@ -169,6 +179,14 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points.points)
 
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        # Get the items with the given ids.
+        points = self.client.retrieve(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+        )
+        return self._result_to_get_result(points)
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
@@ -371,7 +371,11 @@ class QdrantClient(VectorDBBase):
             raise
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
         """
         Search for the nearest neighbor items based on the vectors with tenant isolation.
@@ -417,6 +421,7 @@ class QdrantClient(VectorDBBase):
                 query=vectors[0],
                 prefetch=prefetch_query,
                 limit=limit,
+                with_vectors=include_embeddings,
             )
 
             get_result = self._result_to_get_result(query_response.points)
@@ -428,6 +433,11 @@ class QdrantClient(VectorDBBase):
                 distances=[
                     [(point.score + 1.0) / 2.0 for point in query_response.points]
                 ],
+                embeddings=(
+                    [[point.vector for point in query_response.points]]
+                    if include_embeddings
+                    else None
+                ),
             )
         except (UnexpectedResponse, grpc.RpcError) as e:
             if self._is_collection_not_found_error(e):
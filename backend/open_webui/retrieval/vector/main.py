@@ -18,6 +18,8 @@ class GetResult(BaseModel):
 
 class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
+    # Stored vectors of the results, only set when requested with `include_embeddings`
+    embeddings: Optional[List[List[List[float | int]]]] = None
 
 
 class VectorDBBase(ABC):
@@ -53,9 +55,13 @@ class VectorDBBase(ABC):
 
     @abstractmethod
     def search(
-        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_embeddings: bool = False,
     ) -> Optional[SearchResult]:
-        """Search for similar vectors in a collection."""
+        """Search for similar vectors in a collection, optionally returning the stored vectors of the results."""
         pass
 
     @abstractmethod
@@ -70,6 +76,20 @@ class VectorDBBase(ABC):
         """Retrieve all vectors from a collection."""
         pass
 
+    def get_by_ids(self, collection_name: str, ids: List[str]) -> Optional[GetResult]:
+        """Retrieve the vectors with the given IDs, by default by reading the whole collection."""
+        result = self.get(collection_name)
+        if result is None or not result.ids:
+            return None
+
+        wanted = set(ids)
+        indices = [i for i, id in enumerate(result.ids[0]) if id in wanted]
+        return GetResult(
+            ids=[[result.ids[0][i] for i in indices]],
+            documents=[[result.documents[0][i] for i in indices]],
+            metadatas=[[result.metadatas[0][i] for i in indices]],
+        )
+
     @abstractmethod
     def delete(
         self,
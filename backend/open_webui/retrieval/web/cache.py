@@ -0,0 +1,224 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from typing import Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    WEB_CACHE_MAX_SIZE_MB,
+    WEB_PAGE_CACHE_TTL,
+    WEB_SEARCH_CACHE_TTL,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.cache_index import CacheIndex
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def get_search_cache_key(
+    engine: str, query: str, count: int, domain_filter_list: Optional[list]
+) -> str:
+    return hashlib.sha256(
+        json.dumps([engine, query, count, domain_filter_list or []]).encode("utf-8")
+    ).hexdigest()
+
+
+class CachedPage:
+    def __init__(
+        self,
+        content: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        fresh: bool,
+    ):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+        # Fresh pages are served without asking the site
+        self.fresh = fresh
+
+    def get_validation_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class WebCache:
+    """
+    Cache of web search engine responses and of the pages fetched from their
+    results.
+
+    Search responses are reused for `search_ttl` seconds. Pages are served as
+    is for `page_ttl` seconds after they were last fetched or revalidated,
+    afterwards they are only kept if the site sent an ETag or Last-Modified
+    header to revalidate them with. Both are evicted least recently used first
+    once they take more than `max_size` bytes.
+
+    It also records the web search collections that were completely written,
+    so only those are reused.
+    """
+
+    def __init__(self, path: str, max_size: int, search_ttl: int, page_ttl: int):
+        self.search_ttl = search_ttl
+        self.page_ttl = page_ttl
+
+        self.stats = {
+            "search_hits": 0,
+            "search_misses": 0,
+            "page_hits": 0,
+            "page_revalidations": 0,
+            "page_misses": 0,
+        }
+
+        self.index = CacheIndex(
+            path,
+            max_size,
+            {
+                "search": [
+                    "engine TEXT NOT NULL",
+                    "query TEXT NOT NULL",
+                    "results TEXT NOT NULL",
+                    "created_at REAL NOT NULL",
+                ],
+                "page": [
+                    "content BLOB NOT NULL",
+                    "etag TEXT",
+                    "last_modified TEXT",
+                    "validated_at REAL NOT NULL",
+                ],
+                # Web search collections that were written completely
+                "collection": ["created_at REAL NOT NULL"],
+            },
+        )
+        self.lock = self.index.lock
+
+    def get_search(self, key: str) -> Optional[list[dict]]:
+        if self.search_ttl <= 0:
+            return None
+
+        with self.lock:
+            row = self.index.get("search", key, ["results", "created_at"])
+
+            if row is None or row[1] < time.time() - self.search_ttl:
+                if row is not None:
+                    self.index.delete("search", key)
+                self.stats["search_misses"] += 1
+                return None
+
+            self.stats["search_hits"] += 1
+        return json.loads(row[0])
+
+    def set_search(self, key: str, engine: str, query: str, results: list[dict]):
+        if self.search_ttl <= 0:
+            return
+
+        data = json.dumps(results)
+        self.index.set(
+            "search",
+            key,
+            len(data),
+            engine=engine,
+            query=query,
+            results=data,
+            created_at=time.time(),
+        )
+
+    def get_page(self, url: str) -> Optional[CachedPage]:
+        """
+        Returns the cached page, marked fresh if it can be served without
+        asking the site. Stale pages are only returned if they can be
+        revalidated.
+        """
+        with self.lock:
+            row = self.index.get(
+                "page", url, ["content", "etag", "last_modified", "validated_at"]
+            )
+            if row is None:
+                return None
+
+            content, etag, last_modified, validated_at = row
+            fresh = validated_at >= time.time() - self.page_ttl
+            if not fresh and not (etag or last_modified):
+                self.index.delete("page", url)
+                return None
+
+            if fresh:
+                self.stats["page_hits"] += 1
+
+        return CachedPage(
+            zlib.decompress(content).decode("utf-8"), etag, last_modified, fresh
+        )
+
+    def set_page(
+        self,
+        url: str,
+        content: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        data = zlib.compress(content.encode("utf-8"))
+        with self.lock:
+            self.index.set(
+                "page",
+                url,
+                len(data),
+                content=data,
+                etag=etag,
+                last_modified=last_modified,
+                validated_at=time.time(),
+            )
+            self.stats["page_misses"] += 1
+
+    def revalidate_page(self, url: str):
+        """Marks a page as fresh again after the site answered 304 Not Modified."""
+        with self.lock:
+            self.index.update("page", url, validated_at=time.time())
+            self.stats["page_revalidations"] += 1
+
+    def has_collection(self, collection_name: str) -> bool:
+        """Whether the collection was completely written by `set_collection`."""
+        return self.index.get("collection", collection_name, ["created_at"]) is not None
+
+    def set_collection(self, collection_name: str):
+        self.index.set("collection", collection_name, 0, created_at=time.time())
+
+    def delete_collection(self, collection_name: str):
+        self.index.delete("collection", collection_name)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.stats,
+                "evictions": self.index.evictions,
+                "size": self.index.size,
+                "max_size": self.index.max_size,
+            }
+
+
+WEB_CACHE: Optional[WebCache] = None
+
+
+def get_web_cache() -> Optional[WebCache]:
+    global WEB_CACHE
+
+    if WEB_CACHE is None and WEB_CACHE_MAX_SIZE_MB > 0:
+        try:
+            WEB_CACHE = WebCache(
+                os.path.join(CACHE_DIR, "web", "index.db"),
+                WEB_CACHE_MAX_SIZE_MB * 1024 * 1024,
+                search_ttl=WEB_SEARCH_CACHE_TTL,
+                page_ttl=WEB_PAGE_CACHE_TTL,
+            )
+        except Exception as e:
+            log.exception(f"Error opening web cache: {e}")
+            return None
+
+    return WEB_CACHE
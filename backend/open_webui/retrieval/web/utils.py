@@ -26,6 +26,7 @@ from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from open_webui.retrieval.loaders.tavily import TavilyLoader
 from open_webui.retrieval.loaders.external_web import ExternalWebLoader
+from open_webui.retrieval.web.cache import get_web_cache
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
@@ -490,7 +491,10 @@ class SafePlaywrightURLLoader(PlaywrightURLLoader, RateLimitMixin, URLProcessing
 
 
 class SafeWebBaseLoader(WebBaseLoader):
-    """WebBaseLoader with enhanced error handling for URLs."""
+    """
+    WebBaseLoader with enhanced error handling for URLs, fetching pages
+    through the web cache.
+    """
 
     def __init__(self, trust_env: bool = False, *args, **kwargs):
         """Initialize SafeWebBaseLoader
@@ -504,6 +508,13 @@ class SafeWebBaseLoader(WebBaseLoader):
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
     ) -> str:
+        cache = get_web_cache()
+        cached = None
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get_page, url)
+        if cached is not None and cached.fresh:
+            return cached.content
+
         async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
             for i in range(retries):
                 try:
@@ -511,6 +522,11 @@ class SafeWebBaseLoader(WebBaseLoader):
                         headers=self.session.headers,
                         cookies=self.session.cookies.get_dict(),
                     )
+                    if cached is not None:
+                        kwargs["headers"] = {
+                            **self.session.headers,
+                            **cached.get_validation_headers(),
+                        }
                     if not self.session.verify:
                         kwargs["ssl"] = False
 
@@ -518,9 +534,28 @@ class SafeWebBaseLoader(WebBaseLoader):
                         url,
                         **(self.requests_kwargs | kwargs),
                     ) as response:
+                        if cached is not None and response.status == 304:
+                            await asyncio.to_thread(cache.revalidate_page, url)
+                            return cached.content
+
                         if self.raise_for_status:
                             response.raise_for_status()
-                        return await response.text()
+                        text = await response.text()
+
+                        if (
+                            cache is not None
+                            and response.status == 200
+                            and "no-store"
+                            not in response.headers.get("Cache-Control", "")
+                        ):
+                            await asyncio.to_thread(
+                                cache.set_page,
+                                url,
+                                text,
+                                etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified"),
+                            )
+                        return text
                 except aiohttp.ClientConnectionError as e:
                     if i == retries - 1:
                         raise
@@ -1,4 +1,6 @@
+import asyncio
 import hashlib
+import io
 import json
 import logging
 import os
@@ -6,9 +8,9 @@ import uuid
 from functools import lru_cache
 from pathlib import Path
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from pydub.silence import detect_silence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 from fnmatch import fnmatch
 import aiohttp
@@ -28,11 +30,14 @@ from fastapi import (
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 
+from open_webui.socket.main import send_transcription_event
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.speech_cache import get_speech_cache, split_speech_segments
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
@@ -48,6 +53,8 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
+    STT_CHUNK_DURATION,
+    STT_CHUNK_WORKERS,
 )
 
 
@@ -62,9 +69,6 @@ AZURE_MAX_FILE_SIZE = AZURE_MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to byte
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 
-SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
-SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
 
 ##########################################
 #
@@ -106,19 +110,6 @@ def is_audio_conversion_required(file_path):
         return False
 
 
-def convert_audio_to_mp3(file_path):
-    """Convert audio file to mp3 format."""
-    try:
-        output_path = os.path.splitext(file_path)[0] + ".mp3"
-        audio = AudioSegment.from_file(file_path)
-        audio.export(output_path, format="mp3")
-        log.info(f"Converted {file_path} to {output_path}")
-        return output_path
-    except Exception as e:
-        log.error(f"Error converting audio file: {e}")
-        return None
-
-
 def set_faster_whisper_model(model: str, auto_update: bool = False):
     whisper_model = None
     if model:
@@ -304,21 +295,41 @@ def load_speech_pipeline(request):
         )
 
 
+# Segments synthesized right now, shared by the requests waiting for them
+SPEECH_SYNTHESIS_TASKS: dict[str, asyncio.Task] = {}
+
+# Segments of a message synthesized at the same time
+SPEECH_SYNTHESIS_CONCURRENCY = 4
+
+
+def get_speech_params(request: Request, payload: dict) -> dict:
+    """Everything other than the text that changes the synthesized speech."""
+    config = request.app.state.config
+    params = {
+        **{k: v for k, v in payload.items() if k != "input"},
+        "engine": config.TTS_ENGINE,
+        "model": config.TTS_MODEL,
+    }
+
+    if config.TTS_ENGINE == "azure":
+        params["voice"] = config.TTS_VOICE
+        params["output_format"] = config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
+    return params
+
+
+def is_speech_segmentable(request: Request, payload: dict) -> bool:
+    # MP3 frames can be joined as they are, other formats are cached whole
+    config = request.app.state.config
+    if config.TTS_ENGINE == "openai":
+        return payload.get("response_format", "mp3") == "mp3"
+    elif config.TTS_ENGINE == "azure":
+        return "mp3" in config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
+    return config.TTS_ENGINE in ["elevenlabs", "transformers"]
+
+
 @router.post("/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     body = await request.body()
-    name = hashlib.sha256(
-        body
-        + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
-        + str(request.app.state.config.TTS_MODEL).encode("utf-8")
-    ).hexdigest()
-
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
-
-    # Check if the file already exists in the cache
-    if file_path.is_file():
-        return FileResponse(file_path)
 
     payload = None
     try:
@@ -327,8 +338,84 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         log.exception(e)
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
+    if request.app.state.config.TTS_ENGINE not in [
+        "openai",
+        "elevenlabs",
+        "azure",
+        "transformers",
+    ]:
+        return None
+
+    if request.app.state.config.TTS_ENGINE == "elevenlabs":
+        if payload.get("voice", "") not in get_available_voices(request):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid voice id",
+            )
+
+    params = get_speech_params(request, payload)
+    text = payload.get("input", "")
+
+    segments = None
+    if is_speech_segmentable(request, payload):
+        segments = split_speech_segments(text)
+    segments = segments or [text]
+
+    semaphore = asyncio.Semaphore(SPEECH_SYNTHESIS_CONCURRENCY)
+
+    async def get_segment(segment: str) -> str:
+        async with semaphore:
+            return await get_speech_segment(request, params, payload, segment, user)
+
+    file_paths = await asyncio.gather(*[get_segment(segment) for segment in segments])
+
+    if len(file_paths) == 1:
+        return FileResponse(file_paths[0])
+
+    content = b""
+    for file_path in file_paths:
+        async with aiofiles.open(file_path, "rb") as f:
+            content += await f.read()
+    return Response(content=content, media_type="audio/mpeg")
+
+
+async def get_speech_segment(
+    request: Request, params: dict, payload: dict, text: str, user
+) -> str:
+    """Returns the path of the cached speech of `text`, synthesizing it if needed."""
+    key = hashlib.sha256(
+        json.dumps({**params, "input": text}, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+    speech_cache = get_speech_cache()
+    file_path = await run_in_threadpool(speech_cache.get, key)
+    if file_path is not None:
+        return file_path
+
+    task = SPEECH_SYNTHESIS_TASKS.get(key)
+    if task is None:
+
+        async def synthesize_segment():
+            content = await synthesize_speech(request, {**payload, "input": text}, user)
+            return await run_in_threadpool(
+                speech_cache.set,
+                key,
+                content,
+                params["engine"],
+                params.get("voice"),
+            )
+
+        task = asyncio.create_task(synthesize_segment())
+        SPEECH_SYNTHESIS_TASKS[key] = task
+        task.add_done_callback(lambda _: SPEECH_SYNTHESIS_TASKS.pop(key, None))
+
+    # Shielded so a client going away does not cancel it for the others
+    return await asyncio.shield(task)
+
+
+async def synthesize_speech(request: Request, payload: dict, user) -> bytes:
     if request.app.state.config.TTS_ENGINE == "openai":
-        payload["model"] = request.app.state.config.TTS_MODEL
+        payload = {**payload, "model": request.app.state.config.TTS_MODEL}
 
         try:
             timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
@@ -355,14 +442,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -385,12 +465,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
     elif request.app.state.config.TTS_ENGINE == "elevenlabs":
         voice_id = payload.get("voice", "")
 
-        if voice_id not in get_available_voices(request):
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid voice id",
-            )
-
         try:
             timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
             async with aiohttp.ClientSession(
@@ -411,14 +485,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -438,12 +505,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION or "eastus"
         base_url = request.app.state.config.TTS_AZURE_SPEECH_BASE_URL
         language = request.app.state.config.TTS_VOICE
@@ -470,14 +531,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-                    return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -497,13 +551,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         import torch
         import soundfile as sf
 
@@ -528,12 +575,11 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             forward_params={"speaker_embeddings": speaker_embedding},
         )
 
-        sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
-
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
-
-        return FileResponse(file_path)
+        buffer = io.BytesIO()
+        sf.write(
+            buffer, speech["audio"], samplerate=speech["sampling_rate"], format="MP3"
+        )
+        return buffer.getvalue()
 
 
 def transcription_handler(request, file_path, metadata):
@@ -795,21 +841,38 @@ def transcription_handler(request, file_path, metadata):
             )
 
 
-def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
+def transcribe(
+    request: Request,
+    file_path: str,
+    metadata: Optional[dict] = None,
+    on_chunk: Optional[Callable[[dict], None]] = None,
+):
+    """
+    Transcribes a recording. Recordings that are too large for a single request
+    or that are streamed (`on_chunk`) are cut into chunks at silences and
+    transcribed in parallel, `on_chunk` is called with every partial transcript
+    as soon as it is ready.
+    """
     log.info(f"transcribe: {file_path} {metadata}")
 
-    if is_audio_conversion_required(file_path):
-        file_path = convert_audio_to_mp3(file_path)
-
-    try:
-        file_path = compress_audio(file_path)
-    except Exception as e:
-        log.exception(e)
+    if (
+        on_chunk is None
+        and os.path.getsize(file_path) <= MAX_FILE_SIZE
+        and not is_audio_conversion_required(file_path)
+    ):
+        # Sent as it is, without decoding it
+        try:
+            result = transcription_handler(request, file_path, metadata)
+        except Exception as transcribe_exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error transcribing chunk: {transcribe_exc}",
+            )
+        return {"text": result["text"]}
 
-    # Always produce a list of chunk paths (could be one entry if small)
     try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
+        audio = load_audio(file_path)
+        chunk_ranges = get_chunk_ranges(audio, STT_CHUNK_DURATION * 1000)
     except Exception as e:
         log.exception(e)
         raise HTTPException(
@@ -817,104 +880,108 @@ def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None
             detail=ERROR_MESSAGES.DEFAULT(e),
         )
 
-    results = []
+    base, _ = os.path.splitext(file_path)
+    texts = [None] * len(chunk_ranges)
+
+    def transcribe_chunk(index: int) -> str:
+        start, end = chunk_ranges[index]
+        chunk_path = f"{base}_chunk_{index}.mp3"
+
+        # Exported by the worker, so only the chunks being transcribed are
+        # ever written to disk
+        audio[start:end].export(chunk_path, format="mp3", bitrate="32k")
+        try:
+            return transcription_handler(request, chunk_path, metadata)["text"]
+        finally:
+            try:
+                os.remove(chunk_path)
+            except Exception:
+                pass
+
+    executor = ThreadPoolExecutor(max_workers=STT_CHUNK_WORKERS)
     try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
-            for future in futures:
-                try:
-                    results.append(future.result())
-                except Exception as transcribe_exc:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error transcribing chunk: {transcribe_exc}",
-                    )
+        futures = {
+            executor.submit(transcribe_chunk, index): index
+            for index in range(len(chunk_ranges))
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                texts[index] = future.result().strip()
+            except Exception as transcribe_exc:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error transcribing chunk: {transcribe_exc}",
+                )
+
+            if on_chunk is not None:
+                start, end = chunk_ranges[index]
+                on_chunk(
+                    {
+                        "index": index,
+                        "total": len(chunk_ranges),
+                        "start": start / 1000,
+                        "end": end / 1000,
+                        "text": texts[index],
+                    }
+                )
     finally:
-        # Clean up only the temporary chunks, never the original file
-        for chunk_path in chunk_paths:
-            if chunk_path != file_path and os.path.isfile(chunk_path):
-                try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
+        executor.shutdown(wait=True, cancel_futures=True)
 
     return {
-        "text": " ".join([result["text"] for result in results]),
+        "text": " ".join([text for text in texts if text]),
     }
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
-
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
+def load_audio(file_path: str) -> AudioSegment:
+    """Decodes a recording once, as 16kHz mono, all speech recognition needs."""
+    audio = AudioSegment.from_file(file_path, parameters=["-ac", "1", "-ar", "16000"])
+    return audio.set_frame_rate(16000).set_channels(1)
 
-        return compressed_path
-    else:
-        return file_path
 
-
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
+def get_chunk_ranges(
+    audio: AudioSegment,
+    chunk_ms: int,
+    search_ms: int = 10000,
+    min_silence_ms: int = 300,
+) -> list[tuple[int, int]]:
     """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
+    Cuts a recording into (start, end) ranges of at most `chunk_ms`, each one
+    ending in the middle of the longest silence of its last `search_ms`, so
+    words are not split between chunks.
     """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
-
-    audio = AudioSegment.from_file(file_path)
     duration_ms = len(audio)
-    orig_size = file_size
+    silence_thresh = audio.dBFS - 16 if audio.dBFS != float("-inf") else -50
 
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
-    chunks = []
+    ranges = []
     start = 0
-    i = 0
-
-    base, _ = os.path.splitext(file_path)
-
     while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
-
-        chunks.append(chunk_path)
+        end = min(start + chunk_ms, duration_ms)
+
+        if end < duration_ms:
+            window_start = max(end - search_ms, start + chunk_ms // 2)
+            silences = detect_silence(
+                audio[window_start:end],
+                min_silence_len=min_silence_ms,
+                silence_thresh=silence_thresh,
+                seek_step=10,
+            )
+            if silences:
+                silence_start, silence_end = max(silences, key=lambda r: r[1] - r[0])
+                end = window_start + (silence_start + silence_end) // 2
+
+        ranges.append((start, end))
         start = end
-        i += 1
 
-    return chunks
+    return ranges
 
 
 @router.post("/transcriptions")
-def transcription(
+async def transcription(
     request: Request,
     file: UploadFile = File(...),
     language: Optional[str] = Form(None),
+    stream: bool = Form(False),
     user=Depends(get_verified_user),
 ):
     log.info(f"file.content_type: {file.content_type}")
@@ -938,14 +1005,14 @@ def transcription(
         id = uuid.uuid4()
 
         filename = f"{id}.{ext}"
-        contents = file.file.read()
 
         file_dir = f"{CACHE_DIR}/audio/transcriptions"
         os.makedirs(file_dir, exist_ok=True)
         file_path = f"{file_dir}/{filename}"
 
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(1024 * 1024):
+                await f.write(chunk)
 
         try:
             metadata = None
@@ -953,7 +1020,21 @@ def transcription(
             if language:
                 metadata = {"language": language}
 
-            result = transcribe(request, file_path, metadata)
+            if stream:
+                # Transcribed in the background, the transcript is sent as
+                # "transcription-events" chunk by chunk
+                task = asyncio.create_task(
+                    stream_transcription(request, file_path, metadata, user.id, str(id))
+                )
+                TRANSCRIPTION_TASKS.add(task)
+                task.add_done_callback(TRANSCRIPTION_TASKS.discard)
+
+                return {
+                    "id": str(id),
+                    "filename": os.path.basename(file_path),
+                }
+
+            result = await run_in_threadpool(transcribe, request, file_path, metadata)
 
             return {
                 **result,
@@ -977,6 +1058,39 @@ def transcription(
         )
 
 
+# Keeps the streamed transcriptions running after their request returned
+TRANSCRIPTION_TASKS = set()
+
+
+async def stream_transcription(
+    request: Request,
+    file_path: str,
+    metadata: Optional[dict],
+    user_id: str,
+    transcription_id: str,
+):
+    loop = asyncio.get_running_loop()
+
+    def send(event_data: dict):
+        # Called from the transcription threads
+        asyncio.run_coroutine_threadsafe(
+            send_transcription_event(user_id, {"id": transcription_id, **event_data}),
+            loop,
+        )
+
+    try:
+        result = await run_in_threadpool(transcribe, request, file_path, metadata, send)
+        send({"done": True, "text": result["text"]})
+    except Exception as e:
+        log.exception(e)
+        send(
+            {
+                "done": True,
+                "error": str(e.detail) if hasattr(e, "detail") else str(e),
+            }
+        )
+
+
 def get_available_models(request: Request) -> list[dict]:
     available_models = []
     if request.app.state.config.TTS_ENGINE == "openai":
@@ -4,6 +4,7 @@ from typing import Optional
 
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 
@@ -26,7 +27,7 @@ from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, get_users_with_access
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import WEBHOOK_DISPATCHER
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -143,9 +144,34 @@ class MessageUserResponse(MessageResponse):
     user: UserNameResponse
 
 
+def get_message_user_responses(
+    messages: list[MessageResponse],
+) -> list[MessageUserResponse]:
+    users = {
+        user.id: user
+        for user in Users.get_users_by_user_ids(
+            list({message.user_id for message in messages})
+        )
+    }
+
+    return [
+        MessageUserResponse(
+            **{
+                **message.model_dump(),
+                "user": UserNameResponse(**users[message.user_id].model_dump()),
+            }
+        )
+        for message in messages
+    ]
+
+
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
-    id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
+    id: str,
+    skip: int = 0,
+    limit: int = 50,
+    before: Optional[str] = None,
+    user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
     if not channel:
@@ -160,31 +186,9 @@ async def get_channel_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        replies = Messages.get_replies_by_message_id(message.id)
-        latest_reply_at = replies[0].created_at if replies else None
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": len(replies),
-                    "latest_reply_at": latest_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    return get_message_user_responses(
+        Messages.get_message_page_by_channel_id(id, limit, before=before, skip=skip)
+    )
 
 
 ############################
@@ -193,7 +197,10 @@ async def get_channel_messages(
 
 
 async def send_notification(name, webui_url, channel, message, active_user_ids):
-    users = get_users_with_access("read", channel.access_control)
+    users = await run_in_threadpool(
+        get_users_with_access, "read", channel.access_control
+    )
+    active_user_ids = set(active_user_ids)
 
     for user in users:
         if user.id in active_user_ids:
@@ -205,7 +212,7 @@ async def send_notification(name, webui_url, channel, message, active_user_ids):
                 )
 
                 if webhook_url:
-                    post_webhook(
+                    WEBHOOK_DISPATCHER.dispatch(
                         name,
                         webhook_url,
                         f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
@@ -299,7 +306,7 @@ async def post_new_message(
                         to=f"channel:{channel.id}",
                     )
 
-            active_user_ids = get_user_ids_from_room(f"channel:{channel.id}")
+            active_user_ids = await get_user_ids_from_room(f"channel:{channel.id}")
 
             background_tasks.add_task(
                 send_notification,
@@ -374,6 +381,7 @@ async def get_channel_thread_messages(
     message_id: str,
     skip: int = 0,
     limit: int = 50,
+    before: Optional[str] = None,
     user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
@@ -389,28 +397,11 @@ async def get_channel_thread_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": 0,
-                    "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
+    return get_message_user_responses(
+        Messages.get_thread_message_page_by_parent_id(
+            id, message_id, limit, before=before, skip=skip
         )
-
-    return messages
+    )
 
 
 ############################
@@ -4,6 +4,7 @@ from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_registry import invalidate_models
 from open_webui.config import get_config, save_config
 from open_webui.config import BannerModel
 
@@ -25,6 +26,7 @@ class ImportConfigForm(BaseModel):
 @router.post("/import", response_model=dict)
 async def import_config(form_data: ImportConfigForm, user=Depends(get_admin_user)):
     save_config(form_data.config)
+    invalidate_models()
     return get_config()
 
 
@@ -268,6 +270,7 @@ async def set_models_config(
 ):
     request.app.state.config.DEFAULT_MODELS = form_data.DEFAULT_MODELS
     request.app.state.config.MODEL_ORDER_LIST = form_data.MODEL_ORDER_LIST
+    invalidate_models()
     return {
         "DEFAULT_MODELS": request.app.state.config.DEFAULT_MODELS,
         "MODEL_ORDER_LIST": request.app.state.config.MODEL_ORDER_LIST,
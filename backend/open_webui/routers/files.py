@@ -18,9 +18,10 @@ from fastapi import (
     status,
     Query,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import SRC_LOG_LEVELS, ENABLE_FILE_INGESTION_QUEUE
 
 from open_webui.models.users import Users
 from open_webui.models.files import (
@@ -34,6 +35,11 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
+from open_webui.retrieval.ingestion import (
+    FileStatus,
+    get_ingestion_queue,
+    set_file_status,
+)
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from pydantic import BaseModel
@@ -62,19 +68,57 @@ def has_access_to_file(
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
 
-    has_access = False
     knowledge_base_id = file.meta.get("collection_name") if file.meta else None
 
     if knowledge_base_id:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
-            user.id, access_type
+        return Knowledges.can_access(knowledge_base_id, user.id, access_type)
+    return False
+
+
+############################
+# Process Uploaded File
+############################
+
+
+def process_uploaded_file(request: Request, file_id: str, user):
+    """Extracts the content of an uploaded file and stores it for retrieval."""
+    file = Files.get_file_by_id(file_id)
+    content_type = file.meta.get("content_type")
+
+    if content_type:
+        stt_supported_content_types = (
+            request.app.state.config.STT_SUPPORTED_CONTENT_TYPES
+            or [
+                "audio/*",
+                "video/webm",
+            ]
         )
-        for knowledge_base in knowledge_bases:
-            if knowledge_base.id == knowledge_base_id:
-                has_access = True
-                break
 
-    return has_access
+        if any(
+            fnmatch(content_type, stt_content_type)
+            for stt_content_type in stt_supported_content_types
+        ):
+            set_file_status(file.id, FileStatus.EXTRACTING)
+            file_path = Storage.get_file(file.path)
+            result = transcribe(request, file_path, file.meta.get("data", {}))
+
+            process_file(
+                request,
+                ProcessFileForm(file_id=file.id, content=result.get("text", "")),
+                user=user,
+            )
+        elif (not content_type.startswith(("image/", "video/"))) or (
+            request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+        ):
+            process_file(request, ProcessFileForm(file_id=file.id), user=user)
+        else:
+            # Images and videos are used as is
+            set_file_status(file.id, FileStatus.DONE)
+    else:
+        log.info(
+            f"File type {content_type} is not provided, but trying to process anyway"
+        )
+        process_file(request, ProcessFileForm(file_id=file.id), user=user)
 
 
 ############################
@@ -103,6 +147,17 @@ def upload_file(
             )
     file_metadata = metadata if metadata else {}
 
+    if (
+        process
+        and not internal
+        and ENABLE_FILE_INGESTION_QUEUE
+        and get_ingestion_queue().is_full()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ERROR_MESSAGES.FILE_INGESTION_QUEUE_FULL,
+        )
+
     try:
         unsanitized_filename = file.filename
         filename = os.path.basename(unsanitized_filename)
@@ -134,7 +189,7 @@ def upload_file(
             "OpenWebUI-User-Name": user.name,
             "OpenWebUI-File-Id": id,
         }
-        contents, file_path = Storage.upload_file(file.file, filename, tags)
+        file_info, file_path = Storage.upload_file(file.file, filename, tags)
 
         file_item = Files.insert_new_file(
             user.id,
@@ -146,45 +201,21 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": file_info["size"],
+                        "sha256": file_info["sha256"],
                         "data": file_metadata,
                     },
                 }
             ),
         )
-        if process:
+        if process and ENABLE_FILE_INGESTION_QUEUE:
+            # Processed by the ingestion workers, progress is reported through
+            # "file-events" and /files/{id}/process/status
+            get_ingestion_queue().enqueue(id, user.id)
+            file_item = Files.get_file_by_id(id=id)
+        elif process:
             try:
-                if file.content_type:
-                    stt_supported_content_types = (
-                        request.app.state.config.STT_SUPPORTED_CONTENT_TYPES
-                        or [
-                            "audio/*",
-                            "video/webm",
-                        ]
-                    )
-
-                    if any(
-                        fnmatch(file.content_type, content_type)
-                        for content_type in stt_supported_content_types
-                    ):
-                        file_path = Storage.get_file(file_path)
-                        result = transcribe(request, file_path, file_metadata)
-
-                        process_file(
-                            request,
-                            ProcessFileForm(file_id=id, content=result.get("text", "")),
-                            user=user,
-                        )
-                    elif (not file.content_type.startswith(("image/", "video/"))) or (
-                        request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-                    ):
-                        process_file(request, ProcessFileForm(file_id=id), user=user)
-                else:
-                    log.info(
-                        f"File type {file.content_type} is not provided, but trying to process anyway"
-                    )
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
-
+                process_uploaded_file(request, id, user)
                 file_item = Files.get_file_by_id(id=id)
             except Exception as e:
                 log.exception(e)
@@ -328,6 +359,39 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
         )
 
 
+############################
+# Get File Process Status By Id
+############################
+
+
+@router.get("/{id}/process/status")
+async def get_file_process_status_by_id(id: str, user=Depends(get_verified_user)):
+    file = Files.get_file_by_id(id)
+
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    if (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        data = file.data or {}
+        return {
+            "status": data.get("status"),
+            "error": data.get("error"),
+            "attempts": data.get("attempts", 0),
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
 ############################
 # Get File Data Content By Id
 ############################
@@ -383,7 +447,8 @@ async def update_file_data_content_by_id(
         or has_access_to_file(id, "write", user)
     ):
         try:
-            process_file(
+            await run_in_threadpool(
+                process_file,
                 request,
                 ProcessFileForm(file_id=id, content=form_data.content),
                 user=user,
@@ -17,6 +17,8 @@ from open_webui.utils.plugin import (
     replace_imports,
     get_function_module_from_cache,
 )
+from open_webui.utils.model_registry import invalidate_models
+from open_webui.utils.function_registry import FUNCTION_REGISTRY, get_content_hash
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -139,7 +141,10 @@ class SyncFunctionsForm(FunctionForm):
 async def sync_functions(
     request: Request, form_data: SyncFunctionsForm, user=Depends(get_admin_user)
 ):
-    return Functions.sync_functions(user.id, form_data.functions)
+    functions = Functions.sync_functions(user.id, form_data.functions)
+    invalidate_models()
+    await FUNCTION_REGISTRY.invalidate()
+    return functions
 
 
 ############################
@@ -169,15 +174,22 @@ async def create_new_function(
             )
             form_data.meta.manifest = frontmatter
 
-            FUNCTIONS = request.app.state.FUNCTIONS
-            FUNCTIONS[form_data.id] = function_module
-
             function = Functions.insert_new_function(user.id, function_type, form_data)
 
             function_cache_dir = CACHE_DIR / "functions" / form_data.id
             function_cache_dir.mkdir(parents=True, exist_ok=True)
 
             if function:
+                content_hash = get_content_hash(form_data.content)
+                FUNCTION_REGISTRY.set(
+                    form_data.id,
+                    function_module,
+                    function_type,
+                    frontmatter,
+                    content_hash,
+                )
+                await FUNCTION_REGISTRY.invalidate(form_data.id, content_hash)
+                invalidate_models()
                 return function
             else:
                 raise HTTPException(
@@ -229,6 +241,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            invalidate_models()
             return function
         else:
             raise HTTPException(
@@ -256,6 +269,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            invalidate_models()
             return function
         else:
             raise HTTPException(
@@ -285,15 +299,18 @@ async def update_function_by_id(
         )
         form_data.meta.manifest = frontmatter
 
-        FUNCTIONS = request.app.state.FUNCTIONS
-        FUNCTIONS[id] = function_module
-
         updated = {**form_data.model_dump(exclude={"id"}), "type": function_type}
         log.debug(updated)
 
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            content_hash = get_content_hash(form_data.content)
+            FUNCTION_REGISTRY.set(
+                id, function_module, function_type, frontmatter, content_hash
+            )
+            await FUNCTION_REGISTRY.invalidate(id, content_hash)
+            invalidate_models()
             return function
         else:
             raise HTTPException(
@@ -320,9 +337,8 @@ async def delete_function_by_id(
     result = Functions.delete_function_by_id(id)
 
     if result:
-        FUNCTIONS = request.app.state.FUNCTIONS
-        if id in FUNCTIONS:
-            del FUNCTIONS[id]
+        await FUNCTION_REGISTRY.invalidate(id, deleted=True)
+        invalidate_models()
 
     return result
 
@@ -399,6 +415,8 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                invalidate_models()
+                await FUNCTION_REGISTRY.invalidate(id)
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
@@ -484,6 +502,7 @@ async def update_function_user_valves_by_id(
                 Functions.update_user_valves_by_id_and_user_id(
                     id, user.id, user_valves.model_dump()
                 )
+                await FUNCTION_REGISTRY.invalidate(id)
                 return user_valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function user valves by id {id}: {e}")
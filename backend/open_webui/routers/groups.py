@@ -16,6 +16,7 @@ from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_registry import invalidate_models
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -93,6 +94,8 @@ async def update_group_by_id(
 
         group = Groups.update_group_by_id(id, form_data)
         if group:
+            # Group membership decides which models users can access
+            invalidate_models()
             return group
         else:
             raise HTTPException(
@@ -117,6 +120,7 @@ async def delete_group_by_id(id: str, user=Depends(get_admin_user)):
     try:
         result = Groups.delete_group_by_id(id)
         if result:
+            invalidate_models()
             return result
         else:
             raise HTTPException(
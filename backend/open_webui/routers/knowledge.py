@@ -1,6 +1,7 @@
 from typing import List, Optional
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 import logging
 
 from open_webui.models.knowledge import (
@@ -10,6 +11,7 @@ from open_webui.models.knowledge import (
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
+from open_webui.models.bm25 import BM25Index
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 from open_webui.routers.retrieval import (
     process_file,
@@ -203,6 +205,7 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=knowledge_base.id
                     )
+                BM25Index.delete_collection(knowledge_base.id)
             except Exception as e:
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
@@ -210,7 +213,8 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
             failed_files = []
             for file in files:
                 try:
-                    process_file(
+                    await run_in_threadpool(
+                        process_file,
                         request,
                         ProcessFileForm(
                             file_id=file.id, collection_name=knowledge_base.id
@@ -451,6 +455,7 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    BM25Index.delete_documents(knowledge.id, filter={"file_id": form_data.file_id})
 
     # Add content to the vector database
     try:
@@ -519,6 +524,7 @@ def remove_file_from_knowledge_by_id(
 
     # Remove content from the vector database
     try:
+        BM25Index.delete_documents(knowledge.id, filter={"file_id": form_data.file_id})
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
@@ -530,6 +536,7 @@ def remove_file_from_knowledge_by_id(
     try:
         # Remove the file's collection from vector database
         file_collection = f"file-{form_data.file_id}"
+        BM25Index.delete_collection(file_collection)
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
     except Exception as e:
@@ -629,6 +636,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     # Clean up vector DB
     try:
+        BM25Index.delete_collection(id)
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
@@ -662,6 +670,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     try:
+        BM25Index.delete_collection(id)
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import logging
 from typing import Optional
 
+from open_webui.models.bm25 import BM25Index
 from open_webui.models.memories import Memories, MemoryModel
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 from open_webui.utils.auth import get_verified_user
@@ -15,9 +17,26 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 router = APIRouter()
 
 
+def update_memory_bm25_index(user_id: str, memory: MemoryModel):
+    # Only an index built before is updated, one built now would only hold
+    # this memory and never be rebuilt from the vector DB
+    collection_name = f"user-memory-{user_id}"
+    if BM25Index.has_collection(collection_name):
+        BM25Index.add_documents(
+            collection_name,
+            ids=[memory.id],
+            texts=[memory.content],
+            metadatas=[{"created_at": memory.created_at}],
+        )
+
+
 @router.get("/ef")
 async def get_embeddings(request: Request):
-    return {"result": request.app.state.EMBEDDING_FUNCTION("hello world")}
+    return {
+        "result": await run_in_threadpool(
+            request.app.state.EMBEDDING_FUNCTION, "hello world"
+        )
+    }
 
 
 ############################
@@ -57,13 +76,14 @@ async def add_memory(
             {
                 "id": memory.id,
                 "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
+                "vector": await run_in_threadpool(
+                    request.app.state.EMBEDDING_FUNCTION, memory.content, user=user
                 ),
                 "metadata": {"created_at": memory.created_at},
             }
         ],
     )
+    update_memory_bm25_index(user.id, memory)
 
     return memory
 
@@ -84,7 +104,11 @@ async def query_memory(
 ):
     results = VECTOR_DB_CLIENT.search(
         collection_name=f"user-memory-{user.id}",
-        vectors=[request.app.state.EMBEDDING_FUNCTION(form_data.content, user=user)],
+        vectors=[
+            await run_in_threadpool(
+                request.app.state.EMBEDDING_FUNCTION, form_data.content, user=user
+            )
+        ],
         limit=form_data.k,
     )
 
@@ -99,6 +123,8 @@ async def reset_memory_from_vector_db(
     request: Request, user=Depends(get_verified_user)
 ):
     VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
+    # Rebuilt from the vector DB on the next hybrid search
+    BM25Index.delete_collection(f"user-memory-{user.id}")
 
     memories = Memories.get_memories_by_user_id(user.id)
     VECTOR_DB_CLIENT.upsert(
@@ -107,8 +133,8 @@ async def reset_memory_from_vector_db(
             {
                 "id": memory.id,
                 "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
+                "vector": await run_in_threadpool(
+                    request.app.state.EMBEDDING_FUNCTION, memory.content, user=user
                 ),
                 "metadata": {
                     "created_at": memory.created_at,
@@ -134,6 +160,7 @@ async def delete_memory_by_user_id(user=Depends(get_verified_user)):
     if result:
         try:
             VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
+            BM25Index.delete_collection(f"user-memory-{user.id}")
         except Exception as e:
             log.error(e)
         return True
@@ -166,8 +193,10 @@ async def update_memory_by_id(
                 {
                     "id": memory.id,
                     "text": memory.content,
-                    "vector": request.app.state.EMBEDDING_FUNCTION(
-                        memory.content, user=user
+                    "vector": await run_in_threadpool(
+                        request.app.state.EMBEDDING_FUNCTION,
+                        memory.content,
+                        user=user,
                     ),
                     "metadata": {
                         "created_at": memory.created_at,
@@ -176,6 +205,7 @@ async def update_memory_by_id(
                 }
             ],
         )
+        update_memory_bm25_index(user.id, memory)
 
     return memory
 
@@ -193,6 +223,7 @@ async def delete_memory_by_id(memory_id: str, user=Depends(get_verified_user)):
         VECTOR_DB_CLIENT.delete(
             collection_name=f"user-memory-{user.id}", ids=[memory_id]
         )
+        BM25Index.delete_documents(f"user-memory-{user.id}", ids=[memory_id])
         return True
 
     return False
@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.model_registry import invalidate_models
 
 
 router = APIRouter()
@@ -70,6 +71,7 @@ async def create_new_model(
     else:
         model = Models.insert_new_model(form_data, user.id)
         if model:
+            invalidate_models()
             return model
         else:
             raise HTTPException(
@@ -118,6 +120,7 @@ async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
             model = Models.toggle_model_by_id(id)
 
             if model:
+                invalidate_models()
                 return model
             else:
                 raise HTTPException(
@@ -166,6 +169,7 @@ async def update_model_by_id(
         )
 
     model = Models.update_model_by_id(id, form_data)
+    invalidate_models()
     return model
 
 
@@ -194,10 +198,12 @@ async def delete_model_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     result = Models.delete_model_by_id(id)
+    invalidate_models()
     return result
 
 
 @router.delete("/delete/all", response_model=bool)
 async def delete_all_models(user=Depends(get_admin_user)):
     result = Models.delete_all_models()
+    invalidate_models()
     return result
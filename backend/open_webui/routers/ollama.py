@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -50,6 +45,12 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_registry import invalidate_models
+from open_webui.utils.load_balancer import (
+    OLLAMA_LOAD_BALANCER,
+    Lease,
+    is_failure_status,
+)
 
 
 from open_webui.config import (
@@ -62,6 +63,7 @@ from open_webui.env import (
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
     BYPASS_MODEL_ACCESS_CONTROL,
+    OLLAMA_HEALTH_CHECK_INTERVAL,
 )
 from open_webui.constants import ERROR_MESSAGES
 
@@ -108,7 +110,11 @@ async def send_get_request(url, key=None, user: UserModel = None):
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
     session: Optional[aiohttp.ClientSession],
+    lease: Optional[Lease] = None,
 ):
+    # Releases the backend even if the response body was never streamed
+    if lease:
+        lease.release()
     if response:
         response.close()
     if session:
@@ -122,9 +128,21 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    backend_url: Optional[str] = None,
+    model: Optional[str] = None,
 ):
-
+    """
+    With `backend_url` the request is tracked by the load balancer, which
+    learns the latency and health of the backend and that it has `model`
+    loaded.
+    """
     r = None
+    streaming = False
+    lease = None
+    if backend_url:
+        lease = OLLAMA_LOAD_BALANCER.acquire(backend_url)
+        start = time.time()
+
     try:
         session = aiohttp.ClientSession(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
@@ -166,18 +184,24 @@ async def send_post_request(
                 )
 
         r.raise_for_status()  # Raises an error for bad responses (4xx, 5xx)
+        if backend_url:
+            OLLAMA_LOAD_BALANCER.record_success(
+                backend_url, latency=time.time() - start, model=model
+            )
+
         if stream:
             response_headers = dict(r.headers)
 
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
-                r.content,
+                (OLLAMA_LOAD_BALANCER.stream(lease, r.content) if lease else r.content),
                 status_code=r.status,
                 headers=response_headers,
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, session=session, lease=lease
                 ),
             )
         else:
@@ -186,14 +210,43 @@ async def send_post_request(
             return res
 
     except HTTPException as e:
+        if backend_url and is_failure_status(r.status if r else None):
+            OLLAMA_LOAD_BALANCER.record_failure(backend_url)
         raise e  # Re-raise HTTPException to be handled by FastAPI
     except Exception as e:
+        if backend_url and is_failure_status(r.status if r else None):
+            OLLAMA_LOAD_BALANCER.record_failure(backend_url)
         detail = f"Ollama: {e}"
 
         raise HTTPException(
             status_code=r.status if r else 500,
             detail=detail if e else "Open WebUI: Server Connection Error",
         )
+    finally:
+        if lease and not streaming:
+            lease.release()
+
+
+def invalidate_models_on_completion(response):
+    """
+    Invalidates the model list once the request behind `response` is done,
+    for streamed responses once their stream has ended.
+    """
+    if not isinstance(response, StreamingResponse):
+        invalidate_models()
+        return response
+
+    stream = response.body_iterator
+
+    async def body_iterator():
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            invalidate_models()
+
+    response.body_iterator = body_iterator()
+    return response
 
 
 def get_api_key(idx, url, configs):
@@ -204,6 +257,63 @@ def get_api_key(idx, url, configs):
     )  # Legacy support
 
 
+def select_url_idx(request: Request, url_idxs: list[int], model: str) -> int:
+    urls = [request.app.state.config.OLLAMA_BASE_URLS[idx] for idx in url_idxs]
+    return url_idxs[OLLAMA_LOAD_BALANCER.select(urls, model=model)]
+
+
+async def check_backends_health(app):
+    """
+    Polls /api/ps on every enabled connection. Unreachable backends count as
+    failures for the load balancer, the loaded models of the others are used
+    to route requests to nodes that do not have to load the model first.
+    """
+    config = app.state.config
+    if not config.ENABLE_OLLAMA_API:
+        return
+
+    async def check_backend_health(idx: int, url: str):
+        api_config = config.OLLAMA_API_CONFIGS.get(
+            str(idx), config.OLLAMA_API_CONFIGS.get(url, {})  # Legacy support
+        )
+        if not api_config.get("enable", True):
+            return
+
+        response = await send_get_request(f"{url}/api/ps", api_config.get("key"))
+        if not response or "models" not in response:
+            OLLAMA_LOAD_BALANCER.record_failure(url)
+            return
+
+        prefix_id = api_config.get("prefix_id", None)
+        OLLAMA_LOAD_BALANCER.record_success(url)
+        OLLAMA_LOAD_BALANCER.set_loaded_models(
+            url,
+            [
+                f"{prefix_id}.{model['model']}" if prefix_id else model["model"]
+                for model in response["models"]
+            ],
+        )
+
+    await asyncio.gather(
+        *[
+            check_backend_health(idx, url)
+            for idx, url in enumerate(config.OLLAMA_BASE_URLS)
+        ]
+    )
+
+
+async def periodic_backends_health_check(app):
+    if OLLAMA_HEALTH_CHECK_INTERVAL <= 0:
+        return
+
+    while True:
+        try:
+            await check_backends_health(app)
+        except Exception as e:
+            log.exception(f"Error checking Ollama backends: {e}")
+        await asyncio.sleep(OLLAMA_HEALTH_CHECK_INTERVAL)
+
+
 ##########################################
 #
 # API routes
@@ -306,6 +416,8 @@ async def update_config(
         if key in keys
     }
 
+    invalidate_models()
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -560,6 +672,15 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
     return models
 
 
+@router.get("/backends")
+async def get_backends(user=Depends(get_admin_user)):
+    """
+    Load balancer state of every Ollama connection: requests in flight, total
+    requests and failures, latency, health and loaded models.
+    """
+    return OLLAMA_LOAD_BALANCER.get_stats()
+
+
 @router.get("/api/version")
 @router.get("/api/version/{url_idx}")
 async def get_ollama_versions(request: Request, url_idx: Optional[int] = None):
@@ -715,12 +836,13 @@ async def pull_model(
     # Admin should be able to pull models from any source
     payload = {**form_data.model_dump(exclude_none=True), "insecure": True}
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/pull",
         payload=json.dumps(payload),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_models_on_completion(response)
 
 
 class PushModelForm(BaseModel):
@@ -752,12 +874,13 @@ async def push_model(
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     log.debug(f"url: {url}")
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/push",
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_models_on_completion(response)
 
 
 class CreateModelForm(BaseModel):
@@ -779,12 +902,13 @@ async def create_model(
     log.debug(f"form_data: {form_data}")
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/create",
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_models_on_completion(response)
 
 
 class CopyModelForm(BaseModel):
@@ -836,6 +960,7 @@ async def copy_model(
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
         r.raise_for_status()
+        invalidate_models()
 
         log.debug(f"r.text: {r.text}")
         return True
@@ -901,6 +1026,7 @@ async def delete_model(
             },
         )
         r.raise_for_status()
+        invalidate_models()
 
         log.debug(f"r.text: {r.text}")
         return True
@@ -935,7 +1061,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.name),
         )
 
-    url_idx = random.choice(models[form_data.name]["urls"])
+    url_idx = select_url_idx(request, models[form_data.name]["urls"], form_data.name)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1009,7 +1135,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, models[model]["urls"], model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1096,7 +1222,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, models[model]["urls"], model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1189,7 +1315,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, models[model]["urls"], model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1202,6 +1328,10 @@ async def generate_completion(
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
     )
 
+    model = form_data.model
+    if ":" not in model:
+        model = f"{model}:latest"
+
     prefix_id = api_config.get("prefix_id", None)
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
@@ -1211,6 +1341,8 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        backend_url=url,
+        model=model,
     )
 
 
@@ -1256,7 +1388,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_url_idx(request, models[model].get("urls", []), model)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1326,7 +1458,8 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1343,6 +1476,8 @@ async def generate_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         content_type="application/x-ndjson",
         user=user,
+        backend_url=url,
+        model=model,
     )
 
 
@@ -1429,7 +1564,8 @@ async def generate_openai_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1446,6 +1582,8 @@ async def generate_openai_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        backend_url=url,
+        model=model,
     )
 
 
@@ -1511,7 +1649,8 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1527,6 +1666,8 @@ async def generate_openai_chat_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        backend_url=url,
+        model=model,
     )
 
 
@@ -1672,6 +1813,7 @@ async def download_file_stream(
                             "name": file_name,
                         }
                         os.remove(file_path)
+                        invalidate_models()
 
                         yield f"data: {json.dumps(res)}\n\n"
                     else:
@@ -1790,6 +1932,7 @@ async def upload_model(
 
                 if create_resp.ok:
                     log.info(f"API SUCCESS!")  # DEBUG
+                    invalidate_models()
                     done_msg = {
                         "done": True,
                         "blob": f"sha256:{file_hash}",
@@ -2,6 +2,7 @@ import asyncio
 import hashlib
 import json
 import logging
+import time
 from pathlib import Path
 from typing import Literal, Optional, overload
 
@@ -15,11 +16,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 from open_webui.models.models import Models
-from open_webui.config import (
-    CACHE_DIR,
-)
 from open_webui.env import (
     AIOHTTP_CLIENT_SESSION_SSL,
     AIOHTTP_CLIENT_TIMEOUT,
@@ -42,7 +41,14 @@ from open_webui.utils.misc import (
 )
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.speech_cache import get_speech_cache
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_registry import invalidate_models
+from open_webui.utils.load_balancer import (
+    OPENAI_LOAD_BALANCER,
+    Lease,
+    is_failure_status,
+)
 
 
 log = logging.getLogger(__name__)
@@ -87,7 +93,11 @@ async def send_get_request(url, key=None, user: UserModel = None):
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
     session: Optional[aiohttp.ClientSession],
+    lease: Optional[Lease] = None,
 ):
+    # Releases the backend even if the response body was never streamed
+    if lease:
+        lease.release()
     if response:
         response.close()
     if session:
@@ -177,6 +187,8 @@ async def update_config(
         if key in keys
     }
 
+    invalidate_models()
+
     return {
         "ENABLE_OPENAI_API": request.app.state.config.ENABLE_OPENAI_API,
         "OPENAI_API_BASE_URLS": request.app.state.config.OPENAI_API_BASE_URLS,
@@ -185,6 +197,15 @@ async def update_config(
     }
 
 
+@router.get("/backends")
+async def get_backends(user=Depends(get_admin_user)):
+    """
+    Load balancer state of every OpenAI connection: requests in flight, total
+    requests and failures, latency and health.
+    """
+    return OPENAI_LOAD_BALANCER.get_stats()
+
+
 @router.post("/audio/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     idx = None
@@ -196,13 +217,11 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         body = await request.body()
         name = hashlib.sha256(body).hexdigest()
 
-        SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
-        SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-        file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
+        speech_cache = get_speech_cache()
 
         # Check if the file already exists in the cache
-        if file_path.is_file():
+        file_path = await run_in_threadpool(speech_cache.get, name)
+        if file_path is not None:
             return FileResponse(file_path)
 
         url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
@@ -239,13 +258,13 @@ async def speech(request: Request, user=Depends(get_verified_user)):
 
             r.raise_for_status()
 
-            # Save the streaming content to a file
-            with open(file_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            with open(file_body_path, "w") as f:
-                json.dump(json.loads(body.decode("utf-8")), f)
+            file_path = await run_in_threadpool(
+                speech_cache.set,
+                name,
+                r.content,
+                engine="openai",
+                voice=json.loads(body.decode("utf-8")).get("voice"),
+            )
 
             # Return the saved file
             return FileResponse(file_path)
@@ -444,7 +463,15 @@ async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
     models = {"data": merge_models_lists(map(extract_data, responses))}
     log.debug(f"models: {models}")
 
-    request.app.state.OPENAI_MODELS = {model["id"]: model for model in models["data"]}
+    # Connections serving the same model id are balanced between
+    url_idxs = {}
+    for model in models["data"]:
+        url_idxs.setdefault(model["id"], []).append(model["urlIdx"])
+
+    request.app.state.OPENAI_MODELS = {
+        model["id"]: {**model, "urlIdxs": url_idxs[model["id"]]}
+        for model in models["data"]
+    }
     return models
 
 
@@ -744,7 +771,12 @@ async def generate_chat_completion(
     await get_all_models(request, user=user)
     model = request.app.state.OPENAI_MODELS.get(model_id)
     if model:
-        idx = model["urlIdx"]
+        url_idxs = model.get("urlIdxs", [model["urlIdx"]])
+        idx = url_idxs[
+            OPENAI_LOAD_BALANCER.select(
+                [request.app.state.config.OPENAI_API_BASE_URLS[i] for i in url_idxs]
+            )
+        ]
     else:
         raise HTTPException(
             status_code=404,
@@ -833,6 +865,9 @@ async def generate_chat_completion(
     streaming = False
     response = None
 
+    lease = OPENAI_LOAD_BALANCER.acquire(url)
+    start = time.time()
+
     try:
         session = aiohttp.ClientSession(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
@@ -846,15 +881,20 @@ async def generate_chat_completion(
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
         )
 
+        if is_failure_status(r.status):
+            OPENAI_LOAD_BALANCER.record_failure(url)
+        else:
+            OPENAI_LOAD_BALANCER.record_success(url, latency=time.time() - start)
+
         # Check if response is SSE
         if "text/event-stream" in r.headers.get("Content-Type", ""):
             streaming = True
             return StreamingResponse(
-                r.content,
+                OPENAI_LOAD_BALANCER.stream(lease, r.content),
                 status_code=r.status,
                 headers=dict(r.headers),
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, session=session, lease=lease
                 ),
             )
         else:
@@ -868,6 +908,8 @@ async def generate_chat_completion(
             return response
     except Exception as e:
         log.exception(e)
+        if r is None:
+            OPENAI_LOAD_BALANCER.record_failure(url)
 
         detail = None
         if isinstance(response, dict):
@@ -881,10 +923,12 @@ async def generate_chat_completion(
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not streaming and session:
-            if r:
-                r.close()
-            await session.close()
+        if not streaming:
+            lease.release()
+            if session:
+                if r:
+                    r.close()
+                await session.close()
 
 
 async def embeddings(request: Request, form_data: dict, user):
@@ -26,6 +26,7 @@ from open_webui.constants import ERROR_MESSAGES
 from open_webui.routers.openai import get_all_models_responses
 
 from open_webui.utils.auth import get_admin_user
+from open_webui.utils.model_registry import invalidate_models
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -238,6 +239,8 @@ async def upload_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # The pipeline is listed as a model of its connection
+        invalidate_models()
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -289,6 +292,8 @@ async def add_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # The pipeline is listed as a model of its connection
+        invalidate_models()
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -334,6 +339,8 @@ async def delete_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # The pipeline is listed as a model of its connection
+        invalidate_models()
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -33,18 +33,25 @@ from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, Files
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.bm25 import BM25Index
 from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 
 # Document loaders
+from open_webui.retrieval.ingestion import (
+    FileStatus,
+    set_file_failed,
+    set_file_status,
+)
 from open_webui.retrieval.loaders.main import Loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
 from open_webui.retrieval.web.main import SearchResult
 from open_webui.retrieval.web.utils import get_web_loader
+from open_webui.retrieval.web.cache import get_search_cache_key, get_web_cache
 from open_webui.retrieval.web.brave import search_brave
 from open_webui.retrieval.web.kagi import search_kagi
 from open_webui.retrieval.web.mojeek import search_mojeek
@@ -74,6 +81,7 @@ from open_webui.retrieval.utils import (
     query_collection_with_hybrid_search,
     query_doc,
     query_doc_with_hybrid_search,
+    ensure_bm25_index,
 )
 from open_webui.utils.misc import (
     calculate_sha256_string,
@@ -1198,12 +1206,16 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25Index.delete_collection(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
                     f"collection {collection_name} already exists, overwrite is False and add is False"
                 )
                 return True
+            else:
+                # Index the existing documents before adding to the collection
+                ensure_bm25_index(collection_name)
 
         log.info(f"adding to collection {collection_name}")
         embedding_function = get_embedding_function(
@@ -1256,6 +1268,12 @@ def save_docs_to_vector_db(
             collection_name=collection_name,
             items=items,
         )
+        BM25Index.add_documents(
+            collection_name,
+            ids=[item["id"] for item in items],
+            texts=texts,
+            metadatas=metadatas,
+        )
 
         return True
     except Exception as e:
@@ -1290,6 +1308,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                BM25Index.delete_collection(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1308,9 +1327,13 @@ def process_file(
             ]
 
             text_content = form_data.content
-        elif form_data.collection_name:
+        elif (
+            form_data.collection_name
+            and (file.data or {}).get("status") not in FileStatus.PENDING
+        ):
             # Check if the file has already been processed and save the content
             # Usage: /knowledge/{id}/file/add, /knowledge/{id}/file/update
+            # Files still waiting in the ingestion queue are extracted below
 
             result = VECTOR_DB_CLIENT.query(
                 collection_name=f"file-{file.id}", filter={"file_id": file.id}
@@ -1342,6 +1365,8 @@ def process_file(
         else:
             # Process the file and save the content
             # Usage: /files/
+            set_file_status(file.id, FileStatus.EXTRACTING)
+
             file_path = file.path
             if file_path:
                 file_path = Storage.get_file(file_path)
@@ -1415,6 +1440,7 @@ def process_file(
         Files.update_file_hash_by_id(file.id, hash)
 
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+            set_file_status(file.id, FileStatus.EMBEDDING)
             try:
                 result = save_docs_to_vector_db(
                     request,
@@ -1436,6 +1462,7 @@ def process_file(
                             "collection_name": collection_name,
                         },
                     )
+                    set_file_status(file.id, FileStatus.DONE)
 
                     return {
                         "status": True,
@@ -1446,6 +1473,7 @@ def process_file(
             except Exception as e:
                 raise e
         else:
+            set_file_status(file.id, FileStatus.DONE)
             return {
                 "status": True,
                 "collection_name": None,
@@ -1455,6 +1483,7 @@ def process_file(
 
     except Exception as e:
         log.exception(e)
+        set_file_failed(form_data.file_id, str(e))
         if "No pandoc was found" in str(e):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1829,6 +1858,52 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         raise Exception("No search engine API key found in environment variables")
 
 
+def search_web_cached(request: Request, engine: str, query: str) -> list[SearchResult]:
+    """`search_web`, answered from the web cache when the query ran recently."""
+    cache = get_web_cache()
+    if cache is None:
+        return search_web(request, engine, query)
+
+    key = get_search_cache_key(
+        engine,
+        query,
+        request.app.state.config.WEB_SEARCH_RESULT_COUNT,
+        request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
+    )
+    results = cache.get_search(key)
+    if results is not None:
+        log.debug(f"web search cache hit for {engine}: {query}")
+        return [SearchResult(**result) for result in results]
+
+    results = search_web(request, engine, query)
+    if results:
+        cache.set_search(
+            key, engine, query, [result.model_dump() for result in results]
+        )
+    return results
+
+
+def get_web_search_collection_name(request: Request, docs: list[Document]) -> str:
+    """
+    Names the collection of a web search after the content it indexes and the
+    settings it is indexed with, so searches that load the same pages share
+    a collection instead of embedding them again.
+    """
+    fingerprint = json.dumps(
+        [
+            request.app.state.config.RAG_EMBEDDING_ENGINE,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+            request.app.state.config.TEXT_SPLITTER,
+            request.app.state.config.CHUNK_SIZE,
+            request.app.state.config.CHUNK_OVERLAP,
+            [[doc.metadata, doc.page_content] for doc in docs],
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return f"web-search-{calculate_sha256_string(fingerprint)}"[:63]
+
+
 @router.post("/process/web/search")
 async def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
@@ -1842,7 +1917,7 @@ async def process_web_search(
 
         search_tasks = [
             run_in_threadpool(
-                search_web,
+                search_web_cached,
                 request,
                 request.app.state.config.WEB_SEARCH_ENGINE,
                 query,
@@ -1917,23 +1992,38 @@ async def process_web_search(
             }
         else:
             # Create a single collection for all documents
-            collection_name = (
-                f"web-search-{calculate_sha256_string('-'.join(form_data.queries))}"[
-                    :63
-                ]
-            )
+            collection_name = get_web_search_collection_name(request, docs)
 
             try:
-                await run_in_threadpool(
-                    save_docs_to_vector_db,
-                    request,
-                    docs,
-                    collection_name,
-                    overwrite=True,
-                    user=user,
-                )
+                # Only collections recorded as complete are reused, a write
+                # that failed halfway is done again
+                cache = get_web_cache()
+                if (
+                    cache is not None
+                    and await run_in_threadpool(cache.has_collection, collection_name)
+                    and await run_in_threadpool(
+                        VECTOR_DB_CLIENT.has_collection,
+                        collection_name=collection_name,
+                    )
+                ):
+                    log.debug(f"reusing web search collection {collection_name}")
+                else:
+                    if cache is not None:
+                        await run_in_threadpool(
+                            cache.delete_collection, collection_name
+                        )
+                    await run_in_threadpool(
+                        save_docs_to_vector_db,
+                        request,
+                        docs,
+                        collection_name,
+                        overwrite=True,
+                        user=user,
+                    )
+                    if cache is not None:
+                        await run_in_threadpool(cache.set_collection, collection_name)
             except Exception as e:
-                log.debug(f"error saving docs: {e}")
+                log.warning(f"error saving docs: {e}")
 
             return {
                 "status": True,
@@ -1966,13 +2056,9 @@ def query_doc_handler(
 ):
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
+            ensure_bm25_index(form_data.collection_name)
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -2090,6 +2176,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            BM25Index.delete_documents(form_data.collection_name, filter={"hash": hash})
             return {"status": True}
         else:
             return {"status": False}
@@ -2101,6 +2188,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25Index.reset()
     Knowledges.delete_all_knowledge()
 
 
@@ -2132,8 +2220,10 @@ if ENV == "dev":
     @router.get("/ef/{text}")
     async def get_embeddings(request: Request, text: Optional[str] = "Hello World!"):
         return {
-            "result": request.app.state.EMBEDDING_FUNCTION(
-                text, prefix=RAG_EMBEDDING_QUERY_PREFIX
+            "result": await run_in_threadpool(
+                request.app.state.EMBEDDING_FUNCTION,
+                text,
+                prefix=RAG_EMBEDDING_QUERY_PREFIX,
             )
         }
 
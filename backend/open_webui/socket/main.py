@@ -3,11 +3,13 @@ import socketio
 import logging
 import sys
 import time
+from typing import Optional
 from redis import asyncio as aioredis
 
 from open_webui.models.users import Users, UserNameResponse
 from open_webui.models.channels import Channels
 from open_webui.models.chats import Chats
+from open_webui.models.chat_messages import ChatMessages
 from open_webui.utils.redis import (
     get_sentinels_from_env,
     get_sentinel_url_from_env,
@@ -17,12 +19,14 @@ from open_webui.env import (
     ENABLE_WEBSOCKET_SUPPORT,
     WEBSOCKET_MANAGER,
     WEBSOCKET_REDIS_URL,
-    WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_EVENT_COALESCE_INTERVAL_MS,
+    WEBSOCKET_PRESENCE_TTL,
+    WEBSOCKET_PRESENCE_CACHE_TTL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import LocalPresence, RedisPresence
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -65,79 +69,33 @@ else:
 # Timeout duration in seconds
 TIMEOUT_DURATION = 3
 
-# Dictionary to maintain the user pool
-
+# Sessions, users and models in use, shared by all workers in Redis mode
 if WEBSOCKET_MANAGER == "redis":
     log.debug("Using Redis to manage websockets.")
-    redis_sentinels = get_sentinels_from_env(
-        WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
-    )
-    SESSION_POOL = RedisDict(
-        "open-webui:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
+    PRESENCE = RedisPresence(
+        WEBSOCKET_REDIS_URL,
+        get_sentinels_from_env(WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT),
+        ttl=WEBSOCKET_PRESENCE_TTL,
+        cache_ttl=WEBSOCKET_PRESENCE_CACHE_TTL,
     )
-
-    clean_up_lock = RedisLock(
-        redis_url=WEBSOCKET_REDIS_URL,
-        lock_name="usage_cleanup_lock",
-        timeout_secs=WEBSOCKET_REDIS_LOCK_TIMEOUT,
-        redis_sentinels=redis_sentinels,
-    )
-    aquire_func = clean_up_lock.aquire_lock
-    renew_func = clean_up_lock.renew_lock
-    release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
-    aquire_func = release_func = renew_func = lambda: True
+    PRESENCE = LocalPresence()
 
 
 async def periodic_usage_pool_cleanup():
-    if not aquire_func():
-        log.debug("Usage pool cleanup lock already exists. Not running it.")
-        return
     log.debug("Running periodic_usage_pool_cleanup")
-    try:
-        while True:
-            if not renew_func():
-                log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
-                raise Exception("Unable to renew usage pool cleanup lock.")
-
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
-            await asyncio.sleep(TIMEOUT_DURATION)
-    finally:
-        release_func()
+    refreshed_at = time.monotonic()
+    while True:
+        try:
+            await PRESENCE.cleanup(TIMEOUT_DURATION)
+
+            # Keep the sessions of this worker from expiring
+            if time.monotonic() - refreshed_at >= WEBSOCKET_PRESENCE_TTL / 3:
+                await PRESENCE.refresh()
+                refreshed_at = time.monotonic()
+        except Exception as e:
+            log.warning(f"Error maintaining socket presence: {e}")
+        await asyncio.sleep(TIMEOUT_DURATION)
 
 
 app = socketio.ASGIApp(
@@ -146,61 +104,50 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await PRESENCE.get_models_in_use(TIMEOUT_DURATION)
 
 
-def get_active_user_ids():
+async def get_active_user_ids():
     """Get the list of active user IDs."""
-    return list(USER_POOL.keys())
+    return await PRESENCE.get_active_user_ids()
 
 
-def get_user_active_status(user_id):
+async def get_user_active_status(user_id):
     """Check if a user is currently active."""
-    return user_id in USER_POOL
+    return await PRESENCE.is_user_active(user_id)
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await PRESENCE.get_session(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    sessions = await PRESENCE.get_sessions(
+        [session_id[0] for session_id in active_session_ids]
     )
+    active_user_ids = list(set([session["id"] for session in sessions if session]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def get_active_status_by_user_id(user_id):
+    return await PRESENCE.is_user_active(user_id)
 
 
 @sio.on("usage")
 async def usage(sid, data):
-    if sid in SESSION_POOL:
-        model_id = data["model"]
+    if sid in PRESENCE.sessions:
         # Record the timestamp for the last update
-        current_time = int(time.time())
-
-        # Store the new usage data and task
-        USAGE_POOL[model_id] = {
-            **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-            sid: {"updated_at": current_time},
-        }
+        await PRESENCE.set_model_usage(data["model"])
 
 
 @sio.event
@@ -213,11 +160,7 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await PRESENCE.add_session(sid, user.model_dump())
 
 
 @sio.on("user-join")
@@ -235,17 +178,13 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await PRESENCE.add_session(sid, user.model_dump())
 
     # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
-    log.debug(f"{channels=}")
-    for channel in channels:
-        await sio.enter_room(sid, f"channel:{channel.id}")
+    channel_ids = Channels.get_channel_ids_by_user_id(user.id)
+    log.debug(f"{channel_ids=}")
+    for channel_id in channel_ids:
+        await sio.enter_room(sid, f"channel:{channel_id}")
     return {"id": user.id, "name": user.name}
 
 
@@ -264,10 +203,10 @@ async def join_channel(sid, data):
         return
 
     # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
-    log.debug(f"{channels=}")
-    for channel in channels:
-        await sio.enter_room(sid, f"channel:{channel.id}")
+    channel_ids = Channels.get_channel_ids_by_user_id(user.id)
+    log.debug(f"{channel_ids=}")
+    for channel_id in channel_ids:
+        await sio.enter_room(sid, f"channel:{channel_id}")
 
 
 @sio.on("channel-events")
@@ -292,7 +231,9 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(
+                    **(await PRESENCE.get_session(sid))
+                ).model_dump(),
             },
             room=room,
         )
@@ -300,86 +241,221 @@ async def channel_events(sid, data):
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
+    await PRESENCE.remove_session(sid)
+
+
+# Counters of chat events passed to emitters and socket frames actually sent,
+# the difference is what coalescing saved
+EVENT_EMITTER_STATS = {"events": 0, "frames": 0}
+
+# Events that replace the content of the message
+CONTENT_REPLACE_EVENT_TYPES = {"replace", "chat:message"}
+# Events that append to the content of the message
+CONTENT_DELTA_EVENT_TYPES = {"message", "chat:message:delta"}
+# Content events written to the database by `send_chat_event`
+PERSISTED_EVENT_TYPES = {"replace", "message"}
+
+
+def merge_chat_events(pending: dict, event_data: dict) -> Optional[dict]:
+    """
+    Returns a single event equivalent to sending `pending` followed by
+    `event_data`, or None if the two can't be merged.
+    """
+    pending_type = pending.get("type")
+    event_type = event_data.get("type")
+
+    if event_type == "chat:completion":
+        # Completion updates carrying only the serialized content are snapshots,
+        # so the latest one wins
+        if pending_type == "chat:completion" and is_content_snapshot(event_data):
+            return event_data
+        return None
+
+    # The merged event is written to the database like `pending` or
+    # `event_data`, so both have to be written the same way
+    if (pending_type in PERSISTED_EVENT_TYPES) != (event_type in PERSISTED_EVENT_TYPES):
+        return None
+
+    if event_type in CONTENT_REPLACE_EVENT_TYPES:
+        if pending_type in CONTENT_REPLACE_EVENT_TYPES | CONTENT_DELTA_EVENT_TYPES:
+            return event_data
+        return None
+
+    if event_type in CONTENT_DELTA_EVENT_TYPES:
+        if pending_type != event_type:
+            return None
+
+        content = pending.get("data", {}).get("content", "") + event_data.get(
+            "data", {}
+        ).get("content", "")
+        return {
+            **pending,
+            "data": {**pending.get("data", {}), "content": content},
+        }
 
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
+    return None
 
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-    else:
-        pass
-        # print(f"Unknown session ID {sid} disconnected")
 
+def is_content_snapshot(event_data: dict) -> bool:
+    data = event_data.get("data")
+    return isinstance(data, dict) and set(data.keys()) == {"content"}
+
+
+def is_coalescable(event_data: dict) -> bool:
+    event_type = event_data.get("type")
+    if event_type == "chat:completion":
+        return is_content_snapshot(event_data)
+    return event_type in CONTENT_REPLACE_EVENT_TYPES | CONTENT_DELTA_EVENT_TYPES
+
+
+class ChatEventBuffer:
+    """
+    Holds the coalescable chat events of one message and sends them as a
+    single frame, with a single database write, per window.
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.pending: Optional[dict] = None
+        self.pending_request_info: Optional[dict] = None
+        self.pending_update_db = False
+        self.flush_task: Optional[asyncio.Task] = None
+
+    async def emit(self, request_info: dict, event_data: dict, update_db: bool):
+        if self.pending is not None and self.pending_update_db == update_db:
+            merged = merge_chat_events(self.pending, event_data)
+            if merged is not None:
+                self.pending = merged
+                self.pending_request_info = request_info
+                return
+
+        # Keep the order of events, anything pending goes out first
+        await self.flush()
+
+        if WEBSOCKET_EVENT_COALESCE_INTERVAL_MS > 0 and is_coalescable(event_data):
+            self.pending = event_data
+            self.pending_request_info = request_info
+            self.pending_update_db = update_db
+            CHAT_EVENT_BUFFERS[self.key] = self
+            self.flush_task = asyncio.create_task(self.delayed_flush())
+            CHAT_EVENT_FLUSH_TASKS.add(self.flush_task)
+            self.flush_task.add_done_callback(on_flush_task_done)
+        else:
+            await send_chat_event(request_info, event_data, update_db)
+
+    async def delayed_flush(self):
+        await asyncio.sleep(WEBSOCKET_EVENT_COALESCE_INTERVAL_MS / 1000)
+        self.flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+
+        if self.pending is None:
+            return
+
+        event_data, request_info, update_db = (
+            self.pending,
+            self.pending_request_info,
+            self.pending_update_db,
+        )
+        self.pending = None
+        self.pending_request_info = None
+        if CHAT_EVENT_BUFFERS.get(self.key) is self:
+            del CHAT_EVENT_BUFFERS[self.key]
 
-def get_event_emitter(request_info, update_db=True):
-    async def __event_emitter__(event_data):
-        user_id = request_info["user_id"]
-
-        session_ids = list(
-            set(
-                USER_POOL.get(user_id, [])
-                + (
-                    [request_info.get("session_id")]
-                    if request_info.get("session_id")
-                    else []
-                )
+        await send_chat_event(request_info, event_data, update_db)
+
+
+# Buffers of messages with events waiting to be sent, by user, session, chat
+# and message
+CHAT_EVENT_BUFFERS: dict[tuple, ChatEventBuffer] = {}
+
+# Delayed flushes in progress, referenced until they are done
+CHAT_EVENT_FLUSH_TASKS: set[asyncio.Task] = set()
+
+
+def on_flush_task_done(task: asyncio.Task):
+    CHAT_EVENT_FLUSH_TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log.error(
+            f"Error sending chat event: {task.exception()}",
+            exc_info=task.exception(),
+        )
+
+
+async def send_chat_event(request_info: dict, event_data: dict, update_db: bool):
+    user_id = request_info["user_id"]
+
+    session_ids = list(
+        set(
+            await PRESENCE.get_user_session_ids(user_id)
+            + (
+                [request_info.get("session_id")]
+                if request_info.get("session_id")
+                else []
             )
         )
+    )
+
+    if session_ids:
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": request_info.get("chat_id", None),
+                "message_id": request_info.get("message_id", None),
+                "data": event_data,
+            },
+            to=session_ids,
+        )
+        EVENT_EMITTER_STATS["frames"] += 1
+
+    if update_db:
+        if "type" in event_data and event_data["type"] == "status":
+            Chats.add_message_status_to_chat_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
+                event_data.get("data", {}),
+            )
+
+        if "type" in event_data and event_data["type"] == "message":
+            ChatMessages.append_message_content(
+                request_info["chat_id"],
+                request_info["message_id"],
+                event_data.get("data", {}).get("content", ""),
+            )
+
+        if "type" in event_data and event_data["type"] == "replace":
+            content = event_data.get("data", {}).get("content", "")
 
-        emit_tasks = [
-            sio.emit(
-                "chat-events",
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
                 {
-                    "chat_id": request_info.get("chat_id", None),
-                    "message_id": request_info.get("message_id", None),
-                    "data": event_data,
+                    "content": content,
                 },
-                to=session_id,
             )
-            for session_id in session_ids
-        ]
-
-        await asyncio.gather(*emit_tasks)
-
-        if update_db:
-            if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
-
-            if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
-
-            if "type" in event_data and event_data["type"] == "replace":
-                content = event_data.get("data", {}).get("content", "")
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "content": content,
-                    },
-                )
+
+
+def get_event_emitter(request_info, update_db=True):
+    async def __event_emitter__(event_data):
+        EVENT_EMITTER_STATS["events"] += 1
+
+        # Events without a chat message (e.g. API clients) are not coalesced
+        if not request_info.get("chat_id") or not request_info.get("message_id"):
+            await send_chat_event(request_info, event_data, update_db)
+            return
+
+        key = (
+            request_info.get("user_id"),
+            request_info.get("session_id"),
+            request_info.get("chat_id"),
+            request_info.get("message_id"),
+        )
+        buffer = CHAT_EVENT_BUFFERS.get(key) or ChatEventBuffer(key)
+        await buffer.emit(request_info, event_data, update_db)
 
     return __event_emitter__
 
@@ -401,3 +477,15 @@ def get_event_call(request_info):
 
 
 get_event_caller = get_event_call
+
+
+async def send_file_event(user_id: str, event_data: dict):
+    session_ids = await PRESENCE.get_user_session_ids(user_id)
+    if session_ids:
+        await sio.emit("file-events", event_data, to=session_ids)
+
+
+async def send_transcription_event(user_id: str, event_data: dict):
+    session_ids = await PRESENCE.get_user_session_ids(user_id)
+    if session_ids:
+        await sio.emit("transcription-events", event_data, to=session_ids)
@@ -1,5 +1,8 @@
 import json
+import time
 import uuid
+from typing import Optional
+
 from open_webui.utils.redis import get_redis_connection
 
 
@@ -32,60 +35,226 @@ class RedisLock:
             self.redis.delete(self.lock_name)
 
 
-class RedisDict:
-    def __init__(self, name, redis_url, redis_sentinels=[]):
-        self.name = name
+class LocalPresence:
+    """
+    Socket sessions connected to this process, the users they belong to and
+    the models they are using.
+    """
+
+    def __init__(self):
+        self.sessions: dict[str, dict] = {}
+        self.user_sessions: dict[str, set[str]] = {}
+        # Last time each model was reported in use
+        self.usage: dict[str, float] = {}
+
+    async def add_session(self, sid: str, user: dict):
+        self.sessions[sid] = user
+        self.user_sessions.setdefault(user["id"], set()).add(sid)
+
+    async def remove_session(self, sid: str) -> Optional[dict]:
+        user = self.sessions.pop(sid, None)
+        if user is not None:
+            session_ids = self.user_sessions.get(user["id"], set())
+            session_ids.discard(sid)
+            if not session_ids:
+                self.user_sessions.pop(user["id"], None)
+        return user
+
+    async def get_session(self, sid: str) -> Optional[dict]:
+        return self.sessions.get(sid)
+
+    async def get_sessions(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self.sessions.get(sid) for sid in sids]
+
+    async def get_user_session_ids(self, user_id: str) -> list[str]:
+        return list(self.user_sessions.get(user_id, []))
+
+    async def is_user_active(self, user_id: str) -> bool:
+        return len(await self.get_user_session_ids(user_id)) > 0
+
+    async def get_active_user_ids(self) -> list[str]:
+        return list(self.user_sessions.keys())
+
+    async def set_model_usage(self, model_id: str):
+        self.usage[model_id] = time.time()
+
+    async def get_models_in_use(self, timeout: float) -> list[str]:
+        now = time.time()
+        return [
+            model_id
+            for model_id, updated_at in self.usage.items()
+            if now - updated_at <= timeout
+        ]
+
+    async def cleanup(self, timeout: float):
+        """Forgets the models nobody reported in use in the last `timeout` seconds."""
+        now = time.time()
+        for model_id, updated_at in list(self.usage.items()):
+            if now - updated_at > timeout:
+                del self.usage[model_id]
+
+    async def refresh(self):
+        pass
+
+
+# Removes a session of a user, and the user from the active users once none of
+# their sessions is left
+REDIS_REMOVE_SESSION_SCRIPT = """
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+if redis.call('ZCARD', KEYS[2]) == 0 then
+    redis.call('ZREM', KEYS[3], ARGV[2])
+end
+"""
+
+
+class RedisPresence(LocalPresence):
+    """
+    Presence shared by all workers through redis.asyncio.
+
+    Sessions are stored one key per session, and the sessions of a user and
+    the active users in sorted sets scored by expiry time, which gives every
+    member its own TTL. Each worker extends the TTL of its own sessions with
+    `refresh`, so the sessions of a worker that died expire on their own.
+    Session ids of a user read from Redis are reused for `cache_ttl` seconds,
+    so emitting to a user does not cost a round trip per event.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        redis_sentinels: Optional[list] = None,
+        ttl: int = 60,
+        cache_ttl: float = 1,
+        prefix: str = "open-webui:presence",
+    ):
+        super().__init__()
         self.redis = get_redis_connection(
-            redis_url, redis_sentinels, decode_responses=True
+            redis_url, redis_sentinels, async_mode=True, decode_responses=True
         )
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.prefix = prefix
 
-    def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+        self.users_key = f"{prefix}:users"
+        self.models_key = f"{prefix}:models"
 
-    def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
-            raise KeyError(key)
-        return json.loads(value)
+        # user_id -> (expires_at, session ids)
+        self.session_ids_cache: dict[str, tuple[float, list[str]]] = {}
+
+        self.remove_session_script = self.redis.register_script(
+            REDIS_REMOVE_SESSION_SCRIPT
+        )
 
-    def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
-        if result == 0:
-            raise KeyError(key)
+    def get_session_key(self, sid: str) -> str:
+        return f"{self.prefix}:session:{sid}"
 
-    def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+    def get_user_key(self, user_id: str) -> str:
+        return f"{self.prefix}:user:{user_id}"
 
-    def __len__(self):
-        return self.redis.hlen(self.name)
+    async def add_session(self, sid: str, user: dict):
+        await super().add_session(sid, user)
+        self.session_ids_cache.pop(user["id"], None)
+
+        expires_at = time.time() + self.ttl
+        pipe = self.redis.pipeline()
+        pipe.set(self.get_session_key(sid), json.dumps(user), ex=self.ttl)
+        pipe.zadd(self.get_user_key(user["id"]), {sid: expires_at})
+        pipe.expire(self.get_user_key(user["id"]), self.ttl)
+        pipe.zadd(self.users_key, {user["id"]: expires_at})
+        await pipe.execute()
+
+    async def remove_session(self, sid: str) -> Optional[dict]:
+        user = await super().remove_session(sid)
+        if user is None:
+            user = await self.get_session(sid)
+        if user is None:
+            return None
+
+        self.session_ids_cache.pop(user["id"], None)
+        await self.remove_session_script(
+            keys=[
+                self.get_session_key(sid),
+                self.get_user_key(user["id"]),
+                self.users_key,
+            ],
+            args=[sid, user["id"], time.time()],
+        )
+        return user
 
-    def keys(self):
-        return self.redis.hkeys(self.name)
+    async def get_session(self, sid: str) -> Optional[dict]:
+        if sid in self.sessions:
+            return self.sessions[sid]
 
-    def values(self):
-        return [json.loads(v) for v in self.redis.hvals(self.name)]
+        value = await self.redis.get(self.get_session_key(sid))
+        return json.loads(value) if value is not None else None
 
-    def items(self):
-        return [(k, json.loads(v)) for k, v in self.redis.hgetall(self.name).items()]
+    async def get_sessions(self, sids: list[str]) -> list[Optional[dict]]:
+        remote_sids = [sid for sid in sids if sid not in self.sessions]
 
-    def get(self, key, default=None):
-        try:
-            return self[key]
-        except KeyError:
-            return default
+        remote_sessions = {}
+        if remote_sids:
+            values = await self.redis.mget(
+                [self.get_session_key(sid) for sid in remote_sids]
+            )
+            remote_sessions = {
+                sid: json.loads(value)
+                for sid, value in zip(remote_sids, values)
+                if value is not None
+            }
+
+        return [self.sessions.get(sid) or remote_sessions.get(sid) for sid in sids]
+
+    async def get_user_session_ids(self, user_id: str) -> list[str]:
+        now = time.monotonic()
+        cached = self.session_ids_cache.get(user_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        session_ids = await self.redis.zrangebyscore(
+            self.get_user_key(user_id), time.time(), "+inf"
+        )
+        if self.cache_ttl > 0:
+            if len(self.session_ids_cache) > 10000:
+                self.session_ids_cache = {
+                    k: v for k, v in self.session_ids_cache.items() if v[0] > now
+                }
+            self.session_ids_cache[user_id] = (now + self.cache_ttl, session_ids)
+        return session_ids
+
+    async def get_active_user_ids(self) -> list[str]:
+        return await self.redis.zrangebyscore(self.users_key, time.time(), "+inf")
+
+    async def set_model_usage(self, model_id: str):
+        await self.redis.zadd(self.models_key, {model_id: time.time()})
+
+    async def get_models_in_use(self, timeout: float) -> list[str]:
+        return await self.redis.zrangebyscore(
+            self.models_key, time.time() - timeout, "+inf"
+        )
 
-    def clear(self):
-        self.redis.delete(self.name)
+    async def cleanup(self, timeout: float):
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(self.models_key, "-inf", now - timeout)
+        pipe.zremrangebyscore(self.users_key, "-inf", now)
+        await pipe.execute()
 
-    def update(self, other=None, **kwargs):
-        if other is not None:
-            for k, v in other.items() if hasattr(other, "items") else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
+    async def refresh(self):
+        """Extends the TTL of the sessions connected to this worker."""
+        if not self.sessions:
+            return
 
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self[key] = default
-        return self[key]
+        expires_at = time.time() + self.ttl
+        pipe = self.redis.pipeline()
+        for sid, user in self.sessions.items():
+            pipe.set(self.get_session_key(sid), json.dumps(user), ex=self.ttl)
+        for user_id, session_ids in self.user_sessions.items():
+            pipe.zadd(
+                self.get_user_key(user_id),
+                {sid: expires_at for sid in session_ids},
+            )
+            pipe.expire(self.get_user_key(user_id), self.ttl)
+            pipe.zadd(self.users_key, {user_id: expires_at})
+        await pipe.execute()
@@ -0,0 +1,186 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    STORAGE_CACHE_MAX_SIZE_MB,
+    STORAGE_CACHE_VALIDATE_INTERVAL,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.cache_index import CacheIndex
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Seconds after its last access during which a file is never evicted, so a
+# file is not removed while the response that returned it is still sending it
+EVICTION_GRACE_PERIOD = 300
+
+
+class StorageCache:
+    """
+    Read-through cache of the local copies that cloud storage providers keep of
+    their objects.
+
+    A local copy is served as is for `validate_interval` seconds after it was
+    last checked, afterwards its ETag (or generation) is compared with the one
+    in the bucket and the object is only downloaded again if it changed.
+    Copies are evicted least recently used first once they take more than
+    `max_size` bytes, except those accessed in the last `grace_period`
+    seconds, and concurrent requests for the same file in a process share a
+    single download.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int,
+        validate_interval: int,
+        grace_period: float = EVICTION_GRACE_PERIOD,
+    ):
+        self.validate_interval = validate_interval
+
+        # Per file locks, so a file is downloaded once however many requests
+        # are waiting for it
+        self.file_locks: dict[str, list] = {}
+
+        self.stats = {"hits": 0, "misses": 0, "validations": 0}
+
+        self.index = CacheIndex(
+            path,
+            max_size,
+            {"file": ["etag TEXT", "validated_at REAL NOT NULL"]},
+            grace_period=grace_period,
+            on_evict=self._remove_file,
+        )
+        self.lock = self.index.lock
+
+    def get_file(
+        self,
+        local_path: str,
+        stat: Callable[[], tuple[Optional[str], int]],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Returns `local_path` once it holds the current version of the object.
+
+        `stat` returns the ETag and size of the object in the bucket, and
+        `download` writes the object to the path it is given.
+        """
+        with self._file_lock(local_path):
+            now = time.time()
+            entry = self.index.get("file", local_path, ["etag", "size", "validated_at"])
+
+            if os.path.isfile(local_path):
+                if entry is None:
+                    # Copy left by an upload or a previous version, adopted below
+                    # if the object in the bucket has the same size
+                    entry = (None, os.path.getsize(local_path), 0.0)
+
+                etag, size, validated_at = entry
+                if now - validated_at < self.validate_interval:
+                    self._hit()
+                    return local_path
+
+                remote_etag, remote_size = stat()
+                with self.lock:
+                    self.stats["validations"] += 1
+
+                if (etag is not None and etag == remote_etag) or (
+                    etag is None and size == remote_size
+                ):
+                    self.set(local_path, remote_etag)
+                    self._hit()
+                    return local_path
+            else:
+                remote_etag, _ = stat()
+
+            with self.lock:
+                self.stats["misses"] += 1
+
+            tmp_path = f"{local_path}.{uuid.uuid4().hex}.part"
+            try:
+                download(tmp_path)
+                os.replace(tmp_path, local_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            self.set(local_path, remote_etag)
+            return local_path
+
+    def set(self, local_path: str, etag: Optional[str] = None):
+        """Registers the local copy at `local_path`, e.g. right after an upload."""
+        self.index.set(
+            "file",
+            local_path,
+            os.path.getsize(local_path),
+            etag=etag,
+            validated_at=time.time(),
+        )
+
+    def delete(self, local_path: str):
+        self.index.delete("file", local_path)
+
+    def clear(self):
+        self.index.clear()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.stats,
+                "evictions": self.index.evictions,
+                "files": self.index.count("file"),
+                "size": self.index.size,
+            }
+
+    @contextmanager
+    def _file_lock(self, local_path: str):
+        with self.lock:
+            entry = self.file_locks.setdefault(local_path, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.file_locks[local_path]
+
+    def _hit(self):
+        with self.lock:
+            self.stats["hits"] += 1
+
+    def _remove_file(self, table: str, local_path: str) -> bool:
+        # Files being downloaded right now are left alone, files being served
+        # are kept by the grace period
+        if local_path in self.file_locks:
+            return False
+
+        try:
+            if os.path.isfile(local_path):
+                os.remove(local_path)
+            return True
+        except Exception as e:
+            log.warning(f"Error evicting {local_path} from the storage cache: {e}")
+            return False
+
+
+STORAGE_CACHE: Optional[StorageCache] = None
+
+
+def get_storage_cache() -> StorageCache:
+    global STORAGE_CACHE
+    if STORAGE_CACHE is None:
+        STORAGE_CACHE = StorageCache(
+            str(CACHE_DIR / "storage" / "index.db"),
+            max_size=STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024,
+            validate_interval=STORAGE_CACHE_VALIDATE_INTERVAL,
+        )
+    return STORAGE_CACHE
@@ -1,5 +1,6 @@
 import os
 import shutil
+import hashlib
 import json
 import logging
 import re
@@ -34,11 +35,16 @@ from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import ResourceNotFoundError
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.storage.cache import get_storage_cache
 
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Uploads are copied in chunks of this size, so memory use does not depend on
+# the size of the file
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -48,7 +54,11 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[dict, str]:
+        """
+        Stores `file` and returns its size and sha256, computed while copying,
+        with the path it was stored at.
+        """
         pass
 
     @abstractmethod
@@ -64,14 +74,20 @@ class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[dict, str]:
         file_path = f"{UPLOAD_DIR}/{filename}"
+        sha256 = hashlib.sha256()
+        size = 0
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                sha256.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+        if size == 0:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return {"size": size, "sha256": sha256.hexdigest()}, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -144,12 +160,14 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[dict, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        file_info, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
+            # Large files are sent from disk as a multipart upload
             self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            get_storage_cache().set(file_path)
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -165,10 +183,7 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            return file_info, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -176,9 +191,13 @@ class S3StorageProvider(StorageProvider):
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            return get_storage_cache().get_file(
+                self._get_local_file_path(s3_key),
+                stat=lambda: self._stat(s3_key),
+                download=lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -192,6 +211,7 @@ class S3StorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
+        get_storage_cache().delete(self._get_local_file_path(s3_key))
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from S3 storage."""
@@ -211,6 +231,7 @@ class S3StorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
+        get_storage_cache().clear()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
     def _extract_s3_key(self, full_file_path: str) -> str:
@@ -219,6 +240,10 @@ class S3StorageProvider(StorageProvider):
     def _get_local_file_path(self, s3_key: str) -> str:
         return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
 
+    def _stat(self, s3_key: str) -> Tuple[str, int]:
+        response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        return response["ETag"], response["ContentLength"]
+
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -237,13 +262,15 @@ class GCSStorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[dict, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        file_info, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob = self.bucket.blob(filename)
+            # Large files are sent from disk as a resumable upload
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            get_storage_cache().set(file_path)
+            return file_info, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -251,11 +278,21 @@ class GCSStorageProvider(StorageProvider):
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
-            blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
 
-            return local_file_path
+            def stat():
+                blob = self.bucket.get_blob(filename)
+                if blob is None:
+                    raise NotFound(f"{filename} not found in {self.bucket_name}")
+                # The generation changes whenever the object is overwritten
+                return str(blob.generation), blob.size
+
+            return get_storage_cache().get_file(
+                f"{UPLOAD_DIR}/{filename}",
+                stat=stat,
+                download=lambda path: self.bucket.blob(filename).download_to_filename(
+                    path
+                ),
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -270,6 +307,7 @@ class GCSStorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
+        get_storage_cache().delete(f"{UPLOAD_DIR}/{filename}")
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from GCS storage."""
@@ -284,6 +322,7 @@ class GCSStorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
+        get_storage_cache().clear()
 
 
 class AzureStorageProvider(StorageProvider):
@@ -309,13 +348,16 @@ class AzureStorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[dict, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        file_info, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Large files are streamed from disk as blocks
+            with open(file_path, "rb") as data:
+                blob_client.upload_blob(data, length=file_info["size"], overwrite=True)
+            get_storage_cache().set(file_path)
+            return file_info, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -323,11 +365,20 @@ class AzureStorageProvider(StorageProvider):
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def stat():
+                properties = blob_client.get_blob_properties()
+                return properties.etag, properties.size
+
+            def download(path: str):
+                # Written to disk chunk by chunk, not read into memory whole
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob().readinto(download_file)
+
+            return get_storage_cache().get_file(
+                f"{UPLOAD_DIR}/{filename}", stat=stat, download=download
+            )
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -342,6 +393,7 @@ class AzureStorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
+        get_storage_cache().delete(f"{UPLOAD_DIR}/{filename}")
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from Azure Blob Storage."""
@@ -354,6 +406,7 @@ class AzureStorageProvider(StorageProvider):
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
+        get_storage_cache().clear()
 
 
 def get_storage_provider(storage_provider: str):
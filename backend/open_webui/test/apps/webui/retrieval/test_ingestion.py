@@ -0,0 +1,123 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from open_webui.retrieval import ingestion
+from open_webui.retrieval.ingestion import FileStatus, IngestionQueue, SQLiteJobStore
+
+
+def get_store(tmp_path) -> SQLiteJobStore:
+    return SQLiteJobStore(str(tmp_path / "queue.db"))
+
+
+@pytest.fixture
+def statuses(monkeypatch):
+    """The statuses stored for files, without a database."""
+    statuses = []
+    monkeypatch.setattr(
+        ingestion,
+        "Users",
+        SimpleNamespace(get_user_by_id=lambda id: SimpleNamespace(id=id)),
+    )
+    monkeypatch.setattr(
+        ingestion,
+        "Files",
+        SimpleNamespace(
+            get_file_by_id=lambda id: SimpleNamespace(id=id),
+            update_file_data_by_id=lambda id, data: statuses.append(data),
+        ),
+    )
+    return statuses
+
+
+def test_lease(tmp_path):
+    store = get_store(tmp_path)
+    store.push({"id": "a"})
+    store.push({"id": "b"}, delay=60)
+
+    job = store.pop(lease=60)
+    assert job == {"id": "a"}
+
+    # Leased jobs and jobs that are not due yet are not handed out, also not
+    # to the other processes of the host
+    assert store.pop(lease=60) is None
+    assert get_store(tmp_path).pop(lease=60) is None
+    assert store.size() == 2
+
+    store.ack(job)
+    assert store.size() == 1
+
+
+def test_expired_lease(tmp_path):
+    store = get_store(tmp_path)
+    store.push({"id": "a"})
+
+    job = store.pop(lease=0.1)
+    store.extend(job, lease=0.2)
+    time.sleep(0.15)
+    assert store.pop(lease=60) is None
+
+    # The worker holding the job stopped renewing its lease
+    time.sleep(0.1)
+    assert store.pop(lease=60) == {"id": "a"}
+
+
+def test_retry_with_backoff(tmp_path, statuses):
+    store = get_store(tmp_path)
+    queue = IngestionQueue(store, max_retries=2, retry_delay=10, job_timeout=60)
+
+    def handler(request, file_id, user):
+        # Not marked as failed while the queue may retry the file
+        ingestion.set_file_failed(file_id, "error")
+        raise Exception("error")
+
+    def get_delay() -> float:
+        (available_at,) = store.conn.execute("SELECT available_at FROM job").fetchone()
+        return available_at - time.time()
+
+    queue.enqueue("file", "user")
+    asyncio.run(queue.process(None, handler, store.pop(lease=60)))
+    assert store.pop(lease=60) is None
+    assert 9 < get_delay() <= 10
+
+    job = {"id": "file", "file_id": "file", "user_id": "user", "attempts": 1}
+    asyncio.run(queue.process(None, handler, job))
+    assert 19 < get_delay() <= 20
+
+    asyncio.run(queue.process(None, handler, {**job, "attempts": 2}))
+    assert store.size() == 0
+
+    assert [status["status"] for status in statuses] == [
+        FileStatus.QUEUED,
+        FileStatus.QUEUED,
+        FileStatus.QUEUED,
+        FileStatus.FAILED,
+    ]
+    assert statuses[-1]["attempts"] == 3
+
+    # Outside of the workers the failure is final
+    ingestion.set_file_failed("file", "error")
+    assert statuses[-1]["status"] == FileStatus.FAILED
+
+
+def test_upload_rejected_when_full(tmp_path, monkeypatch):
+    from open_webui.routers import files
+
+    queue = IngestionQueue(get_store(tmp_path), max_size=1)
+    queue.store.push({"id": "a"})
+    monkeypatch.setattr(files, "ENABLE_FILE_INGESTION_QUEUE", True)
+    monkeypatch.setattr(files, "get_ingestion_queue", lambda: queue)
+
+    with pytest.raises(HTTPException) as e:
+        files.upload_file(
+            request=None,
+            file=SimpleNamespace(content_type="text/plain"),
+            metadata=None,
+            process=True,
+            internal=False,
+            user=SimpleNamespace(id="user"),
+        )
+    assert e.value.status_code == 429
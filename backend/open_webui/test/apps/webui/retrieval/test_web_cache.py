@@ -0,0 +1,55 @@
+import time
+
+from open_webui.retrieval.web.cache import WebCache, get_search_cache_key
+
+
+def get_cache(tmp_path, max_size=1024 * 1024, search_ttl=60, page_ttl=60):
+    return WebCache(str(tmp_path / "index.db"), max_size, search_ttl, page_ttl)
+
+
+def test_search(tmp_path):
+    cache = get_cache(tmp_path)
+    key = get_search_cache_key("searxng", "open webui", 3, [])
+    assert key != get_search_cache_key("searxng", "open webui", 5, [])
+
+    assert cache.get_search(key) is None
+    cache.set_search(key, "searxng", "open webui", [{"link": "https://a"}])
+    assert cache.get_search(key) == [{"link": "https://a"}]
+    assert cache.stats["search_hits"] == 1
+    assert cache.stats["search_misses"] == 1
+
+
+def test_search_expires(tmp_path):
+    cache = get_cache(tmp_path, search_ttl=1)
+    cache.set_search("key", "searxng", "query", [])
+    time.sleep(1.1)
+    assert cache.get_search("key") is None
+
+
+def test_page_revalidation(tmp_path):
+    cache = get_cache(tmp_path, page_ttl=0)
+
+    cache.set_page("https://a", "content a", etag='"1"')
+    cache.set_page("https://b", "content b")
+
+    page = cache.get_page("https://a")
+    assert page.content == "content a"
+    assert not page.fresh
+    assert page.get_validation_headers() == {"If-None-Match": '"1"'}
+
+    # Pages that cannot be revalidated are dropped once stale
+    assert cache.get_page("https://b") is None
+
+    cache.page_ttl = 60
+    cache.revalidate_page("https://a")
+    assert cache.get_page("https://a").fresh
+
+
+def test_collection(tmp_path):
+    cache = get_cache(tmp_path)
+
+    assert not cache.has_collection("web-search-1")
+    cache.set_collection("web-search-1")
+    assert cache.has_collection("web-search-1")
+    cache.delete_collection("web-search-1")
+    assert not cache.has_collection("web-search-1")
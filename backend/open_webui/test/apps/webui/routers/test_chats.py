@@ -234,3 +234,69 @@ class TestChats(AbstractPostgresTest):
 
         chat = self.chats.get_chat_by_id(chat_id)
         assert chat.share_id is None
+
+    def test_update_chat_message_by_id(self):
+        from open_webui.models.chats import ChatForm
+
+        chat = self.chats.insert_new_chat(
+            "2",
+            ChatForm(
+                **{
+                    "chat": {
+                        "name": "chat2",
+                        "history": {
+                            "currentId": "m2",
+                            "messages": {
+                                "m1": {"id": "m1", "parentId": None, "content": "hi"},
+                                "m2": {"id": "m2", "parentId": "m1", "content": "yo"},
+                            },
+                        },
+                    }
+                }
+            ),
+        )
+        with mock_webui_user(id="2"):
+            response = self.fast_api_client.post(
+                self.create_url(f"/{chat.id}/messages/m2"),
+                json={"content": "hello"},
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["chat"]["history"]["currentId"] == "m2"
+        assert data["chat"]["history"]["messages"]["m2"] == {
+            "id": "m2",
+            "parentId": "m1",
+            "content": "hello",
+        }
+        assert [message["id"] for message in data["chat"]["messages"]] == [
+            "m1",
+            "m2",
+        ]
+
+    def test_update_chat_by_id_clears_messages(self):
+        from open_webui.models.chats import ChatForm
+
+        chat = self.chats.insert_new_chat(
+            "2",
+            ChatForm(
+                **{
+                    "chat": {
+                        "name": "chat2",
+                        "history": {
+                            "currentId": "m1",
+                            "messages": {
+                                "m1": {"id": "m1", "parentId": None, "content": "hi"},
+                            },
+                        },
+                    }
+                }
+            ),
+        )
+        with mock_webui_user(id="2"):
+            response = self.fast_api_client.post(
+                self.create_url(f"/{chat.id}"),
+                json={"chat": {"history": {"currentId": None, "messages": {}}}},
+            )
+        assert response.status_code == 200
+        assert response.json()["chat"]["history"]["messages"] == {}
+        assert self.chats.get_chat_by_id(chat.id).chat["history"]["messages"] == {}
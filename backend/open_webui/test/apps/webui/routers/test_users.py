@@ -45,6 +45,9 @@ class TestUsers(AbstractPostgresTest):
             profile_image_url="/user2.png",
             role="user",
         )
+        # Users cached by a previous test are gone from the database
+        self.users.invalidate_cached_user_by_id("1")
+        self.users.invalidate_cached_user_by_id("2")
 
     def test_users(self):
         # Get all users
@@ -165,3 +168,45 @@ class TestUsers(AbstractPostgresTest):
         assert len(response.json()) == 1
         data = response.json()
         _assert_user(data, "1")
+
+    def test_cached_user_invalidation(self):
+        assert self.users.get_cached_user_by_id("1").role == "user"
+
+        self.users.update_user_role_by_id("1", "admin")
+        assert self.users.get_cached_user_by_id("1").role == "admin"
+
+        self.users.update_user_by_id("1", {"name": "user 1 updated"})
+        assert self.users.get_cached_user_by_id("1").name == "user 1 updated"
+
+        self.users.delete_user_by_id("1")
+        assert self.users.get_cached_user_by_id("1") is None
+
+    def test_cached_user_by_api_key(self):
+        self.users.update_user_api_key_by_id("1", "sk-1")
+        user = self.users.get_cached_user_by_api_key("sk-1")
+        assert user.id == "1"
+        assert user.api_key is None
+
+        # A replaced key stops working right away
+        self.users.update_user_api_key_by_id("1", "sk-2")
+        assert self.users.get_cached_user_by_api_key("sk-1") is None
+        assert self.users.get_cached_user_by_api_key("sk-2").id == "1"
+
+        self.users.update_user_api_key_by_id("1", None)
+        assert self.users.get_cached_user_by_api_key("sk-2") is None
+
+    def test_flush_user_last_active(self):
+        self.users.touch_user_last_active_by_id("1")
+        with self.users.last_active_lock:
+            self.users.last_active.update({"1": 100, "2": 200})
+
+        assert self.users.flush_user_last_active() == 2
+        assert self.users.get_user_by_id("1").last_active_at == 100
+        assert self.users.get_user_by_id("2").last_active_at == 200
+
+        # Nothing is written again until new activity is recorded
+        assert self.users.flush_user_last_active() == 0
+        self.users.touch_user_last_active_by_id("2")
+        assert self.users.flush_user_last_active() == 1
+        assert self.users.get_user_by_id("1").last_active_at == 100
+        assert self.users.get_user_by_id("2").last_active_at > 200
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+from open_webui.storage.cache import StorageCache
+
+
+class RemoteObject:
+    def __init__(self, content: bytes, etag: str):
+        self.content = content
+        self.etag = etag
+        self.downloads = 0
+
+    def stat(self):
+        return self.etag, len(self.content)
+
+    def download(self, path: str):
+        self.downloads += 1
+        time.sleep(0.01)
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+
+def get_file(cache: StorageCache, path, remote: RemoteObject) -> str:
+    return cache.get_file(str(path), stat=remote.stat, download=remote.download)
+
+
+def test_get_file_downloads_once(tmp_path):
+    cache = StorageCache(str(tmp_path / "index.db"), 1024, validate_interval=60)
+    remote = RemoteObject(b"test content", "etag")
+
+    threads = [
+        threading.Thread(target=get_file, args=(cache, tmp_path / "test.txt", remote))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert remote.downloads == 1
+    assert (tmp_path / "test.txt").read_bytes() == b"test content"
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 4
+
+
+def test_get_file_validates_etag(tmp_path):
+    cache = StorageCache(str(tmp_path / "index.db"), 1024, validate_interval=0)
+    remote = RemoteObject(b"test content", "etag")
+
+    get_file(cache, tmp_path / "test.txt", remote)
+    get_file(cache, tmp_path / "test.txt", remote)
+    assert remote.downloads == 1
+
+    remote.content, remote.etag = b"new content", "new-etag"
+    get_file(cache, tmp_path / "test.txt", remote)
+    assert remote.downloads == 2
+    assert (tmp_path / "test.txt").read_bytes() == b"new content"
+
+
+def test_get_file_adopts_uploaded_copy(tmp_path):
+    cache = StorageCache(str(tmp_path / "index.db"), 1024, validate_interval=0)
+    remote = RemoteObject(b"test content", "etag")
+
+    (tmp_path / "test.txt").write_bytes(b"test content")
+    cache.set(str(tmp_path / "test.txt"))
+    get_file(cache, tmp_path / "test.txt", remote)
+    assert remote.downloads == 0
+
+
+def test_eviction_keeps_files_being_served(tmp_path):
+    cache = StorageCache(str(tmp_path / "index.db"), 20, validate_interval=60)
+    served = get_file(cache, tmp_path / "served.txt", RemoteObject(b"a" * 12, "a"))
+
+    # The file returned above may still be sent when another download fills
+    # the cache
+    get_file(cache, tmp_path / "other.txt", RemoteObject(b"b" * 12, "b"))
+    assert os.path.isfile(served)
+    assert cache.index.evictions == 0
+
+    cache = StorageCache(
+        str(tmp_path / "index.db"), 20, validate_interval=60, grace_period=0
+    )
+    get_file(cache, tmp_path / "third.txt", RemoteObject(b"c" * 12, "c"))
+    assert not os.path.isfile(served)
@@ -0,0 +1,72 @@
+import time
+
+from open_webui.utils.cache_index import CacheIndex
+
+
+def get_index(tmp_path, max_size, **kwargs) -> CacheIndex:
+    return CacheIndex(
+        str(tmp_path / "index.db"),
+        max_size,
+        {"a": ["value TEXT"], "b": []},
+        **kwargs,
+    )
+
+
+def test_get_and_set(tmp_path):
+    index = get_index(tmp_path, 1024)
+
+    assert index.get("a", "key", ["value"]) is None
+    index.set("a", "key", 10, value="x")
+    index.set("b", "key", 5)
+    assert index.get("a", "key", ["value", "size"]) == ("x", 10)
+    assert index.size == 15
+
+    index.set("a", "key", 20, value="y")
+    assert index.size == 25
+
+    index.delete("a", "key")
+    assert index.get("a", "key", ["value"]) is None
+    assert index.size == 5
+
+    # The size is kept across instances
+    assert get_index(tmp_path, 1024).size == 5
+
+
+def test_eviction(tmp_path):
+    evicted = []
+    index = get_index(
+        tmp_path, 25, on_evict=lambda table, key: evicted.append((table, key)) or True
+    )
+
+    index.set("a", "1", 10, value=None)
+    time.sleep(0.01)
+    index.set("b", "2", 10)
+    time.sleep(0.01)
+    index.get("a", "1", ["size"])
+    time.sleep(0.01)
+    index.set("a", "3", 10, value=None)
+
+    # "2" is the least recently used entry of both tables
+    assert evicted == [("b", "2")]
+    assert index.get("b", "2", ["size"]) is None
+    assert index.size == 20
+    assert index.evictions == 1
+
+
+def test_eviction_skips_kept_entries(tmp_path):
+    index = get_index(tmp_path, 25, on_evict=lambda table, key: key != "1")
+
+    index.set("b", "1", 10)
+    time.sleep(0.01)
+    index.set("b", "2", 10)
+    time.sleep(0.01)
+    index.set("b", "3", 10)
+
+    assert index.get("b", "1", ["size"]) is not None
+    assert index.get("b", "2", ["size"]) is None
+
+    # Nothing used in the grace period is evicted
+    index = get_index(tmp_path / "grace", 15, grace_period=60)
+    index.set("b", "1", 10)
+    index.set("b", "2", 10)
+    assert index.evictions == 0
@@ -0,0 +1,37 @@
+import os
+
+from open_webui.utils.speech_cache import SpeechCache, split_speech_segments
+
+
+def test_split_speech_segments():
+    assert split_speech_segments(
+        "Hello there, how are you? I am fine. Thanks for asking me today!"
+    ) == [
+        "Hello there, how are you?",
+        "I am fine. Thanks for asking me today!",
+    ]
+    assert split_speech_segments("No punctuation here") == ["No punctuation here"]
+    assert split_speech_segments("") == []
+
+
+def test_get_and_set(tmp_path):
+    cache = SpeechCache(tmp_path, 1024)
+
+    assert cache.get("a") is None
+    path = cache.set("a", b"audio", engine="openai", voice="alloy")
+    assert cache.get("a") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"audio"
+
+    os.remove(path)
+    assert cache.get("a") is None
+    assert cache.get_stats()["segments"] == 0
+
+
+def test_adopts_existing_files(tmp_path):
+    (tmp_path / "legacy.mp3").write_bytes(b"x" * 10)
+    (tmp_path / "legacy.json").write_text("{}")
+
+    cache = SpeechCache(tmp_path, 1024)
+    assert cache.get("legacy") is not None
+    assert not (tmp_path / "legacy.json").exists()
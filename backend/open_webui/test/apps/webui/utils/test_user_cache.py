@@ -0,0 +1,29 @@
+from open_webui.utils.user_cache import LOCAL_MULTI_WORKER_TTL, UserCache
+
+
+def test_get_set_and_delete():
+    cache = UserCache(60)
+
+    assert cache.get("a") is None
+    cache.set("a", {"id": "a"})
+    cache.set("b", {"id": "b"})
+    assert cache.get("a") == {"id": "a"}
+
+    cache.delete("a", "b")
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_disabled():
+    cache = UserCache(0)
+
+    cache.set("a", {"id": "a"})
+    assert cache.get("a") is None
+
+
+def test_ttl_with_several_workers():
+    assert UserCache(60).ttl == 60
+    assert UserCache(2, workers=4).ttl == 2
+
+    # Other workers can't be told about invalidations without Redis
+    assert UserCache(60, workers=4).ttl == LOCAL_MULTI_WORKER_TTL
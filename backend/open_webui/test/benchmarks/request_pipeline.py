@@ -0,0 +1,242 @@
+"""
+Per request overhead of the HTTP middleware stack, before and after it was
+folded into `RequestPipelineMiddleware`.
+
+"before" rebuilds the previous stack (two `BaseHTTPMiddleware` subclasses
+and four `@app.middleware("http")` functions, one of them the metrics
+middleware), "after" is the pipeline with a metrics observer. Requests are
+sent straight to the ASGI app, so the numbers only include the app and its
+middleware. Compression and CORS are left out, they are the same in both.
+
+    cd backend
+    python -m open_webui.test.benchmarks.request_pipeline [--requests 2000] [--chunks 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from open_webui.internal.db import Session
+from open_webui.models.groups import REQUEST_GROUP_MEMBERSHIPS
+from open_webui.utils import request_pipeline
+from open_webui.utils.auth import get_http_authorization_cred
+from open_webui.utils.request_pipeline import RequestPipelineMiddleware
+from open_webui.utils.security_headers import set_security_headers
+
+
+def record_request(*args):
+    # Stands in for the OpenTelemetry counter and histogram
+    pass
+
+
+def create_app(chunks: int) -> FastAPI:
+    app = FastAPI()
+    app.state.config = SimpleNamespace(ENABLE_API_KEY=False)
+
+    @app.get("/api/config")
+    async def get_config():
+        return {"status": True}
+
+    @app.get("/api/chat/completions")
+    async def chat_completions():
+        async def stream():
+            for i in range(chunks):
+                yield f'data: {{"choices": [{{"delta": {{"content": "{i}"}}}}]}}\n\n'
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def create_before_app(chunks: int) -> FastAPI:
+    app = create_app(chunks)
+
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        record_request(
+            getattr(route, "path", request.url.path),
+            response.status_code,
+            time.perf_counter() - start_time,
+        )
+        return response
+
+    class RedirectMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            if request.method == "GET":
+                path = request.url.path
+                query_params = dict(parse_qs(urlparse(str(request.url)).query))
+
+                if path.endswith("/watch") and "v" in query_params:
+                    video_id = query_params["v"][0]
+                    encoded_video_id = urlencode({"youtube": video_id})
+                    return RedirectResponse(url=f"/?{encoded_video_id}")
+
+            return await call_next(request)
+
+    class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            response = await call_next(request)
+            response.headers.update(set_security_headers())
+            return response
+
+    app.add_middleware(RedirectMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+
+    @app.middleware("http")
+    async def commit_session_after_request(request: Request, call_next):
+        response = await call_next(request)
+        Session.commit()
+        return response
+
+    @app.middleware("http")
+    async def check_url(request: Request, call_next):
+        start_time = int(time.time())
+        request.state.token = get_http_authorization_cred(
+            request.headers.get("Authorization")
+        )
+        request.state.enable_api_key = app.state.config.ENABLE_API_KEY
+
+        group_memberships_token = REQUEST_GROUP_MEMBERSHIPS.set({})
+        try:
+            response = await call_next(request)
+        finally:
+            REQUEST_GROUP_MEMBERSHIPS.reset(group_memberships_token)
+        response.headers["X-Process-Time"] = str(int(time.time()) - start_time)
+        return response
+
+    @app.middleware("http")
+    async def inspect_websocket(request: Request, call_next):
+        if (
+            "/ws/socket.io" in request.url.path
+            and request.query_params.get("transport") == "websocket"
+        ):
+            upgrade = (request.headers.get("Upgrade") or "").lower()
+            connection = (request.headers.get("Connection") or "").lower().split(",")
+            if upgrade != "websocket" or "upgrade" not in connection:
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"detail": "Invalid WebSocket upgrade request"},
+                )
+        return await call_next(request)
+
+    return app
+
+
+def create_after_app(chunks: int) -> FastAPI:
+    app = create_app(chunks)
+    app.add_middleware(RequestPipelineMiddleware)
+    return app
+
+
+async def request(app: FastAPI, path: str) -> tuple[int, float]:
+    """Sends a GET request, returns the number of body messages and the time to the first one."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"authorization", b"Bearer token")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    start_time = time.perf_counter()
+    first_chunk_time = None
+    messages = 0
+
+    async def send(message):
+        nonlocal first_chunk_time, messages
+        if message["type"] == "http.response.body":
+            if message.get("body"):
+                messages += 1
+                if first_chunk_time is None:
+                    first_chunk_time = time.perf_counter() - start_time
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return messages, first_chunk_time or 0.0
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> dict:
+    # Warm up
+    for _ in range(50):
+        await request(app, path)
+
+    durations = []
+    first_chunk_times = []
+    for _ in range(requests):
+        start_time = time.perf_counter()
+        messages, first_chunk_time = await request(app, path)
+        durations.append(time.perf_counter() - start_time)
+        first_chunk_times.append(first_chunk_time)
+
+    durations.sort()
+    return {
+        "mean": statistics.fmean(durations) * 1e6,
+        "p50": durations[len(durations) // 2] * 1e6,
+        "p99": durations[int(len(durations) * 0.99)] * 1e6,
+        "first_chunk": statistics.fmean(first_chunk_times) * 1e6,
+        "messages": messages,
+    }
+
+
+async def main(requests: int, chunks: int):
+    # The metrics observer registered by the app when OpenTelemetry is enabled
+    request_pipeline.add_request_observer(
+        lambda scope, status_code, duration: record_request(
+            getattr(scope.get("route"), "path", scope["path"]), status_code, duration
+        )
+    )
+
+    print(f"{'':32} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'1st chunk µs':>13}")
+    for path, label in [
+        ("/api/config", "JSON"),
+        ("/api/chat/completions", f"SSE, {chunks} chunks"),
+    ]:
+        for name, create in [
+            ("before", create_before_app),
+            ("after", create_after_app),
+        ]:
+            result = await measure(create(chunks), path, requests)
+            print(
+                f"{label + ' (' + name + ')':32} {result['mean']:10.1f} {result['p50']:10.1f} "
+                f"{result['p99']:10.1f} {result['first_chunk']:13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--chunks", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.chunks))
@@ -53,14 +53,13 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_group_permissions = Groups.get_group_permissions_by_member_id(user_id)
 
     # Deep copy default permissions to avoid modifying the original dict
     permissions = json.loads(json.dumps(default_permissions))
 
     # Combine permissions from all user groups
-    for group in user_groups:
-        group_permissions = group.permissions or {}
+    for group_permissions in user_group_permissions.values():
         permissions = combine_permissions(permissions, group_permissions)
 
     # Ensure all fields from default_permissions are present and filled in
@@ -93,10 +92,9 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_group_permissions = Groups.get_group_permissions_by_member_id(user_id)
 
-    for group in user_groups:
-        group_permissions = group.permissions
+    for group_permissions in user_group_permissions.values():
         if get_permission(group_permissions, permission_hierarchy):
             return True
 
@@ -115,8 +113,7 @@ def has_access(
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    user_group_ids = Groups.get_group_ids_by_member_id(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
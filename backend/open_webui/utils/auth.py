@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 import jwt
@@ -24,11 +25,13 @@ from open_webui.env import (
     STATIC_DIR,
     SRC_LOG_LEVELS,
     WEBUI_AUTH_TRUSTED_EMAIL_HEADER,
+    USER_LAST_ACTIVE_FLUSH_INTERVAL,
 )
 
 from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
 
 logging.getLogger("passlib").setLevel(logging.ERROR)
@@ -220,7 +223,7 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        user = Users.get_cached_user_by_id(data["id"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -250,10 +253,9 @@ def get_current_user(
                 current_span.set_attribute("client.user.role", user.role)
                 current_span.set_attribute("client.auth.type", "jwt")
 
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+            # Refresh the user's last active timestamp with the next batched
+            # write to prevent blocking the request
+            Users.touch_user_last_active_by_id(user.id)
         return user
     else:
         raise HTTPException(
@@ -263,7 +265,7 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = Users.get_cached_user_by_api_key(api_key)
 
     if user is None:
         raise HTTPException(
@@ -279,11 +281,21 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        Users.touch_user_last_active_by_id(user.id)
 
     return user
 
 
+async def periodic_user_last_active_flush():
+    """Writes the users' last activity every USER_LAST_ACTIVE_FLUSH_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+        try:
+            await run_in_threadpool(Users.flush_user_last_active)
+        except Exception as e:
+            log.warning(f"Error writing the users' last activity: {e}")
+
+
 def get_verified_user(user=Depends(get_current_user)):
     if user.role not in {"user", "admin"}:
         raise HTTPException(
@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Container, Optional
+
+# Share of `max_size` eviction frees the cache down to, so it does not run on
+# every write once the cache is full
+EVICTION_TARGET = 0.9
+
+# Rows per statement when reading or writing many entries
+BATCH_SIZE = 500
+
+
+class CacheIndex:
+    """
+    SQLite index of the entries of a local cache, evicted least recently used
+    first once they take more than `max_size` bytes (no limit if 0).
+
+    Every table has a `key`, the `size` the entry counts for and its
+    `accessed_at` time, plus the columns given in `tables`. All the tables
+    share the budget. Entries accessed in the last `grace_period` seconds are
+    never evicted, and `on_evict(table, key)` is called before an entry is
+    removed, e.g. to delete its file, and keeps the entry if it returns False.
+
+    The lock is reentrant, so a cache can hold it across several calls.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int,
+        tables: dict[str, list[str]],
+        grace_period: float = 0,
+        on_evict: Optional[Callable[[str, str], bool]] = None,
+    ):
+        self.max_size = max_size
+        self.tables = list(tables)
+        self.grace_period = grace_period
+        self.on_evict = on_evict
+
+        self.lock = threading.RLock()
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+
+        # Tables that did not exist yet, e.g. to adopt files cached before
+        self.created = []
+        for table, columns in tables.items():
+            (exists,) = self.conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            ).fetchone()
+            if not exists:
+                self.created.append(table)
+
+            definitions = [
+                "key TEXT PRIMARY KEY",
+                "size INTEGER NOT NULL",
+                "accessed_at REAL NOT NULL",
+                *columns,
+            ]
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})"
+            )
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed_at ON {table} (accessed_at)"
+            )
+        self.conn.commit()
+        self.size = self._get_size()
+
+    def get(self, table: str, key: str, columns: list[str]) -> Optional[tuple]:
+        return self.get_many(table, [key], columns).get(key)
+
+    def get_many(
+        self, table: str, keys: list[str], columns: list[str]
+    ) -> dict[str, tuple]:
+        """Returns `columns` of the entries found by key, marking them as used."""
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), BATCH_SIZE):
+                batch = keys[i : i + BATCH_SIZE]
+                rows = self.conn.execute(
+                    f"SELECT key, {', '.join(columns)} FROM {table} WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                found.update({row[0]: row[1:] for row in rows})
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    f"UPDATE {table} SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self.conn.commit()
+        return found
+
+    def set(self, table: str, key: str, size: int, **columns):
+        self.set_many(table, [{"key": key, "size": size, **columns}])
+
+    def set_many(self, table: str, entries: list[dict]):
+        """
+        Adds or replaces entries, each a dict with the key, size and columns.
+        Entries are used now unless they have an `accessed_at`, and the write
+        that adds them never evicts the ones used now.
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        with self.lock:
+            keys = [entry["key"] for entry in entries]
+            replaced = 0
+            for i in range(0, len(keys), BATCH_SIZE):
+                batch = keys[i : i + BATCH_SIZE]
+                replaced += self.conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM {table} WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchone()[0]
+
+            columns = [column for column in entries[0] if column != "accessed_at"]
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, accessed_at) VALUES ({', '.join('?' * (len(columns) + 1))})",
+                [
+                    [entry[column] for column in columns]
+                    + [entry.get("accessed_at", now)]
+                    for entry in entries
+                ],
+            )
+            self.size += sum(entry["size"] for entry in entries) - replaced
+
+            self._evict(
+                keep={entry["key"] for entry in entries if "accessed_at" not in entry}
+            )
+            self.conn.commit()
+
+    def update(self, table: str, key: str, **columns):
+        """Updates columns of an entry, leaving its size and last access as is."""
+        with self.lock:
+            self.conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE key = ?",
+                [*columns.values(), key],
+            )
+            self.conn.commit()
+
+    def delete(self, table: str, key: str):
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT size FROM {table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+                self.conn.commit()
+                self.size -= row[0]
+
+    def clear(self):
+        with self.lock:
+            for table in self.tables:
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.commit()
+            self.size = 0
+
+    def count(self, table: str) -> int:
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _get_size(self) -> int:
+        return self.conn.execute(
+            f"SELECT {' + '.join(f'(SELECT COALESCE(SUM(size), 0) FROM {table})' for table in self.tables)}"
+        ).fetchone()[0]
+
+    def _evict(self, keep: Container[str]):
+        if self.max_size <= 0 or self.size <= self.max_size:
+            return
+
+        # Other processes sharing the index may have added or evicted entries
+        self.size = self._get_size()
+        if self.size <= self.max_size:
+            return
+
+        target = int(self.max_size * EVICTION_TARGET)
+        accessed_before = time.time() - self.grace_period
+
+        # Deleted once the query has been read
+        evicted = []
+        cursor = self.conn.execute(
+            " UNION ALL ".join(
+                f"SELECT '{table}', key, size, accessed_at FROM {table}"
+                for table in self.tables
+            )
+            + " ORDER BY accessed_at"
+        )
+        for table, key, size, accessed_at in cursor:
+            if self.size <= target or accessed_at >= accessed_before:
+                break
+            if key in keep:
+                continue
+            if self.on_evict is not None and not self.on_evict(table, key):
+                continue
+            evicted.append((table, key))
+            self.size -= size
+        cursor.close()
+
+        for table, key in evicted:
+            self.conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        self.evictions += len(evicted)
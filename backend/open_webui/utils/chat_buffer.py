@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional, Union
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REALTIME_CHAT_SAVE_INTERVAL_MS,
+    REALTIME_CHAT_SAVE_MAX_BYTES,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Buffers holding updates that have not been written yet, flushed on shutdown
+pending_buffers: set["MessageWriteBuffer"] = set()
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for a message that is being streamed into a chat.
+
+    Updates are merged in memory and written with a single upsert once
+    `interval_ms` has passed since the last write or `max_bytes` of new content
+    is pending, so at most that much is lost if the process dies mid-stream.
+    """
+
+    def __init__(
+        self,
+        chat_id: str,
+        message_id: str,
+        interval_ms: int = REALTIME_CHAT_SAVE_INTERVAL_MS,
+        max_bytes: int = REALTIME_CHAT_SAVE_MAX_BYTES,
+    ):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.interval = interval_ms / 1000
+        self.max_bytes = max_bytes
+
+        self.message: dict = {}
+        # Builds the latest state of the message lazily, so content is only
+        # serialized when it is actually written
+        self.message_builder: Optional[Callable[[], dict]] = None
+        self.pending_bytes = 0
+        self.dirty = False
+
+        self.last_flush_at = time.monotonic()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, message: Union[dict, Callable[[], dict]], size: int = 0):
+        if callable(message):
+            self.message_builder = message
+        else:
+            self.message.update(message)
+
+        self.pending_bytes += size
+        self.dirty = True
+        self.writes += 1
+        pending_buffers.add(self)
+
+        elapsed = time.monotonic() - self.last_flush_at
+        if self.pending_bytes >= self.max_bytes or elapsed >= self.interval:
+            self.flush()
+        elif self.timer is None:
+            try:
+                self.timer = asyncio.get_running_loop().call_later(
+                    self.interval - elapsed, self.flush
+                )
+            except RuntimeError:
+                # No running loop to schedule the flush on, write through
+                self.flush()
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        pending_buffers.discard(self)
+        if not self.dirty:
+            return
+
+        message = {
+            **self.message,
+            **(self.message_builder() if self.message_builder else {}),
+        }
+
+        self.message = {}
+        self.message_builder = None
+        self.pending_bytes = 0
+        self.dirty = False
+        self.last_flush_at = time.monotonic()
+        self.flushes += 1
+
+        try:
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                self.chat_id, self.message_id, message
+            )
+        except Exception as e:
+            log.exception(f"Error saving message {self.chat_id}/{self.message_id}: {e}")
+
+    def close(self):
+        self.flush()
+        log.debug(
+            f"Message {self.chat_id}/{self.message_id} saved {self.writes} updates in {self.flushes} writes"
+        )
+
+
+def flush_message_buffers():
+    for buffer in list(pending_buffers):
+        buffer.flush()
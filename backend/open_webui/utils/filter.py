@@ -5,6 +5,7 @@ from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
 from open_webui.models.functions import Functions
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -57,48 +58,74 @@ def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None)
     return filter_ids
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
-):
-    skip_files = None
-
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
-
-        function_module = get_function_module(
-            request, filter_id, load_from_db=(filter_type != "stream")
-        )
-        # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
-        if not handler:
-            continue
-
-        # Check if the function has a file_handler variable
-        if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
+class CompiledFilter:
+    def __init__(self, filter_id, function_module, handler, params, valves):
+        self.id = filter_id
+        self.function_module = function_module
+        self.handler = handler
+        self.is_coroutine = inspect.iscoroutinefunction(handler)
+        self.valves = valves
+
+        # Parameters other than the body, which are the same for every call
+        self.params = params
+
+
+class FilterPipeline:
+    """
+    Filter functions of one request resolved once: handlers, their signatures
+    and valves are looked up when the pipeline is compiled, so processing a
+    stream chunk only calls the handlers.
+    """
+
+    def __init__(self, request, filter_functions, filter_type, extra_params):
+        self.request = request
+        self.filter_functions = filter_functions
+        self.filter_type = filter_type
+        self.extra_params = extra_params
+
+        self.filters: list[CompiledFilter] = []
+        self.skip_files = None
+        self.version = None
+
+    def compile(self):
+        # Bumped whenever function valves or code change, so pipelines compiled
+        # for a running stream pick up the new values on their next chunk
+        self.version = FUNCTION_REGISTRY.version
+        self.filters = []
+        self.skip_files = None
+
+        for function in self.filter_functions:
+            if not function:
+                continue
+            filter_id = function.id
+
+            function_module = get_function_module(
+                self.request, filter_id, load_from_db=(self.filter_type != "stream")
             )
+            # Prepare handler function
+            handler = getattr(function_module, self.filter_type, None)
+            if not handler:
+                continue
+
+            # Check if the function has a file_handler variable
+            if self.filter_type == "inlet" and hasattr(function_module, "file_handler"):
+                self.skip_files = function_module.file_handler
+
+            # Apply valves to the function
+            valves = None
+            if hasattr(function_module, "valves") and hasattr(
+                function_module, "Valves"
+            ):
+                valves = Functions.get_function_valves_by_id(filter_id)
+                valves = function_module.Valves(**(valves if valves else {}))
+                function_module.valves = valves
 
-        try:
             # Prepare parameters
             sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
+            params = {
                 k: v
                 for k, v in {
-                    **extra_params,
+                    **self.extra_params,
                     "__id__": filter_id,
                 }.items()
                 if k in sig.parameters
@@ -107,6 +134,8 @@ async def process_filter_functions(
             # Handle user parameters
             if "__user__" in sig.parameters:
                 if hasattr(function_module, "UserValves"):
+                    # Every filter gets its own user valves
+                    params["__user__"] = {**params["__user__"]}
                     try:
                         params["__user__"]["valves"] = function_module.UserValves(
                             **Functions.get_user_valves_by_id_and_user_id(
@@ -116,19 +145,57 @@ async def process_filter_functions(
                     except Exception as e:
                         log.exception(f"Failed to get user values: {e}")
 
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
+            self.filters.append(
+                CompiledFilter(filter_id, function_module, handler, params, valves)
+            )
+
+        return self
+
+    async def process(self, form_data):
+        if self.version != FUNCTION_REGISTRY.version:
+            self.compile()
+
+        for filter in self.filters:
+            # Modules are shared by requests, valves are set again in case a
+            # newer pipeline replaced them in the meantime
+            if filter.valves is not None:
+                filter.function_module.valves = filter.valves
+
+            if self.filter_type == "stream":
+                params = {"event": form_data, **filter.params}
             else:
-                form_data = handler(**params)
+                params = {"body": form_data, **filter.params}
+
+            try:
+                # Execute handler
+                if filter.is_coroutine:
+                    form_data = await filter.handler(**params)
+                else:
+                    form_data = filter.handler(**params)
+
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {filter.id}: {e}")
+                raise e
 
-        except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
+        # Handle file cleanup for inlet
+        if self.skip_files and "files" in form_data.get("metadata", {}):
+            del form_data["files"]
+            del form_data["metadata"]["files"]
 
-    # Handle file cleanup for inlet
-    if skip_files and "files" in form_data.get("metadata", {}):
-        del form_data["files"]
-        del form_data["metadata"]["files"]
+        return form_data, {}
 
-    return form_data, {}
+
+def get_filter_pipeline(
+    request, filter_functions, filter_type, extra_params
+) -> FilterPipeline:
+    return FilterPipeline(
+        request, filter_functions, filter_type, extra_params
+    ).compile()
+
+
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    return await get_filter_pipeline(
+        request, filter_functions, filter_type, extra_params
+    ).process(form_data)
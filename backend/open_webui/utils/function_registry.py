@@ -0,0 +1,199 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    FUNCTION_MODULE_REVALIDATE_INTERVAL,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+REDIS_FUNCTIONS_CHANNEL = "open-webui:functions:invalidate"
+
+
+def get_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class FunctionEntry:
+    def __init__(
+        self,
+        module: Any,
+        type: Optional[str],
+        frontmatter: Optional[dict],
+        content_hash: str,
+        load_time: float,
+    ):
+        self.module = module
+        self.type = type
+        self.frontmatter = frontmatter
+        self.content_hash = content_hash
+
+        # Seconds spent executing the module
+        self.load_time = load_time
+        self.loaded_at = time.time()
+
+        self.validated_at = time.monotonic()
+        self.stale = False
+
+
+class FunctionRegistry:
+    """
+    Function modules loaded by this worker, tagged with the hash of the content
+    they were executed from, so every version of a function is executed once.
+
+    A module is served without reading the database until it is invalidated,
+    by this worker or by another one through Redis pub/sub, or until it is
+    older than `revalidate_interval` seconds. It is then checked against the
+    hash of the stored content and only executed again if the content changed.
+
+    `version` is bumped on every change to a function (code or valves), so
+    anything derived from the modules knows when to rebuild.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "",
+        redis_sentinels: Optional[list] = None,
+        revalidate_interval: int = FUNCTION_MODULE_REVALIDATE_INTERVAL,
+    ):
+        self.revalidate_interval = revalidate_interval
+        self.entries: dict[str, FunctionEntry] = {}
+        self.version = 0
+        self.stats = {"hits": 0, "validations": 0, "loads": 0}
+
+        # Tells the messages published by this worker apart
+        self.origin = str(uuid.uuid4())
+
+        # Invalidations are published from the routes, so through the async client
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, async_mode=True, decode_responses=True
+                )
+            except Exception as e:
+                log.warning(f"Function registry is not shared through Redis: {e}")
+
+    def get(self, function_id: str, revalidate: bool = True) -> Optional[FunctionEntry]:
+        """Returns the loaded module if it can be used without a database read."""
+        entry = self.entries.get(function_id)
+        if entry is None:
+            return None
+
+        if revalidate and (
+            entry.stale
+            or time.monotonic() - entry.validated_at >= self.revalidate_interval
+        ):
+            return None
+
+        self.stats["hits"] += 1
+        return entry
+
+    def validate(self, function_id: str, content_hash: str) -> Optional[FunctionEntry]:
+        """Returns the loaded module if it was executed from `content_hash`."""
+        entry = self.entries.get(function_id)
+        if entry is None or entry.content_hash != content_hash:
+            return None
+
+        entry.validated_at = time.monotonic()
+        entry.stale = False
+
+        self.stats["validations"] += 1
+        return entry
+
+    def set(
+        self,
+        function_id: str,
+        module: Any,
+        type: Optional[str],
+        frontmatter: Optional[dict],
+        content_hash: str,
+        load_time: float = 0.0,
+    ) -> FunctionEntry:
+        entry = FunctionEntry(module, type, frontmatter, content_hash, load_time)
+        self.entries[function_id] = entry
+
+        self.stats["loads"] += 1
+        log.info(
+            f"Loaded function {function_id} ({content_hash[:12]}) in {load_time * 1000:.1f}ms"
+        )
+        return entry
+
+    async def invalidate(
+        self,
+        function_id: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        deleted: bool = False,
+    ):
+        """
+        Tells every worker that a function changed, or all of them without
+        `function_id`. Modules executed from another content than `content_hash`
+        are checked again on their next use; without a hash the code is taken
+        as unchanged (e.g. valves updates).
+        """
+        self._invalidate(function_id, content_hash, deleted)
+
+        if self.redis is not None:
+            try:
+                await self.redis.publish(
+                    REDIS_FUNCTIONS_CHANNEL,
+                    json.dumps(
+                        {
+                            "origin": self.origin,
+                            "id": function_id,
+                            "hash": content_hash,
+                            "deleted": deleted,
+                        }
+                    ),
+                )
+            except Exception as e:
+                log.warning(f"Error publishing function invalidation: {e}")
+
+    def _invalidate(
+        self, function_id: Optional[str], content_hash: Optional[str], deleted: bool
+    ):
+        self.version += 1
+
+        if function_id is None:
+            for entry in self.entries.values():
+                entry.stale = True
+        elif deleted:
+            self.entries.pop(function_id, None)
+        elif content_hash is not None:
+            entry = self.entries.get(function_id)
+            if entry is not None and entry.content_hash != content_hash:
+                entry.stale = True
+
+    async def listen(self, app):
+        """Applies the invalidations published by the other workers."""
+        pubsub = app.state.redis.pubsub()
+        await pubsub.subscribe(REDIS_FUNCTIONS_CHANNEL)
+
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                if data.get("origin") != self.origin:
+                    self._invalidate(
+                        data.get("id"), data.get("hash"), data.get("deleted", False)
+                    )
+            except Exception as e:
+                log.warning(f"Error handling function invalidation: {e}")
+
+
+FUNCTION_REGISTRY = FunctionRegistry(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
@@ -0,0 +1,215 @@
+import logging
+import random
+import time
+from typing import AsyncIterator, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    MODELS_LOAD_BALANCER_STRATEGY,
+    MODELS_LOAD_BALANCER_MAX_FAILURES,
+    MODELS_LOAD_BALANCER_EJECTION_TIME,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Weight of the newest sample in the latency moving average
+EWMA_ALPHA = 0.3
+
+# Requests in flight on every backend that has the model loaded before the
+# others are considered as well
+AFFINITY_MAX_IN_FLIGHT = 4
+
+
+def is_failure_status(status: Optional[int]) -> bool:
+    """Whether a response status says the backend, not the request, is at fault."""
+    return status is None or status >= 500 or status == 429
+
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url
+
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+        # Moving average of the seconds until the response headers arrive
+        self.latency: Optional[float] = None
+
+        # Models the backend reports as loaded in memory
+        self.loaded_models: set[str] = set()
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        return self.ejected_until <= (now or time.time())
+
+    def get_stats(self) -> dict:
+        return {
+            "url": self.url,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "healthy": self.is_healthy(),
+            "latency": self.latency,
+            "loaded_models": sorted(self.loaded_models),
+        }
+
+
+def select_random(backends: list[Backend]) -> Backend:
+    return random.choice(backends)
+
+
+def select_least_requests(backends: list[Backend]) -> Backend:
+    least = min(backend.in_flight for backend in backends)
+    return random.choice([b for b in backends if b.in_flight == least])
+
+
+def select_ewma(backends: list[Backend]) -> Backend:
+    latencies = [b.latency for b in backends if b.latency is not None]
+    # Backends without samples yet are scored like an average one
+    default = sum(latencies) / len(latencies) if latencies else 1.0
+
+    def score(backend: Backend) -> float:
+        latency = backend.latency if backend.latency is not None else default
+        return latency * (backend.in_flight + 1)
+
+    best = min(score(backend) for backend in backends)
+    return random.choice([b for b in backends if score(b) == best])
+
+
+class Lease:
+    """A request in flight on a backend, released at most once."""
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        self.backend.in_flight = max(self.backend.in_flight - 1, 0)
+
+
+STRATEGIES: dict[str, Callable[[list[Backend]], Backend]] = {
+    "random": select_random,
+    "least_requests": select_least_requests,
+    "ewma": select_ewma,
+}
+
+
+class LoadBalancer:
+    """
+    Picks one of the connections that serve a model and keeps per backend
+    request counters, latency and health. Backends are keyed by base URL so
+    the state survives reordering of the configured connections.
+
+    With `affinity`, backends with the model already loaded are preferred.
+    Backends that failed `max_failures` times in a row are skipped for
+    `ejection_time` seconds, and the remaining ones are ranked by `strategy`.
+    """
+
+    def __init__(
+        self,
+        strategy: str = MODELS_LOAD_BALANCER_STRATEGY,
+        max_failures: int = MODELS_LOAD_BALANCER_MAX_FAILURES,
+        ejection_time: int = MODELS_LOAD_BALANCER_EJECTION_TIME,
+        affinity: bool = True,
+    ):
+        self.strategy = STRATEGIES[strategy]
+        self.affinity = affinity and strategy != "random"
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+
+        self.backends: dict[str, Backend] = {}
+
+    def get_backend(self, url: str) -> Backend:
+        backend = self.backends.get(url)
+        if backend is None:
+            backend = self.backends[url] = Backend(url)
+        return backend
+
+    def select(self, urls: list[str], model: Optional[str] = None) -> int:
+        """Returns the position in `urls` of the backend to send the request to."""
+        if len(urls) == 1:
+            return 0
+
+        now = time.time()
+        backends = [self.get_backend(url) for url in urls]
+
+        # When every backend is ejected it is better to try one than to fail
+        candidates = [b for b in backends if b.is_healthy(now)] or backends
+
+        if self.affinity and model:
+            loaded = [
+                b
+                for b in candidates
+                if model in b.loaded_models and b.in_flight < AFFINITY_MAX_IN_FLIGHT
+            ]
+            if loaded:
+                candidates = loaded
+
+        return backends.index(self.strategy(candidates))
+
+    def acquire(self, url: str) -> Lease:
+        """
+        Counts a request in flight on `url` until the returned lease is
+        released.
+        """
+        backend = self.get_backend(url)
+        backend.in_flight += 1
+        backend.requests += 1
+        return Lease(backend)
+
+    async def stream(self, lease: Lease, content: AsyncIterator[bytes]):
+        """Passes `content` through, releasing `lease` once the stream ends."""
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            lease.release()
+
+    def record_success(
+        self, url: str, latency: Optional[float] = None, model: Optional[str] = None
+    ):
+        backend = self.get_backend(url)
+        backend.consecutive_failures = 0
+        backend.ejected_until = 0.0
+
+        if latency is not None:
+            backend.latency = (
+                latency
+                if backend.latency is None
+                else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * backend.latency
+            )
+
+        if model:
+            # The backend loads the model to answer, until the next health
+            # check says otherwise
+            backend.loaded_models.add(model)
+
+    def record_failure(self, url: str):
+        backend = self.get_backend(url)
+        backend.failures += 1
+        backend.consecutive_failures += 1
+
+        if backend.consecutive_failures >= self.max_failures:
+            if backend.is_healthy():
+                log.warning(
+                    f"Taking {url} out of rotation for {self.ejection_time}s after "
+                    f"{backend.consecutive_failures} consecutive failures"
+                )
+            backend.ejected_until = time.time() + self.ejection_time
+
+    def set_loaded_models(self, url: str, models: list[str]):
+        self.get_backend(url).loaded_models = set(models)
+
+    def get_stats(self) -> list[dict]:
+        return [backend.get_stats() for backend in self.backends.values()]
+
+
+OLLAMA_LOAD_BALANCER = LoadBalancer()
+# OpenAI compatible APIs do not report loaded models
+OPENAI_LOAD_BALANCER = LoadBalancer(affinity=False)
@@ -79,9 +79,11 @@ from open_webui.utils.tools import get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
+    get_filter_pipeline,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.chat_buffer import MessageWriteBuffer
 
 from open_webui.tasks import create_task
 
@@ -1273,7 +1275,7 @@ async def process_chat_response(
                     )
 
                     # Send a webhook notification if the user is not active
-                    if not get_active_status_by_user_id(user.id):
+                    if not await get_active_status_by_user_id(user.id):
                         webhook_url = Users.get_user_webhook_url_by_id(user.id)
                         if webhook_url:
                             post_webhook(
@@ -1723,6 +1725,10 @@ async def process_chat_response(
 
             solution_tags = [("|begin_of_solution|", "|end_of_solution|")]
 
+            message_buffer = MessageWriteBuffer(
+                metadata["chat_id"], metadata["message_id"]
+            )
+
             try:
                 for event in events:
                     await event_emitter(
@@ -1747,6 +1753,11 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
+                    # Handlers and valves are resolved once for the whole stream
+                    stream_filters = get_filter_pipeline(
+                        request, filter_functions, "stream", extra_params
+                    )
+
                     async for line in response.body_iterator:
                         line = line.decode("utf-8") if isinstance(line, bytes) else line
                         data = line
@@ -1765,13 +1776,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params=extra_params,
-                            )
+                            data, _ = await stream_filters.process(data)
 
                             if data:
                                 if "event" in data:
@@ -1978,14 +1983,13 @@ async def process_chat_response(
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
-                                                {
+                                            message_buffer.write(
+                                                lambda: {
                                                     "content": serialize_content_blocks(
                                                         content_blocks
                                                     ),
                                                 },
+                                                size=len(value.encode("utf-8")),
                                             )
                                         else:
                                             data = {
@@ -2376,18 +2380,12 @@ async def process_chat_response(
                     "title": title,
                 }
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_content_blocks(content_blocks),
-                        },
-                    )
+                # Save message in the database
+                message_buffer.write({"content": data["content"]})
+                message_buffer.flush()
 
                 # Send a webhook notification if the user is not active
-                if not get_active_status_by_user_id(user.id):
+                if not await get_active_status_by_user_id(user.id):
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
                         post_webhook(
@@ -2412,17 +2410,17 @@ async def process_chat_response(
                 await background_tasks_handler()
             except asyncio.CancelledError:
                 log.warning("Task was cancelled!")
-                await event_emitter({"type": "task-cancelled"})
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_content_blocks(content_blocks),
-                        },
-                    )
+                # Save message in the database
+                message_buffer.write(
+                    {"content": serialize_content_blocks(content_blocks)}
+                )
+                message_buffer.flush()
+
+                await event_emitter({"type": "task-cancelled"})
+            finally:
+                # Persist whatever is still buffered if the handler failed midway
+                message_buffer.close()
 
             if response.background is not None:
                 await response.background()
@@ -2439,26 +2437,18 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filters = get_filter_pipeline(
+                request, filter_functions, "stream", extra_params
+            )
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event, _ = await stream_filters.process(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data, _ = await stream_filters.process(data)
 
                 if data:
                     yield data
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    MODELS_REGISTRY_REFRESH_INTERVAL,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+REDIS_VERSION_KEY = "open-webui:models:version"
+REDIS_SNAPSHOT_KEY = "open-webui:models:snapshot"
+
+
+class ModelRegistry:
+    """
+    Versioned snapshot of the model list built by `get_all_models`.
+
+    Anything that changes the model list (models, functions, connections, access
+    groups) calls `invalidate`, which bumps the version shared by all workers
+    through Redis. A snapshot is served as long as it was built for the current
+    version and is younger than `max_age` seconds; the snapshot itself is also
+    shared through Redis so one worker's rebuild serves the others.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "",
+        redis_sentinels: Optional[list] = None,
+        max_age: int = MODELS_REGISTRY_REFRESH_INTERVAL * 2,
+    ):
+        self.max_age = max_age
+        self.version = 0
+
+        self.models: Optional[list[dict]] = None
+        self.models_by_id: dict[str, dict] = {}
+        self.snapshot_version: Optional[int] = None
+        self.built_at = 0.0
+
+        # Per user filtered model lists of the current snapshot
+        self.user_models: dict[str, list[dict]] = {}
+
+        self.lock = asyncio.Lock()
+
+        # The version and snapshot are read on every model list request, so
+        # through the async client; the sync one bumps the version from
+        # anywhere the model list changes
+        self.redis = None
+        self.async_redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, decode_responses=True
+                )
+                self.async_redis = get_redis_connection(
+                    redis_url, redis_sentinels, async_mode=True, decode_responses=True
+                )
+            except Exception as e:
+                log.warning(f"Model registry is not shared through Redis: {e}")
+
+    async def get_version(self) -> int:
+        if self.async_redis is not None:
+            try:
+                return int(await self.async_redis.get(REDIS_VERSION_KEY) or 0)
+            except Exception as e:
+                log.warning(f"Error reading model registry version: {e}")
+        return self.version
+
+    def invalidate(self):
+        if self.redis is not None:
+            try:
+                self.version = int(self.redis.incr(REDIS_VERSION_KEY))
+                return
+            except Exception as e:
+                log.warning(f"Error bumping model registry version: {e}")
+        self.version += 1
+
+    async def get_models(self) -> Optional[list[dict]]:
+        """Returns the current snapshot, or None if it has to be rebuilt."""
+        version = await self.get_version()
+        if self._is_fresh(self.snapshot_version, self.built_at, version):
+            return self.models
+
+        if self.async_redis is not None:
+            try:
+                data = await self.async_redis.get(REDIS_SNAPSHOT_KEY)
+                snapshot = json.loads(data) if data else None
+            except Exception as e:
+                log.warning(f"Error reading shared model snapshot: {e}")
+                snapshot = None
+
+            if snapshot and self._is_fresh(
+                snapshot["version"], snapshot["built_at"], version
+            ):
+                self._set_snapshot(
+                    snapshot["models"], snapshot["version"], snapshot["built_at"]
+                )
+                return self.models
+
+        return None
+
+    async def set_models(self, models: list[dict], version: int):
+        built_at = time.time()
+        self._set_snapshot(models, version, built_at)
+
+        if self.async_redis is not None:
+            try:
+                await self.async_redis.set(
+                    REDIS_SNAPSHOT_KEY,
+                    json.dumps(
+                        {"version": version, "built_at": built_at, "models": models}
+                    ),
+                    ex=self.max_age,
+                )
+            except Exception as e:
+                log.warning(f"Error sharing model snapshot: {e}")
+
+    def get_user_models(self, key: str) -> Optional[list[dict]]:
+        return self.user_models.get(key)
+
+    def set_user_models(self, key: str, models: list[dict], snapshot: list[dict]):
+        # Skip lists filtered from a snapshot that was replaced in the meantime
+        if snapshot is self.models:
+            self.user_models[key] = models
+
+    def _is_fresh(
+        self, snapshot_version: Optional[int], built_at: float, version: int
+    ) -> bool:
+        return (
+            snapshot_version is not None
+            and snapshot_version == version
+            and time.time() - built_at < self.max_age
+        )
+
+    def _set_snapshot(self, models: list[dict], version: int, built_at: float):
+        self.models = models
+        self.models_by_id = {model["id"]: model for model in models}
+        self.snapshot_version = version
+        self.built_at = built_at
+        self.user_models = {}
+
+
+MODEL_REGISTRY = ModelRegistry(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
+
+
+def invalidate_models():
+    MODEL_REGISTRY.invalidate()
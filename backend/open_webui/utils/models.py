@@ -19,13 +19,18 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_registry import MODEL_REGISTRY
 
 
 from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+    MODELS_REGISTRY_REFRESH_INTERVAL,
+)
 from open_webui.models.users import UserModel
 
 
@@ -76,7 +81,66 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return function_models + openai_models + ollama_models
 
 
-async def get_all_models(request, user: UserModel = None):
+async def get_all_models(request, user: UserModel = None, refresh: bool = False):
+    """
+    Returns the model list from the registry snapshot, rebuilding it only when
+    it has been invalidated or has expired.
+    """
+    if not refresh:
+        models = await MODEL_REGISTRY.get_models()
+        if models is not None:
+            set_models_state(request)
+            return models
+
+    async with MODEL_REGISTRY.lock:
+        # Another request may have rebuilt the snapshot while this one waited
+        if not refresh:
+            models = await MODEL_REGISTRY.get_models()
+            if models is not None:
+                set_models_state(request)
+                return models
+
+        # Read before building, so changes made during the build invalidate it
+        version = await MODEL_REGISTRY.get_version()
+        models = await build_all_models(request, user=user)
+        if not models:
+            # Connections may be down, retry on the next call instead of caching
+            request.app.state.MODELS = {}
+            return models
+
+        await MODEL_REGISTRY.set_models(models, version)
+
+        set_models_state(request)
+        return models
+
+
+def set_models_state(request):
+    if request.app.state.MODELS is MODEL_REGISTRY.models_by_id:
+        return
+
+    request.app.state.MODELS = MODEL_REGISTRY.models_by_id
+    # A snapshot built by another worker never listed the Ollama models in
+    # this one, so the routing table of the Ollama router is derived from it
+    request.app.state.OLLAMA_MODELS = {
+        model["ollama"]["model"]: model["ollama"]
+        for model in MODEL_REGISTRY.models
+        if "ollama" in model
+    }
+
+
+async def periodic_models_refresh(app):
+    # Only `request.app` is used while building the model list
+    request = Request(scope={"type": "http", "app": app})
+
+    while True:
+        await asyncio.sleep(MODELS_REGISTRY_REFRESH_INTERVAL)
+        try:
+            await get_all_models(request, refresh=True)
+        except Exception as e:
+            log.exception(f"Error refreshing models: {e}")
+
+
+async def build_all_models(request, user: UserModel = None):
     models = await get_all_base_models(request, user=user)
 
     # If there are no models, return an empty list
@@ -293,9 +357,8 @@ async def get_all_models(request, user: UserModel = None):
                     get_filter_items_from_module(filter_function, function_module)
                 )
 
-    log.debug(f"get_all_models() returned {len(models)} models")
+    log.debug(f"build_all_models() returned {len(models)} models")
 
-    request.app.state.MODELS = {model["id"]: model for model in models}
     return models
 
 
@@ -5,11 +5,13 @@ import sys
 from importlib import util
 import types
 import tempfile
+import time
 import logging
 
 from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
+from open_webui.utils.function_registry import FUNCTION_REGISTRY, get_content_hash
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -141,8 +143,9 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
             f.write(content)
         module.__dict__["__file__"] = temp_file.name
 
-        # Execute the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        # Execute the modified content in the created module's namespace,
+        # compiled against `__file__` so tracebacks point into the function
+        exec(compile(content, temp_file.name, "exec"), module.__dict__)
         frontmatter = extract_frontmatter(content)
         log.info(f"Loaded module: {module.__name__}")
 
@@ -167,59 +170,55 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
 
 
 def get_function_module_from_cache(request, function_id, load_from_db=True):
-    if load_from_db:
-        # Always load from the database by default
-        # This is useful for hooks like "inlet" or "outlet" where the content might change
-        # and we want to ensure the latest content is used.
-
-        function = Functions.get_function_by_id(function_id)
-        if not function:
-            raise Exception(f"Function not found: {function_id}")
-        content = function.content
-
-        new_content = replace_imports(content)
-        if new_content != content:
-            content = new_content
-            # Update the function content in the database
-            Functions.update_function_by_id(function_id, {"content": content})
-
-        if (
-            hasattr(request.app.state, "FUNCTION_CONTENTS")
-            and function_id in request.app.state.FUNCTION_CONTENTS
-        ) and (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            if request.app.state.FUNCTION_CONTENTS[function_id] == content:
-                return request.app.state.FUNCTIONS[function_id], None, None
-
-        function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id, content
-        )
-    else:
-        # Load from cache (e.g. "stream" hook)
-        # This is useful for performance reasons
-
-        if (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            return request.app.state.FUNCTIONS[function_id], None, None
-
-        function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id
-        )
+    # Modules are checked against the stored content only when they may be out
+    # of date, see FunctionRegistry. Hooks like "stream" pass
+    # `load_from_db=False` to use whatever module is loaded
+    entry = FUNCTION_REGISTRY.get(function_id, revalidate=load_from_db)
+    if entry is not None:
+        return entry.module, entry.type, entry.frontmatter
+
+    function = Functions.get_function_by_id(function_id)
+    if not function:
+        raise Exception(f"Function not found: {function_id}")
+    content = function.content
+
+    new_content = replace_imports(content)
+    if new_content != content:
+        content = new_content
+        # Update the function content in the database
+        Functions.update_function_by_id(function_id, {"content": content})
 
-    if not hasattr(request.app.state, "FUNCTIONS"):
-        request.app.state.FUNCTIONS = {}
+    content_hash = get_content_hash(content)
+    entry = FUNCTION_REGISTRY.validate(function_id, content_hash)
+    if entry is not None:
+        return entry.module, entry.type, entry.frontmatter
+
+    start = time.perf_counter()
+    function_module, function_type, frontmatter = load_function_module_by_id(
+        function_id, content
+    )
+    FUNCTION_REGISTRY.set(
+        function_id,
+        function_module,
+        function_type,
+        frontmatter,
+        content_hash,
+        time.perf_counter() - start,
+    )
 
-    if not hasattr(request.app.state, "FUNCTION_CONTENTS"):
-        request.app.state.FUNCTION_CONTENTS = {}
+    return function_module, function_type, frontmatter
 
-    request.app.state.FUNCTIONS[function_id] = function_module
-    request.app.state.FUNCTION_CONTENTS[function_id] = content
 
-    return function_module, function_type, frontmatter
+def load_active_functions():
+    """
+    Loads the modules of all active functions into the registry, so the first
+    requests do not have to execute them.
+    """
+    for function in Functions.get_functions(active_only=True):
+        try:
+            get_function_module_from_cache(None, function.id)
+        except Exception as e:
+            log.error(f"Error loading function {function.id}: {e}")
 
 
 def install_frontmatter_requirements(requirements: str):
@@ -0,0 +1,142 @@
+import logging
+import time
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlencode
+
+from asgiref.typing import (
+    ASGI3Application,
+    ASGIReceiveCallable,
+    ASGISendCallable,
+    ASGISendEvent,
+    Scope as ASGIScope,
+)
+from fastapi import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, RedirectResponse, Response
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.internal.db import Session
+from open_webui.models.groups import REQUEST_GROUP_MEMBERSHIPS
+from open_webui.utils.auth import get_http_authorization_cred
+from open_webui.utils.security_headers import set_security_headers
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Called with the scope, status code and duration in seconds of every HTTP
+# request once its response is fully sent (e.g. to record metrics)
+REQUEST_OBSERVERS: list[Callable[[ASGIScope, int, float], None]] = []
+
+
+def add_request_observer(observer: Callable[[ASGIScope, int, float], None]):
+    REQUEST_OBSERVERS.append(observer)
+
+
+class RequestPipelineMiddleware:
+    """
+    ASGI middleware doing the per request work of the app in one pass: the
+    YouTube watch redirect, the WebSocket upgrade check, request state
+    (authorization credentials, API key setting, group membership cache),
+    security headers, X-Process-Time, committing the database session and
+    notifying the request observers.
+
+    Response messages are passed on as they are sent, so streamed responses
+    (e.g. chat completions over SSE) are neither buffered nor moved to
+    another task.
+    """
+
+    def __init__(
+        self,
+        app: ASGI3Application,
+        security_headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.app = app
+        self.security_headers = (
+            security_headers if security_headers is not None else set_security_headers()
+        )
+
+    async def __call__(
+        self,
+        scope: ASGIScope,
+        receive: ASGIReceiveCallable,
+        send: ASGISendCallable,
+    ) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start_time = time.perf_counter()
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        headers = Headers(scope=scope)
+
+        async def send_wrapper(message: ASGISendEvent) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                response_headers = MutableHeaders(scope=message)
+                response_headers.update(self.security_headers)
+                response_headers["X-Process-Time"] = (
+                    f"{time.perf_counter() - start_time:.6f}"
+                )
+            await send(message)
+
+        response = self._get_early_response(scope, headers)
+        if response is not None:
+            await response(scope, receive, send_wrapper)
+            self._notify_observers(scope, status_code, start_time)
+            return
+
+        state = scope.setdefault("state", {})
+        state["token"] = get_http_authorization_cred(headers.get("Authorization"))
+        state["enable_api_key"] = scope["app"].state.config.ENABLE_API_KEY
+
+        # Group memberships are looked up once per request
+        group_memberships_token = REQUEST_GROUP_MEMBERSHIPS.set({})
+        try:
+            await self.app(scope, receive, send_wrapper)
+            Session.commit()
+        finally:
+            REQUEST_GROUP_MEMBERSHIPS.reset(group_memberships_token)
+            self._notify_observers(scope, status_code, start_time)
+
+    def _get_early_response(
+        self, scope: ASGIScope, headers: Headers
+    ) -> Optional[Response]:
+        path = scope["path"]
+
+        if scope["method"] == "GET" and path.endswith("/watch"):
+            query_params = parse_qs(scope["query_string"].decode("latin-1"))
+
+            # Check for the specific watch path and the presence of 'v' parameter
+            if "v" in query_params:
+                # Extract the first 'v' parameter
+                video_id = query_params["v"][0]
+                encoded_video_id = urlencode({"youtube": video_id})
+                return RedirectResponse(url=f"/?{encoded_video_id}")
+
+        if "/ws/socket.io" in path:
+            query_params = parse_qs(scope["query_string"].decode("latin-1"))
+            if query_params.get("transport", [None])[0] == "websocket":
+                upgrade = (headers.get("Upgrade") or "").lower()
+                connection = (headers.get("Connection") or "").lower().split(",")
+                # Check that there's the correct headers for an upgrade, else reject the connection
+                # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
+                if upgrade != "websocket" or "upgrade" not in connection:
+                    return JSONResponse(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        content={"detail": "Invalid WebSocket upgrade request"},
+                    )
+
+        return None
+
+    def _notify_observers(self, scope: ASGIScope, status_code: int, start_time):
+        if not REQUEST_OBSERVERS:
+            return
+
+        duration = time.perf_counter() - start_time
+        for observer in REQUEST_OBSERVERS:
+            try:
+                observer(scope, status_code, duration)
+            except Exception as e:
+                log.warning(f"Error in request observer: {e}")
@@ -0,0 +1,176 @@
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from open_webui.config import CACHE_DIR, SPEECH_CACHE_MAX_SIZE_MB
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.cache_index import CacheIndex
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+# Seconds after its last access during which a segment is never evicted, so
+# the files of the responses being built are not removed under them
+EVICTION_GRACE_PERIOD = 60
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?。！？])\s+|\n\s*\n")
+
+
+def split_speech_segments(text: str, min_length: int = 20) -> list[str]:
+    """
+    Splits a message into the sentences that are synthesized and cached on
+    their own, so editing or regenerating part of a message only synthesizes
+    the sentences that changed. Sentences shorter than `min_length` are kept
+    with the next one to avoid choppy speech.
+    """
+    segments = []
+    pending = ""
+    for sentence in SENTENCE_END_PATTERN.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+
+        pending = f"{pending} {sentence}" if pending else sentence
+        if len(pending) >= min_length:
+            segments.append(pending)
+            pending = ""
+
+    if pending:
+        if segments:
+            segments[-1] = f"{segments[-1]} {pending}"
+        else:
+            segments.append(pending)
+    return segments
+
+
+class SpeechCache:
+    """
+    Synthesized speech kept in `cache_dir`, one file per segment, with an index
+    of the size, engine, voice and last access of every segment. Segments are
+    evicted least recently used first once they take more than `max_size`
+    bytes.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int):
+        self.cache_dir = Path(cache_dir)
+        self.stats = {"hits": 0, "misses": 0}
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index = CacheIndex(
+            str(self.cache_dir / "index.db"),
+            max_size,
+            {"segment": ["engine TEXT", "voice TEXT", "created_at REAL NOT NULL"]},
+            grace_period=EVICTION_GRACE_PERIOD,
+            on_evict=self._remove_file,
+        )
+
+        if "segment" in self.index.created:
+            self._adopt_files()
+
+    def get_path(self, key: str) -> str:
+        return str(self.cache_dir / f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the path of a cached segment, or None if it has to be synthesized."""
+        path = self.get_path(key)
+        with self.index.lock:
+            row = self.index.get("segment", key, ["size"])
+
+            if row is None or not os.path.isfile(path):
+                if row is not None:
+                    self.index.delete("segment", key)
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+        return path
+
+    def set(
+        self,
+        key: str,
+        content: bytes,
+        engine: Optional[str] = None,
+        voice: Optional[str] = None,
+    ) -> str:
+        path = self.get_path(key)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.index.set(
+            "segment",
+            key,
+            len(content),
+            engine=engine,
+            voice=voice,
+            created_at=time.time(),
+        )
+        return path
+
+    def get_stats(self) -> dict:
+        with self.index.lock:
+            return {
+                **self.stats,
+                "evictions": self.index.evictions,
+                "segments": self.index.count("segment"),
+                "size": self.index.size,
+            }
+
+    def _adopt_files(self):
+        # The request bodies that used to be saved next to the speech are not
+        # needed anymore
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                path.unlink()
+            except Exception as e:
+                log.warning(f"Error removing {path} from the speech cache: {e}")
+
+        # Files cached before the index existed are evicted like the others
+        entries = []
+        for path in self.cache_dir.glob("*.mp3"):
+            stat = path.stat()
+            entries.append(
+                {
+                    "key": path.stem,
+                    "size": stat.st_size,
+                    "engine": None,
+                    "voice": None,
+                    "created_at": stat.st_mtime,
+                    "accessed_at": stat.st_mtime,
+                }
+            )
+        self.index.set_many("segment", entries)
+
+    def _remove_file(self, table: str, key: str) -> bool:
+        path = self.get_path(key)
+        try:
+            if os.path.isfile(path):
+                os.remove(path)
+            return True
+        except Exception as e:
+            log.warning(f"Error evicting {path} from the speech cache: {e}")
+            return False
+
+
+SPEECH_CACHE: Optional[SpeechCache] = None
+
+
+def get_speech_cache() -> SpeechCache:
+    global SPEECH_CACHE
+    if SPEECH_CACHE is None:
+        SPEECH_CACHE = SpeechCache(
+            CACHE_DIR / "audio" / "speech",
+            max_size=SPEECH_CACHE_MAX_SIZE_MB * 1024 * 1024,
+        )
+    return SPEECH_CACHE
@@ -8,6 +8,24 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* socket.chat_events (counter) – chat events passed to event emitters
+* socket.chat_event_frames (counter) – socket frames actually sent for them;
+  the rate difference is the frames per second saved by coalescing
+* rag.embedding_cache.hits (counter) – embeddings served from the cache
+* rag.embedding_cache.misses (counter) – embeddings that had to be computed
+* storage.cache.hits (counter) – files served from the local copy of a cloud
+  storage object
+* storage.cache.misses (counter) – files downloaded from cloud storage
+* rag.web_cache.hits (counter) – search responses and pages served from the web
+  cache, pages revalidated with a 304 have `tier=revalidated`
+* rag.web_cache.misses (counter) – searches run and pages downloaded
+* llm.backend.requests_in_flight (gauge) – requests in flight per Ollama and
+  OpenAI connection
+* llm.backend.requests (counter) – requests sent per connection
+* llm.backend.failures (counter) – failed requests and health checks per
+  connection
+* llm.backend.latency (gauge, milliseconds) – moving average of the time until
+  a connection starts responding
 
 Attributes used: http.method, http.route, http.status_code
 
@@ -17,11 +35,11 @@ high-cardinality label sets.
 
 from __future__ import annotations
 
-import time
 from typing import Dict, List, Sequence, Any
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
     OTLPMetricExporter,
 )
@@ -33,6 +51,12 @@ from opentelemetry.sdk.metrics.export import (
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource
 
 from open_webui.env import OTEL_SERVICE_NAME, OTEL_EXPORTER_OTLP_ENDPOINT
+from open_webui.socket.main import EVENT_EMITTER_STATS
+from open_webui.retrieval import embedding_cache
+from open_webui.storage import cache as storage_cache
+from open_webui.retrieval.web import cache as web_cache
+from open_webui.utils.request_pipeline import add_request_observer
+from open_webui.utils.load_balancer import OLLAMA_LOAD_BALANCER, OPENAI_LOAD_BALANCER
 
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
@@ -87,24 +111,174 @@ def setup_metrics(app: FastAPI) -> None:
         unit="ms",
     )
 
-    # FastAPI middleware
-    @app.middleware("http")
-    async def _metrics_middleware(request: Request, call_next):
-        start_time = time.perf_counter()
-        response = await call_next(request)
-        elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+    def observe_chat_events(options: CallbackOptions) -> List[Observation]:
+        return [Observation(EVENT_EMITTER_STATS["events"])]
 
+    def observe_chat_event_frames(options: CallbackOptions) -> List[Observation]:
+        return [Observation(EVENT_EMITTER_STATS["frames"])]
+
+    meter.create_observable_counter(
+        name="socket.chat_events",
+        callbacks=[observe_chat_events],
+        description="Chat events passed to event emitters",
+        unit="1",
+    )
+    meter.create_observable_counter(
+        name="socket.chat_event_frames",
+        callbacks=[observe_chat_event_frames],
+        description="Socket frames sent for chat events after coalescing",
+        unit="1",
+    )
+
+    def observe_embedding_cache_hits(options: CallbackOptions) -> List[Observation]:
+        cache = embedding_cache.EMBEDDING_CACHE
+        if cache is None:
+            return []
+        return [
+            Observation(cache.stats["hits"], {"tier": "local"}),
+            Observation(cache.stats["redis_hits"], {"tier": "redis"}),
+        ]
+
+    def observe_embedding_cache_misses(
+        options: CallbackOptions,
+    ) -> List[Observation]:
+        cache = embedding_cache.EMBEDDING_CACHE
+        if cache is None:
+            return []
+        return [Observation(cache.stats["misses"])]
+
+    meter.create_observable_counter(
+        name="rag.embedding_cache.hits",
+        callbacks=[observe_embedding_cache_hits],
+        description="Embeddings served from the embedding cache",
+        unit="1",
+    )
+    meter.create_observable_counter(
+        name="rag.embedding_cache.misses",
+        callbacks=[observe_embedding_cache_misses],
+        description="Embeddings that were not cached and had to be computed",
+        unit="1",
+    )
+
+    def observe_storage_cache(field: str):
+        def callback(options: CallbackOptions) -> List[Observation]:
+            cache = storage_cache.STORAGE_CACHE
+            if cache is None:
+                return []
+            return [Observation(cache.stats[field])]
+
+        return callback
+
+    meter.create_observable_counter(
+        name="storage.cache.hits",
+        callbacks=[observe_storage_cache("hits")],
+        description="Files served from the local copy of a cloud storage object",
+        unit="1",
+    )
+    meter.create_observable_counter(
+        name="storage.cache.misses",
+        callbacks=[observe_storage_cache("misses")],
+        description="Files downloaded from cloud storage",
+        unit="1",
+    )
+
+    def observe_web_cache_hits(options: CallbackOptions) -> List[Observation]:
+        cache = web_cache.WEB_CACHE
+        if cache is None:
+            return []
+        return [
+            Observation(cache.stats["search_hits"], {"type": "search"}),
+            Observation(cache.stats["page_hits"], {"type": "page"}),
+            Observation(
+                cache.stats["page_revalidations"],
+                {"type": "page", "tier": "revalidated"},
+            ),
+        ]
+
+    def observe_web_cache_misses(options: CallbackOptions) -> List[Observation]:
+        cache = web_cache.WEB_CACHE
+        if cache is None:
+            return []
+        return [
+            Observation(cache.stats["search_misses"], {"type": "search"}),
+            Observation(cache.stats["page_misses"], {"type": "page"}),
+        ]
+
+    meter.create_observable_counter(
+        name="rag.web_cache.hits",
+        callbacks=[observe_web_cache_hits],
+        description="Web search responses and pages served from the web cache",
+        unit="1",
+    )
+    meter.create_observable_counter(
+        name="rag.web_cache.misses",
+        callbacks=[observe_web_cache_misses],
+        description="Web searches run and pages downloaded",
+        unit="1",
+    )
+
+    def observe_backends(field: str):
+        def callback(options: CallbackOptions) -> List[Observation]:
+            return [
+                Observation(
+                    value, {"llm.backend.type": backend_type, "llm.backend.url": url}
+                )
+                for backend_type, balancer in [
+                    ("ollama", OLLAMA_LOAD_BALANCER),
+                    ("openai", OPENAI_LOAD_BALANCER),
+                ]
+                for url, backend in balancer.backends.items()
+                if (value := getattr(backend, field)) is not None
+            ]
+
+        return callback
+
+    meter.create_observable_gauge(
+        name="llm.backend.requests_in_flight",
+        callbacks=[observe_backends("in_flight")],
+        description="Requests in flight per model backend",
+        unit="1",
+    )
+    meter.create_observable_counter(
+        name="llm.backend.requests",
+        callbacks=[observe_backends("requests")],
+        description="Requests sent per model backend",
+        unit="1",
+    )
+    meter.create_observable_counter(
+        name="llm.backend.failures",
+        callbacks=[observe_backends("failures")],
+        description="Failed requests and health checks per model backend",
+        unit="1",
+    )
+
+    def observe_backend_latency(options: CallbackOptions) -> List[Observation]:
+        return [
+            Observation(observation.value * 1000, observation.attributes)
+            for observation in observe_backends("latency")(options)
+        ]
+
+    meter.create_observable_gauge(
+        name="llm.backend.latency",
+        callbacks=[observe_backend_latency],
+        description="Moving average of the time until a model backend responds",
+        unit="ms",
+    )
+
+    # Recorded by the request pipeline once the response is fully sent, so
+    # streamed responses are measured until their last chunk
+    def _record_request(scope: dict, status_code: int, duration: float):
         # Route template e.g. "/items/{item_id}" instead of real path.
-        route = request.scope.get("route")
-        route_path = getattr(route, "path", request.url.path)
+        route = scope.get("route")
+        route_path = getattr(route, "path", scope["path"])
 
         attrs: Dict[str, str | int] = {
-            "http.method": request.method,
+            "http.method": scope["method"],
             "http.route": route_path,
-            "http.status_code": response.status_code,
+            "http.status_code": status_code,
         }
 
         request_counter.add(1, attrs)
-        duration_histogram.record(elapsed_ms, attrs)
+        duration_histogram.record(duration * 1000.0, attrs)
 
-        return response
+    add_request_observer(_record_request)
@@ -0,0 +1,121 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    USER_CACHE_TTL,
+    UVICORN_WORKERS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Longest a worker keeps users in its own memory when other workers can't
+# invalidate them, so a role change, deletion or revoked API key on one worker
+# is seen by the others within a few seconds
+LOCAL_MULTI_WORKER_TTL = 5
+
+
+class UserCache:
+    """
+    Short lived cache of the users resolved by authentication.
+
+    Entries live in Redis when it is configured, so an invalidation done by
+    one worker is seen by all of them, and in process memory otherwise, for
+    at most LOCAL_MULTI_WORKER_TTL seconds if there are several workers.
+    """
+
+    def __init__(
+        self,
+        ttl: int,
+        redis_url: Optional[str] = None,
+        redis_sentinels: Optional[list] = None,
+        workers: int = 1,
+    ):
+        self.ttl = ttl
+        self.prefix = "open-webui:user-cache:"
+
+        self.redis = None
+        if redis_url and ttl > 0:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, decode_responses=True
+                )
+            except Exception as e:
+                log.warning(f"User cache is not shared through Redis: {e}")
+
+        if self.redis is None and workers > 1 and ttl > LOCAL_MULTI_WORKER_TTL:
+            log.info(
+                f"User cache is not shared between the {workers} workers, "
+                f"caching users for {LOCAL_MULTI_WORKER_TTL}s instead of {ttl}s"
+            )
+            self.ttl = LOCAL_MULTI_WORKER_TTL
+
+        self.lock = threading.Lock()
+        self.entries: dict[str, tuple[float, Any]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+
+        if self.redis is not None:
+            try:
+                value = self.redis.get(self.prefix + key)
+                return json.loads(value) if value is not None else None
+            except Exception as e:
+                log.warning(f"Error reading user cache: {e}")
+                return None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: Any):
+        if self.ttl <= 0:
+            return
+
+        if self.redis is not None:
+            try:
+                self.redis.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+            except Exception as e:
+                log.warning(f"Error writing user cache: {e}")
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            if len(self.entries) > 10000:
+                # Drop the expired entries instead of letting them pile up
+                self.entries = {k: v for k, v in self.entries.items() if v[0] >= now}
+            self.entries[key] = (now + self.ttl, value)
+
+    def delete(self, *keys: str):
+        if self.redis is not None:
+            try:
+                self.redis.delete(*[self.prefix + key for key in keys])
+            except Exception as e:
+                log.warning(f"Error invalidating user cache: {e}")
+            return
+
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+USER_CACHE = UserCache(
+    USER_CACHE_TTL,
+    REDIS_URL,
+    get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+    workers=UVICORN_WORKERS,
+)
@@ -1,54 +1,70 @@
+import asyncio
 import json
 import logging
+from typing import Optional
 
+import aiohttp
 import requests
 from open_webui.config import WEBUI_FAVICON_URL
-from open_webui.env import SRC_LOG_LEVELS, VERSION
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    VERSION,
+    AIOHTTP_CLIENT_SESSION_SSL,
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_QUEUE_MAX_SIZE,
+    WEBHOOK_MAX_RETRIES,
+    WEBHOOK_RETRY_DELAY,
+    WEBHOOK_TIMEOUT,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["WEBHOOK"])
 
 
+def get_webhook_payload(name: str, url: str, message: str, event_data: dict) -> dict:
+    payload = {}
+
+    # Slack and Google Chat Webhooks
+    if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
+        payload["text"] = message
+    # Discord Webhooks
+    elif "https://discord.com/api/webhooks" in url:
+        payload["content"] = (
+            message if len(message) < 2000 else f"{message[: 2000 - 20]}... (truncated)"
+        )
+    # Microsoft Teams Webhooks
+    elif "webhook.office.com" in url:
+        action = event_data.get("action", "undefined")
+        facts = [
+            {"name": name, "value": value}
+            for name, value in json.loads(event_data.get("user", {})).items()
+        ]
+        payload = {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "themeColor": "0076D7",
+            "summary": message,
+            "sections": [
+                {
+                    "activityTitle": message,
+                    "activitySubtitle": f"{name} ({VERSION}) - {action}",
+                    "activityImage": WEBUI_FAVICON_URL,
+                    "facts": facts,
+                    "markdown": True,
+                }
+            ],
+        }
+    # Default Payload
+    else:
+        payload = {**event_data}
+
+    return payload
+
+
 def post_webhook(name: str, url: str, message: str, event_data: dict) -> bool:
     try:
         log.debug(f"post_webhook: {url}, {message}, {event_data}")
-        payload = {}
-
-        # Slack and Google Chat Webhooks
-        if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
-            payload["text"] = message
-        # Discord Webhooks
-        elif "https://discord.com/api/webhooks" in url:
-            payload["content"] = (
-                message
-                if len(message) < 2000
-                else f"{message[: 2000 - 20]}... (truncated)"
-            )
-        # Microsoft Teams Webhooks
-        elif "webhook.office.com" in url:
-            action = event_data.get("action", "undefined")
-            facts = [
-                {"name": name, "value": value}
-                for name, value in json.loads(event_data.get("user", {})).items()
-            ]
-            payload = {
-                "@type": "MessageCard",
-                "@context": "http://schema.org/extensions",
-                "themeColor": "0076D7",
-                "summary": message,
-                "sections": [
-                    {
-                        "activityTitle": message,
-                        "activitySubtitle": f"{name} ({VERSION}) - {action}",
-                        "activityImage": WEBUI_FAVICON_URL,
-                        "facts": facts,
-                        "markdown": True,
-                    }
-                ],
-            }
-        # Default Payload
-        else:
-            payload = {**event_data}
+        payload = get_webhook_payload(name, url, message, event_data)
 
         log.debug(f"payload: {payload}")
         r = requests.post(url, json=payload)
@@ -58,3 +74,120 @@ def post_webhook(name: str, url: str, message: str, event_data: dict) -> bool:
     except Exception as e:
         log.exception(e)
         return False
+
+
+class WebhookDispatcher:
+    """
+    Posts webhooks in the background so the request that triggers them does
+    not wait for the receivers. Webhooks are queued and posted by
+    `concurrency` senders sharing one HTTP session; connection errors, 429 and
+    5xx responses are retried with an exponential backoff.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = WEBHOOK_CONCURRENCY,
+        max_size: int = WEBHOOK_QUEUE_MAX_SIZE,
+        max_retries: int = WEBHOOK_MAX_RETRIES,
+        retry_delay: float = WEBHOOK_RETRY_DELAY,
+        timeout: int = WEBHOOK_TIMEOUT,
+    ):
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: list[asyncio.Task] = []
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "dropped": 0}
+
+    def start(self):
+        if self.workers:
+            return
+
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+        self.workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def dispatch(self, name: str, url: str, message: str, event_data: dict) -> bool:
+        """Queues a webhook, returns False if the queue is full."""
+        self.start()
+        try:
+            self.queue.put_nowait((name, url, message, event_data))
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            log.warning(f"Webhook queue is full, dropping webhook to {url}")
+            return False
+
+    async def join(self):
+        """Waits for the queued webhooks to be posted."""
+        if self.queue is not None:
+            await self.queue.join()
+
+    async def _worker(self):
+        while True:
+            name, url, message, event_data = await self.queue.get()
+            try:
+                if await self.post(name, url, message, event_data):
+                    self.stats["sent"] += 1
+                else:
+                    self.stats["failed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                log.exception(e)
+            finally:
+                self.queue.task_done()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(
+                    limit=self.concurrency, ssl=AIOHTTP_CLIENT_SESSION_SSL
+                ),
+                trust_env=True,
+            )
+        return self.session
+
+    async def post(self, name: str, url: str, message: str, event_data: dict) -> bool:
+        payload = get_webhook_payload(name, url, message, event_data)
+
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+            try:
+                async with self._get_session().post(url, json=payload) as r:
+                    if r.status < 400:
+                        return True
+
+                    if r.status != 429 and r.status < 500:
+                        log.warning(f"Webhook to {url} was rejected: {r.status}")
+                        return False
+
+                    error = f"HTTP {r.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+
+            log.debug(f"Webhook to {url} failed (attempt {attempt + 1}): {error}")
+
+        log.warning(f"Webhook to {url} failed after {self.max_retries + 1} attempts")
+        return False
+
+
+WEBHOOK_DISPATCHER = WebhookDispatcher()